@@ -0,0 +1,77 @@
+"""
+分析结果缓存 - 以 (语言, 文件内容哈希) 为键复用单文件分析结果
+
+缓存默认只在本次运行内有效；指定缓存文件后会跨运行持久化。
+解析器或规则代码变化时指纹随之变化，旧缓存自动失效。
+"""
+
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+CACHE_FORMAT_VERSION = 1
+
+def compute_fingerprint(paths: Iterable[Path]) -> str:
+    """根据分析相关文件的内容计算指纹"""
+    digest = hashlib.sha256(str(CACHE_FORMAT_VERSION).encode())
+    for path in paths:
+        try:
+            digest.update(path.read_bytes())
+        except OSError:
+            digest.update(str(path).encode())
+    return digest.hexdigest()
+
+class AnalysisCache:
+    """单文件分析结果缓存"""
+
+    def __init__(self, cache_file: Optional[Path] = None, fingerprint: str = ""):
+        self.cache_file = cache_file
+        self.fingerprint = fingerprint
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._dirty = False
+
+        if cache_file is not None and cache_file.exists():
+            try:
+                with open(cache_file, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("fingerprint") == fingerprint:
+                    self.entries = data.get("entries", {})
+            except (OSError, ValueError):
+                self.entries = {}
+
+    @staticmethod
+    def make_key(language: str, content: str, variant: str = "") -> str:
+        """生成缓存键；variant 用于区分不同的分析选项（如启用的规则）"""
+        digest = hashlib.sha256(variant.encode("utf-8") + b"\0" + content.encode("utf-8")).hexdigest()
+        return f"{language}:{digest}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return entry
+
+    def put(self, key: str, value: Dict[str, Any]):
+        with self._lock:
+            self.entries[key] = value
+            self._dirty = True
+
+    def save(self):
+        """将缓存写回文件（仅在指定了缓存文件且内容有变化时）"""
+        if self.cache_file is None or not self._dirty:
+            return
+        with self._lock:
+            data = {"fingerprint": self.fingerprint, "entries": self.entries}
+            tmp_file = self.cache_file.with_suffix(self.cache_file.suffix + ".tmp")
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            tmp_file.replace(self.cache_file)
+            self._dirty = False
@@ -0,0 +1,271 @@
+"""
+项目归档上传 - 边接收请求体边解包 zip/tar 归档，逐个产出需要分析的源文件条目
+
+请求体由事件循环写入有界管道，解包在工作线程中从管道读取：
+tar（含 gz/bz2/xz 压缩）按流式模式读取，上传尚未结束时就能拿到前面的条目；
+zip 的中央目录位于文件末尾，只能先暂存（超过内存阈值时落盘）再逐个读取。
+请求体总大小、单个条目大小和条目数量都有上限。
+"""
+
+import shutil
+import tarfile
+import tempfile
+import threading
+import zipfile
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Iterator, Optional
+
+from multipart.multipart import MultipartParser, parse_options_header
+
+ZIP_MAGIC = (b"PK\x03\x04", b"PK\x05\x06")
+
+# zip 暂存到内存的上限，超过后转存临时文件
+ZIP_SPOOL_MEMORY = 8 * 1024 * 1024
+
+class ArchiveError(Exception):
+    """归档无法读取或超出限制"""
+
+@dataclass
+class ArchiveEntry:
+    name: str
+    data: Optional[bytes] = None
+    error: Optional[str] = None
+
+class BodyPipe:
+    """
+    在事件循环（写端）和解包线程（读端）之间传递请求体数据的有界管道
+
+    缓冲区满时写端阻塞，从而对上传形成反压；读端关闭后写入的数据直接丢弃。
+    """
+
+    def __init__(self, max_buffered: int = 4 * 1024 * 1024):
+        self.max_buffered = max_buffered
+        self._chunks: Deque[bytes] = deque()
+        self._buffered = 0
+        self._eof = False
+        self._error: Optional[str] = None
+        self._reader_closed = False
+        self._cond = threading.Condition()
+
+    @property
+    def reader_closed(self) -> bool:
+        return self._reader_closed
+
+    def write(self, data: bytes):
+        if not data:
+            return
+        with self._cond:
+            while self._buffered >= self.max_buffered and not self._reader_closed:
+                self._cond.wait()
+            if self._reader_closed:
+                return
+            self._chunks.append(data)
+            self._buffered += len(data)
+            self._cond.notify_all()
+
+    def close(self, error: Optional[str] = None):
+        """写端结束；error 不为空表示上传失败，读端随后抛出 ArchiveError"""
+        with self._cond:
+            self._eof = True
+            self._error = error
+            self._cond.notify_all()
+
+    def close_reader(self):
+        """读端结束，丢弃已缓冲的数据并唤醒写端"""
+        with self._cond:
+            self._reader_closed = True
+            self._chunks.clear()
+            self._buffered = 0
+            self._cond.notify_all()
+
+    def _wait_for(self, size: int):
+        while self._buffered < size and not self._eof and not self._reader_closed:
+            self._cond.wait()
+        if self._error is not None:
+            raise ArchiveError(self._error)
+
+    def peek(self, size: int) -> bytes:
+        """读取开头的 size 个字节但不消费"""
+        with self._cond:
+            self._wait_for(size)
+            return b"".join(self._chunks)[:size]
+
+    def read(self, size: int = -1) -> bytes:
+        with self._cond:
+            if size is None or size < 0:
+                self._wait_for(float("inf"))
+                size = self._buffered
+            else:
+                # 有数据就返回，不等凑满 size，使前面的条目尽早被解包
+                self._wait_for(1)
+
+            parts = []
+            remaining = size
+            while remaining > 0 and self._chunks:
+                chunk = self._chunks.popleft()
+                if len(chunk) > remaining:
+                    self._chunks.appendleft(chunk[remaining:])
+                    chunk = chunk[:remaining]
+                parts.append(chunk)
+                remaining -= len(chunk)
+
+            data = b"".join(parts)
+            self._buffered -= len(data)
+            self._cond.notify_all()
+            return data
+
+class RawBodyFeeder:
+    """请求体本身就是归档文件（如 Content-Type: application/zip）"""
+
+    def __init__(self, pipe: BodyPipe):
+        self.pipe = pipe
+
+    def feed(self, chunk: bytes):
+        self.pipe.write(chunk)
+
+    def finish(self):
+        pass
+
+class MultipartBodyFeeder:
+    """从 multipart/form-data 请求体中取出第一个文件字段的内容写入管道"""
+
+    def __init__(self, boundary: bytes, pipe: BodyPipe):
+        self.pipe = pipe
+        self._header_field = b""
+        self._header_value = b""
+        self._part_is_file = False
+        self._in_archive = False
+        self._found = False
+        self.parser = MultipartParser(boundary, callbacks={
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        })
+
+    def _on_part_begin(self):
+        self._part_is_file = False
+
+    def _on_header_field(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        if self._header_field.lower() == b"content-disposition":
+            _, options = parse_options_header(self._header_value)
+            self._part_is_file = b"filename" in options
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self):
+        self._in_archive = self._part_is_file and not self._found
+        self._found = self._found or self._in_archive
+
+    def _on_part_data(self, data: bytes, start: int, end: int):
+        if self._in_archive:
+            self.pipe.write(data[start:end])
+
+    def _on_part_end(self):
+        self._in_archive = False
+
+    def feed(self, chunk: bytes):
+        self.parser.write(chunk)
+
+    def finish(self):
+        self.parser.finalize()
+        if not self._found:
+            raise ArchiveError("请求中没有上传的文件")
+
+def create_body_feeder(content_type: str, pipe: BodyPipe):
+    """根据 Content-Type 选择请求体的解析方式"""
+    media_type, options = parse_options_header(content_type or "")
+    if media_type == b"multipart/form-data":
+        boundary = options.get(b"boundary")
+        if not boundary:
+            raise ArchiveError("multipart 请求缺少 boundary")
+        return MultipartBodyFeeder(boundary, pipe)
+    return RawBodyFeeder(pipe)
+
+def iter_archive_entries(
+    fileobj: BodyPipe,
+    wanted: Callable[[str], bool],
+    max_entry_bytes: int,
+    max_entries: int
+) -> Iterator[ArchiveEntry]:
+    """
+    依次产出归档中 wanted(name) 为真的普通文件
+
+    超过 max_entry_bytes 的条目只产出错误信息；条目总数超过 max_entries 时抛出 ArchiveError。
+    """
+    magic = fileobj.peek(4)
+    if not magic:
+        raise ArchiveError("上传的归档为空")
+    if magic in ZIP_MAGIC:
+        yield from _iter_zip_entries(fileobj, wanted, max_entry_bytes, max_entries)
+    else:
+        yield from _iter_tar_entries(fileobj, wanted, max_entry_bytes, max_entries)
+
+def _too_large(name: str, max_entry_bytes: int) -> ArchiveEntry:
+    return ArchiveEntry(name=name, error=f"文件超过 {max_entry_bytes} 字节上限")
+
+def _iter_tar_entries(
+    fileobj: BodyPipe,
+    wanted: Callable[[str], bool],
+    max_entry_bytes: int,
+    max_entries: int
+) -> Iterator[ArchiveEntry]:
+    try:
+        with tarfile.open(fileobj=fileobj, mode="r|*") as archive:
+            for count, member in enumerate(archive, 1):
+                if count > max_entries:
+                    raise ArchiveError(f"归档条目超过 {max_entries} 个")
+                if not member.isfile() or not wanted(member.name):
+                    continue
+                if member.size > max_entry_bytes:
+                    yield _too_large(member.name, max_entry_bytes)
+                    continue
+                yield ArchiveEntry(name=member.name, data=archive.extractfile(member).read())
+    except tarfile.ReadError as e:
+        raise ArchiveError(f"无法读取归档（仅支持 zip、tar、tar.gz/bz2/xz）: {e}")
+
+def _iter_zip_entries(
+    fileobj: BodyPipe,
+    wanted: Callable[[str], bool],
+    max_entry_bytes: int,
+    max_entries: int
+) -> Iterator[ArchiveEntry]:
+    with tempfile.SpooledTemporaryFile(max_size=ZIP_SPOOL_MEMORY) as spool:
+        shutil.copyfileobj(fileobj, spool)
+        spool.seek(0)
+        try:
+            archive = zipfile.ZipFile(spool)
+        except zipfile.BadZipFile as e:
+            raise ArchiveError(f"无法读取 zip 归档: {e}")
+
+        with archive:
+            infos = archive.infolist()
+            if len(infos) > max_entries:
+                raise ArchiveError(f"归档条目超过 {max_entries} 个")
+            for info in infos:
+                if info.is_dir() or not wanted(info.filename):
+                    continue
+                if info.file_size > max_entry_bytes:
+                    yield _too_large(info.filename, max_entry_bytes)
+                    continue
+                try:
+                    with archive.open(info) as entry:
+                        # 不信任头部记录的大小，最多多读一个字节用于判断是否超限
+                        data = entry.read(max_entry_bytes + 1)
+                except (RuntimeError, zipfile.BadZipFile, NotImplementedError) as e:
+                    yield ArchiveEntry(name=info.filename, error=f"无法解压: {e}")
+                    continue
+                if len(data) > max_entry_bytes:
+                    yield _too_large(info.filename, max_entry_bytes)
+                    continue
+                yield ArchiveEntry(name=info.filename, data=data)
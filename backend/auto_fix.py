@@ -0,0 +1,296 @@
+"""
+批量自动修复 - 按问题的精确位置（span）和建议名称，在文件内重命名标识符
+
+每个文件只解析一次：根据解析结果和问题确定可以安全重命名的名称，
+再扫描一遍文件找出这些名称的全部引用，把所有替换一次性写入新的文件内容，不会在每次替换后重新解析。
+
+只在能确认重命名不影响其他文件、也不改变语义时才修复，否则跳过该名称并给出原因：
+- C# 只重命名局部变量和参数（类型、成员可能被其他文件引用）
+- Vue/TS/JS 不重命名被导出（export、defineExpose）的名称；方法和计算属性只在声明于 <script setup> 中时重命名
+  （Options API 的成员可以被其他文件的模板、$refs、mixin、this.$parent 访问）
+- 名称出现在字符串、注释或模板的普通文本中，或通过其他对象的成员访问（obj.name）、
+  对象键/命名参数（name:）引用时跳过
+- 新名称在文件中已经存在时跳过
+"""
+
+import bisect
+import difflib
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# 可以在单个文件内安全重命名的声明种类（C# 为 Type，Vue 为 DataType）
+SAFE_KINDS = {
+    "csharp": frozenset({"variable", "parameter"}),
+    "vue": frozenset({"method", "event_handler", "computed", "variable", "parameter"}),
+}
+
+# 只有声明在 <script setup> 中（组件的私有作用域）时才可以重命名的 Vue 声明种类
+SETUP_ONLY_KINDS = frozenset({"method", "event_handler", "computed"})
+
+SCRIPT_BLOCK_PATTERN = re.compile(r"(<script\b[^>]*>)(.*?)</script\s*>", re.IGNORECASE | re.DOTALL)
+TEMPLATE_BLOCK_PATTERN = re.compile(r"<template\b[^>]*>(.*)</template\s*>", re.IGNORECASE | re.DOTALL)
+MUSTACHE_PATTERN = re.compile(r"\{\{(.*?)\}\}", re.DOTALL)
+EXPORTED_DECLARATION_PATTERN = re.compile(
+    r"\bexport\s+(?:default\s+)?(?:async\s+)?(?:function\s*\*?|const|let|var|class)\s*$"
+)
+DIRECTIVE_PATTERN = re.compile(r"""\s(?:[:@#]|v-)[^\s=/>]*\s*=\s*(?:"([^"]*)"|'([^']*)')""")
+
+@dataclass
+class Rename:
+    """一个名称的重命名"""
+    old: str
+    new: str
+    rule_id: str
+    line: int
+    # 各处引用在文件中的字符偏移
+    positions: List[int] = field(default_factory=list)
+
+@dataclass
+class FixPlan:
+    renames: List[Rename]
+    # (名称, 跳过的原因)
+    skipped: List[Tuple[str, str]]
+
+LITERAL_START_PATTERN = {
+    "csharp": re.compile(r'//|/\*|"|\'|[@$]+"'),
+    "vue": re.compile(r"//|/\*|[\"'`]"),
+}
+
+def _scan_literals(code: str, start: int, end: int, language: str, text_regions: List[Tuple[int, int]]):
+    """把 code[start:end] 中的注释和字符串字面量记入 text_regions"""
+    pattern = LITERAL_START_PATTERN[language]
+    i = start
+    while True:
+        match = pattern.search(code, i, end)
+        if match is None:
+            return
+        i = match.start()
+        token = match.group()
+        if token == "//":
+            j = code.find("\n", i, end)
+            j = end if j == -1 else j
+        elif token == "/*":
+            j = code.find("*/", i + 2, end)
+            j = end if j == -1 else j + 2
+        elif token == '"' and language == "csharp" and code.startswith('"""', i):
+            j = code.find('"""', i + 3, end)
+            j = end if j == -1 else j + 3
+        else:
+            # 普通字符串；C# 逐字字符串（"" 转义）、内插字符串和 JS 模板字符串（含插值）整体视为文本
+            quote = token[-1]
+            verbatim = "@" in token
+            j = match.end()
+            while j < end:
+                char = code[j]
+                if char == "\\" and not verbatim:
+                    j += 2
+                    continue
+                if char == quote:
+                    if verbatim and code.startswith('""', j):
+                        j += 2
+                        continue
+                    j += 1
+                    break
+                if char == "\n" and quote != "`" and not verbatim:
+                    j += 1
+                    break
+                j += 1
+        j = min(j, end)
+        text_regions.append((i, j))
+        i = j
+
+def code_regions(code: str, language: str, is_vue_file: bool) -> List[Tuple[int, int]]:
+    """
+    文件中的代码区间（按起点排序）；区间之外为注释、字符串或普通文本
+
+    .vue 文件中只有 <script> 的内容、模板中的插值（{{ }}）和指令属性值（:x、@x、#x、v-x）属于代码。
+    """
+    if is_vue_file:
+        blocks = [(match.start(2), match.end(2)) for match in SCRIPT_BLOCK_PATTERN.finditer(code)]
+        template = TEMPLATE_BLOCK_PATTERN.search(code)
+        if template is not None:
+            base = template.start(1)
+            body = template.group(1)
+            for match in MUSTACHE_PATTERN.finditer(body):
+                blocks.append((base + match.start(1), base + match.end(1)))
+            for match in DIRECTIVE_PATTERN.finditer(body):
+                group = 1 if match.group(1) is not None else 2
+                blocks.append((base + match.start(group), base + match.end(group)))
+        scan_language = "vue"
+    else:
+        blocks = [(0, len(code))]
+        scan_language = language
+
+    regions = []
+    for start, end in sorted(blocks):
+        text_regions: List[Tuple[int, int]] = []
+        _scan_literals(code, start, end, scan_language, text_regions)
+        position = start
+        for text_start, text_end in text_regions:
+            if text_start > position:
+                regions.append((position, text_start))
+            position = text_end
+        if position < end:
+            regions.append((position, end))
+    return regions
+
+def _in_regions(regions: List[Tuple[int, int]], starts: List[int], position: int) -> bool:
+    index = bisect.bisect_right(starts, position) - 1
+    return index >= 0 and regions[index][0] <= position < regions[index][1]
+
+def _word_pattern(name: str) -> "re.Pattern[str]":
+    return re.compile(r"(?<![\w$])" + re.escape(name) + r"(?![\w$])")
+
+def _line_starts(code: str) -> List[int]:
+    """各行在文件中的起始偏移（行的划分与 str.splitlines 一致）"""
+    starts = [0]
+    for line in code.splitlines(True):
+        starts.append(starts[-1] + len(line))
+    return starts
+
+def plan_fixes(
+    code: str,
+    language: str,
+    is_vue_file: bool,
+    names: Sequence[Dict[str, Any]],
+    findings: Sequence[Dict[str, Any]],
+    suggest: Callable[[str, str, str], Optional[str]]
+) -> FixPlan:
+    """
+    根据解析出的声明（names）和问题（findings）确定文件中可以安全完成的重命名
+
+    suggest 为 (规则, 名称, 消息) -> 建议名称 的函数，如 NamingAnalyzer.suggest_name。
+    """
+    safe_kinds = SAFE_KINDS[language]
+    skipped: List[Tuple[str, str]] = []
+
+    # 每个名称的建议名称及其声明位置
+    candidates: Dict[str, Rename] = {}
+    declarations: Dict[str, List[Dict[str, int]]] = {}
+    conflicting = set()
+    for finding in findings:
+        name = finding["name"]
+        suggestion = suggest(finding["rule_id"], name, finding.get("message", ""))
+        if suggestion is None or name in conflicting:
+            continue
+        existing = candidates.get(name)
+        if existing is not None and existing.new != suggestion:
+            conflicting.add(name)
+            skipped.append((name, f"建议名称不一致（'{existing.new}'、'{suggestion}'）"))
+            del candidates[name]
+            continue
+        if existing is None:
+            candidates[name] = Rename(name, suggestion, finding["rule_id"], finding["line"])
+        if finding.get("span"):
+            declarations.setdefault(name, []).append(finding["span"])
+
+    if not candidates:
+        return FixPlan([], skipped)
+
+    declared_kinds: Dict[str, set] = {}
+    for name_info in names:
+        kind = name_info.get("DataType" if language == "vue" else "Type", "").lower()
+        declared_kinds.setdefault(name_info.get("Name", ""), set()).add(kind)
+
+    lines = code.splitlines(True)
+    line_starts = _line_starts(code)
+    regions = code_regions(code, language, is_vue_file)
+    setup_blocks = [
+        (match.start(2), match.end(2)) for match in SCRIPT_BLOCK_PATTERN.finditer(code)
+        if is_vue_file and re.search(r"\ssetup\b", match.group(1))
+    ] if language == "vue" else []
+    region_starts = [start for start, _ in regions]
+    renames = []
+    # 本次计划中已被其他重命名占用的新名称
+    claimed = set()
+
+    for name, rename in candidates.items():
+        kinds = declared_kinds.get(name, set())
+        if not kinds <= safe_kinds:
+            skipped.append((name, "不是局部变量或参数" if language == "csharp" else "声明类型不支持自动修复"))
+            continue
+
+        # 解析器给出的声明位置必须与源代码一致
+        spans = declarations.get(name, [])
+        declaration_offsets = set()
+        for span in spans:
+            row = span["line"] - 1
+            if 0 <= row < len(lines) and lines[row][span["column"]:span["column"] + span["length"]] == name:
+                declaration_offsets.add(line_starts[row] + span["column"])
+        if not spans or len(declaration_offsets) != len({(s["line"], s["column"]) for s in spans}):
+            skipped.append((name, "缺少精确位置或位置与源代码不一致"))
+            continue
+
+        if kinds & SETUP_ONLY_KINDS and not all(
+            any(start <= offset < end for start, end in setup_blocks) for offset in declaration_offsets
+        ):
+            skipped.append((name, "不在 <script setup> 中声明，可能被其他组件访问"))
+            continue
+
+        if _word_pattern(rename.new).search(code) or rename.new in declared_kinds:
+            skipped.append((name, f"新名称 '{rename.new}' 在文件中已存在"))
+            continue
+        if rename.new in claimed:
+            skipped.append((name, f"新名称 '{rename.new}' 已用于其他名称的重命名"))
+            continue
+
+        word = _word_pattern(name)
+        reason = None
+        if language == "vue" and re.search(
+            r"(?:\bexport\s*\{|\bdefineExpose\s*\(\s*\{)[^}]*" + word.pattern, code
+        ):
+            reason = "名称被导出"
+        for match in word.finditer(code) if reason is None else ():
+            position = match.start()
+            if not _in_regions(regions, region_starts, position):
+                reason = "出现在字符串、注释或模板文本中"
+                break
+            line_prefix = code[code.rfind("\n", 0, position) + 1:position]
+            before = line_prefix.rstrip()
+            # Vue 中 this.name 指向组件自身的成员；C# 的 this.Name 可能是基类或其他分部文件中的成员
+            if before.endswith(".") and not (
+                language == "vue" and re.search(r"(?<![\w$.])this\s*\??\.$", before)
+            ):
+                reason = "存在成员访问引用（obj.name）"
+                break
+            if position not in declaration_offsets and re.match(r"\s*:(?!:)", code[match.end():match.end() + 64]):
+                reason = "用作对象键或命名参数"
+                break
+            if language == "vue" and position in declaration_offsets and EXPORTED_DECLARATION_PATTERN.search(line_prefix):
+                reason = "名称被导出"
+                break
+            rename.positions.append(position)
+        if reason is not None:
+            rename.positions = []
+            skipped.append((name, reason))
+            continue
+        claimed.add(rename.new)
+        renames.append(rename)
+
+    return FixPlan(renames, skipped)
+
+def apply_renames(code: str, renames: Sequence[Rename]) -> str:
+    """一次性完成所有替换，返回新的文件内容"""
+    edits = sorted(
+        (position, len(rename.old), rename.new)
+        for rename in renames
+        for position in rename.positions
+    )
+    parts = []
+    cursor = 0
+    for position, length, new in edits:
+        parts.append(code[cursor:position])
+        parts.append(new)
+        cursor = position + length
+    parts.append(code[cursor:])
+    return "".join(parts)
+
+def unified_diff(path: str, original: str, fixed: str) -> str:
+    """修复前后的统一格式差异"""
+    return "".join(difflib.unified_diff(
+        original.splitlines(True),
+        fixed.splitlines(True),
+        fromfile=f"a/{path.lstrip('/')}",
+        tofile=f"b/{path.lstrip('/')}"
+    ))
@@ -0,0 +1,140 @@
+"""
+问题基线 - 记录遗留代码中已有问题的指纹，后续运行只报告基线之外的新问题
+
+指纹由 (文件相对路径, 规则, 名称, 所在行内容的哈希) 计算，不含行号，
+代码整体上下移动时指纹保持不变。基线以 {指纹: 出现次数} 的哈希表保存，
+每个问题的匹配都是一次字典查找；同一行内容重复出现时按次数抵消。
+"""
+
+import hashlib
+import json
+import re
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+BASELINE_VERSION = 1
+
+PROJECT_NAME_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]*$")
+
+def normalize_path(file_path: str, root: Optional[Path] = None) -> str:
+    """基线中使用的文件路径：相对 root 的 posix 风格路径（不在 root 下时保留原路径）"""
+    if root is not None:
+        path = Path(file_path).resolve()
+        try:
+            return path.relative_to(root).as_posix()
+        except ValueError:
+            return path.as_posix()
+    normalized = file_path.replace("\\", "/")
+    while normalized.startswith("./"):
+        normalized = normalized[2:]
+    return normalized
+
+def _context_hash(lines: List[str], line: int) -> str:
+    """问题所在行的内容哈希（忽略缩进和空白差异）"""
+    text = lines[line - 1] if 0 < line <= len(lines) else ""
+    return hashlib.sha1(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+def finding_fingerprint(file_key: str, issue: dict, lines: List[str]) -> str:
+    """计算单个问题的指纹"""
+    parts = (file_key, issue.get("rule_id", ""), issue.get("name", ""), _context_hash(lines, issue.get("line", 0)))
+    return hashlib.sha1("\0".join(parts).encode("utf-8")).hexdigest()
+
+class Baseline:
+    """问题指纹索引"""
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root = root
+        self.counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return sum(self.counts.values())
+
+    @classmethod
+    def load(cls, path: Path) -> "Baseline":
+        """加载基线文件；文件中的路径相对基线文件所在目录"""
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != BASELINE_VERSION:
+            raise ValueError(f"不支持的基线版本: {data.get('version')}")
+
+        baseline = cls(path.resolve().parent)
+        baseline.counts = {fingerprint: int(count) for fingerprint, count in data.get("fingerprints", {}).items()}
+        return baseline
+
+    def save(self, path: Path):
+        """保存基线文件（指纹排序，便于纳入版本控制）"""
+        data = {"version": BASELINE_VERSION, "fingerprints": dict(sorted(self.counts.items()))}
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=0)
+        tmp_path.replace(path)
+
+    def _fingerprints(self, file_path: str, issues: List[dict], source: str) -> List[str]:
+        file_key = normalize_path(file_path, self.root)
+        lines = source.splitlines()
+        return [finding_fingerprint(file_key, issue, lines) for issue in issues]
+
+    def add(self, file_path: str, issues: List[dict], source: str):
+        """把一个文件的问题加入基线"""
+        fingerprints = self._fingerprints(file_path, issues, source)
+        with self._lock:
+            for fingerprint in fingerprints:
+                self.counts[fingerprint] = self.counts.get(fingerprint, 0) + 1
+
+    def suppress(
+        self,
+        file_path: str,
+        issues: List[dict],
+        source: str,
+        used: Optional[Counter] = None
+    ) -> Tuple[List[dict], int]:
+        """
+        过滤掉基线中已有的问题，返回 (新问题, 被忽略的数量)
+
+        同一文件的问题分批过滤时，传入同一个 used 计数器以便按次数抵消。
+        """
+        if not self.counts:
+            return issues, 0
+
+        if used is None:
+            used = Counter()
+        remaining = []
+        for issue, fingerprint in zip(issues, self._fingerprints(file_path, issues, source)):
+            used[fingerprint] += 1
+            if used[fingerprint] > self.counts.get(fingerprint, 0):
+                remaining.append(issue)
+        return remaining, len(issues) - len(remaining)
+
+class BaselineStore:
+    """服务端按项目管理基线：<directory>/<project>.json，文件更新后自动重新加载"""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self._loaded: Dict[str, Tuple[float, Baseline]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, project: str) -> Optional[Baseline]:
+        """返回项目的基线，没有基线文件时返回 None；项目名不合法时抛出 ValueError"""
+        if not PROJECT_NAME_PATTERN.match(project):
+            raise ValueError(f"无效的项目名: {project}")
+
+        path = self.directory / f"{project}.json"
+        try:
+            mtime = path.stat().st_mtime
+        except OSError:
+            return None
+
+        with self._lock:
+            loaded = self._loaded.get(project)
+            if loaded is not None and loaded[0] == mtime:
+                return loaded[1]
+
+        baseline = Baseline.load(path)
+        # 服务端收到的是客户端提供的相对路径，不再换算
+        baseline.root = None
+        with self._lock:
+            self._loaded[project] = (mtime, baseline)
+        return baseline
@@ -1,20 +1,42 @@
 #!/usr/bin/env python3
 """
-CodeNamer CLI - 命令行版本的 C# 代码命名规范分析工具
+CodeNamer CLI - 命令行版本的 C# / Vue.js 代码命名规范分析工具
 """
 
 import argparse
 import json
-import subprocess
+import os
+import sqlite3
 import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Optional
-from naming_analyzer import NamingAnalyzer
+from typing import Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+from naming_analyzer import PROJECT_RULES, NamingAnalyzer
+from vue_parser import VueParser
+from csharp_parser import CSharpParser, CSharpParserError, runtime_identifier
+from analysis_cache import AnalysisCache, compute_fingerprint
+from profiling import Profiler, stage
+from git_diff import GitDiffError, get_changed_hunks, line_in_hunks
+from watcher import watch_directory
+from baseline import Baseline, normalize_path
+from findings_store import FindingsStore
+from sampling import TOTAL, RateEstimate, StratifiedSampler
+from auto_fix import apply_renames, plan_fixes, unified_diff
+from symbol_index import SymbolIndex, symbols_from_parsed
+from remote_analysis import LocalBackends, RemoteAnalysisError, ShardedAnalyzer
+from result_groups import group_results, grouped_file_result
+from file_discovery import LANGUAGE_EXTENSIONS, compile_exclude_patterns, detect_language, iter_source_files
+from generated_files import DEFAULT_MARKERS, DEFAULT_NAME_PATTERNS, GeneratedFileDetector
+from rule_list import parse_rule_list
 
 def parse_arguments() -> argparse.Namespace:
     """解析命令行参数"""
     parser = argparse.ArgumentParser(
-        description="CodeNamer - C# 代码命名规范分析工具",
+        description="CodeNamer - C# / Vue.js 代码命名规范分析工具",
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
 示例用法:
@@ -22,6 +44,17 @@ def parse_arguments() -> argparse.Namespace:
   %(prog)s --directory src/
   %(prog)s --file Class1.cs --file Class2.cs
   %(prog)s --directory src/ --exclude-pattern "*.Test.cs"
+  %(prog)s --diff origin/main
+  %(prog)s --directory src/ --baseline codenamer-baseline.json --write-baseline
+  %(prog)s --directory src/ --baseline codenamer-baseline.json
+  %(prog)s --directory src/ --watch
+  %(prog)s --diff HEAD --severity error --fail-fast
+  %(prog)s --directory frontend/src --language vue --jobs 8
+  %(prog)s --directory src/ --backend http://10.0.0.1:8000 --backend http://10.0.0.2:8000
+  %(prog)s --directory src/ --spawn-backends 4
+  %(prog)s --directory src/ --sample --sample-precision 0.1 --sample-time 30
+  %(prog)s --directory src/ --fix --dry-run
+  %(prog)s --directory src/ --symbol-index .codenamer-symbols.json
         """
     )
     
@@ -31,11 +64,16 @@ def parse_arguments() -> argparse.Namespace:
         "--file", "-f",
         action="append",
         dest="files",
-        help="指定要分析的 C# 文件路径（可多次使用）"
+        help="指定要分析的 .cs/.vue/.ts/.js 文件路径（可多次使用）"
     )
     input_group.add_argument(
         "--directory", "-d",
-        help="指定要分析的目录路径（会递归扫描 .cs 文件）"
+        help="指定要分析的目录路径（会递归扫描 --language 对应的源文件）"
+    )
+    input_group.add_argument(
+        "--diff",
+        metavar="BASE_REF",
+        help="仅分析相对 BASE_REF 变更的文件（含未跟踪的新文件），且只报告落在变更行内的问题"
     )
     
     # 可选参数
@@ -46,18 +84,208 @@ def parse_arguments() -> argparse.Namespace:
         help="排除文件的模式（如 '*.Test.cs'，可多次使用）"
     )
     
+    parser.add_argument(
+        "--generated-pattern",
+        action="append",
+        dest="generated_patterns",
+        metavar="GLOB",
+        help="额外的生成文件名模式（如 '*.gen.cs'，可多次使用），匹配的文件不读取直接跳过"
+    )
+    
+    parser.add_argument(
+        "--generated-marker",
+        action="append",
+        dest="generated_markers",
+        metavar="TEXT",
+        help="额外的生成标记（可多次使用），文件开头的注释中含有标记时跳过该文件"
+    )
+    
+    parser.add_argument(
+        "--include-generated",
+        action="store_true",
+        help="同样分析生成的文件（默认按文件名和文件开头的 <auto-generated> 等标记跳过）"
+    )
+    
+    parser.add_argument(
+        "--language", "-l",
+        choices=["csharp", "vue", "all"],
+        default="all",
+        help="扫描目录时分析的语言（默认: all）"
+    )
+    
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=min(8, os.cpu_count() or 1),
+        help="并行分析的文件数（默认: CPU 核数，最多 8）"
+    )
+    
+    parser.add_argument(
+        "--backend",
+        action="append",
+        dest="backends",
+        metavar="URL",
+        help="把文件按内容哈希分片到指定的后端实例分析（可多次使用）"
+    )
+    
+    parser.add_argument(
+        "--spawn-backends",
+        type=int,
+        metavar="N",
+        help="在本机启动 N 个后端进程并分片分析（单机模拟多节点）"
+    )
+    
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=50,
+        help="分片分析时每个请求包含的文件数（默认: 50）"
+    )
+    
+    parser.add_argument(
+        "--cache-file",
+        help="持久化分析缓存的文件路径，内容未变化的文件将直接复用上次结果"
+    )
+    
+    parser.add_argument(
+        "--project-rules",
+        action="store_true",
+        help="启用项目级规则（S001-S003）：建立跨文件的符号索引，检查整个项目中的命名一致性"
+    )
+    
+    parser.add_argument(
+        "--symbol-index",
+        metavar="FILE",
+        help="持久化符号索引的文件路径（隐含 --project-rules），内容未变化的文件不再重新解析"
+    )
+    
+    parser.add_argument(
+        "--verdict-cache",
+        help="持久化规则判定缓存的文件路径，相同标识符在多次运行间只判定一次"
+    )
+    
+    parser.add_argument(
+        "--baseline",
+        metavar="FILE",
+        help="基线文件，基线中已有的问题不再报告（文件中的路径相对基线文件所在目录）"
+    )
+    
+    parser.add_argument(
+        "--write-baseline",
+        action="store_true",
+        help="将本次发现的全部问题写入 --baseline 指定的文件"
+    )
+    
+    parser.add_argument(
+        "--findings-db",
+        metavar="FILE",
+        help="把本次发现的问题写入问题历史库（SQLite），可用 query_findings.py 查询统计"
+    )
+    
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        type=int,
+        const=10,
+        metavar="N",
+        help="记录各阶段和各规则的耗时，并在结束时向 stderr 输出最慢的 N 项（默认: 10）"
+    )
+    
+    parser.add_argument(
+        "--no-ignore",
+        action="store_true",
+        help="扫描目录时不读取 .gitignore 和 .codenamerignore"
+    )
+    
     parser.add_argument(
         "--output", "-o",
-        choices=["console", "json"],
+        choices=["console", "json", "json-grouped"],
         default="console",
-        help="输出格式（默认: console）"
+        help="输出格式（默认: console）；json-grouped 与 json 相同，但每个文件的问题按规则和名称分组"
     )
     
     parser.add_argument(
         "--severity",
         choices=["error", "warning", "info"],
         default="info",
-        help="最低显示的问题严重级别（默认: info）"
+        help="最低显示的问题严重级别，低于该级别的规则不会执行（默认: info）"
+    )
+    
+    parser.add_argument(
+        "--rules",
+        type=parse_rule_list,
+        help="只执行指定的规则，逗号分隔（如 'C001,M001'）"
+    )
+    
+    parser.add_argument(
+        "--disable-rules",
+        type=parse_rule_list,
+        help="不执行指定的规则，逗号分隔（如 'C002,M002'）"
+    )
+    
+    parser.add_argument(
+        "--fail-fast",
+        action="store_true",
+        help="发现第一个问题后立即停止分析并返回非零退出码（适合 pre-commit 钩子）"
+    )
+    
+    parser.add_argument(
+        "--max-issues",
+        type=int,
+        metavar="N",
+        help="发现 N 个问题后停止分析，最多报告 N 个问题"
+    )
+    
+    parser.add_argument(
+        "--fix",
+        action="store_true",
+        help="自动修复：按建议名称重命名可以安全修改的标识符（局部变量、参数及 Vue 脚本中未导出的名称）"
+    )
+    
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="与 --fix 一起使用，只输出修改差异，不写入文件"
+    )
+    
+    parser.add_argument(
+        "--sample",
+        action="store_true",
+        help="只分层抽样分析 --directory 中的部分文件，估计各规则的问题密度及置信区间"
+    )
+    
+    parser.add_argument(
+        "--sample-precision",
+        type=float,
+        default=0.1,
+        help="抽样的目标精度：置信区间半宽不超过总问题密度的该比例时停止（默认: 0.1）"
+    )
+    
+    parser.add_argument(
+        "--sample-time",
+        type=float,
+        default=60,
+        metavar="SECONDS",
+        help="抽样的时间预算，到时即停止（默认: 60）"
+    )
+    
+    parser.add_argument(
+        "--sample-seed",
+        type=int,
+        help="抽样的随机种子，指定后可复现同一组样本"
+    )
+    
+    parser.add_argument(
+        "--confidence",
+        type=float,
+        default=0.95,
+        help="抽样估计的置信水平（默认: 0.95）"
+    )
+    
+    parser.add_argument(
+        "--watch", "-w",
+        action="store_true",
+        help="常驻监听 --directory，文件变更后仅重新分析变更文件并输出新增/已解决的问题"
     )
     
     parser.add_argument(
@@ -68,85 +296,146 @@ def parse_arguments() -> argparse.Namespace:
     
     return parser.parse_args()
 
-def find_cs_files(directory: Path, exclude_patterns: Optional[List[str]] = None) -> List[Path]:
-    """在目录中查找 C# 文件"""
-    import fnmatch
-    
-    cs_files = []
-    exclude_patterns = exclude_patterns or []
-    
-    for cs_file in directory.rglob("*.cs"):
-        # 检查是否匹配排除模式
-        should_exclude = False
-        for pattern in exclude_patterns:
-            if fnmatch.fnmatch(cs_file.name, pattern):
-                should_exclude = True
-                break
-        
-        if not should_exclude:
-            cs_files.append(cs_file)
+def is_excluded(file_path: Path, exclude_patterns: Optional[List[str]] = None) -> bool:
+    """检查文件名是否匹配任一排除模式"""
+    exclude_regex = compile_exclude_patterns(exclude_patterns)
+    return exclude_regex is not None and bool(exclude_regex.match(file_path.name))
+
+def selected_extensions(language: str) -> Tuple[str, ...]:
+    """返回 --language 选项对应的扩展名"""
+    if language == "all":
+        return tuple(ext for extensions in LANGUAGE_EXTENSIONS.values() for ext in extensions)
+    return LANGUAGE_EXTENSIONS[language]
+
+def find_cs_files(
+    directory: Path,
+    exclude_patterns: Optional[List[str]] = None,
+    use_ignore_files: bool = True
+) -> Iterator[Path]:
+    """在目录中查找 C# 文件（生成器，边遍历边产出）"""
+    return iter_source_files(directory, (".cs",), exclude_patterns, use_ignore_files)
+
+def find_source_files(
+    directory: Path,
+    language: str = "all",
+    exclude_patterns: Optional[List[str]] = None,
+    use_ignore_files: bool = True
+) -> Iterator[Path]:
+    """在目录中查找指定语言的源文件（生成器，边遍历边产出）"""
+    for file_path in iter_source_files(directory, selected_extensions(language), exclude_patterns, use_ignore_files):
+        if detect_language(file_path) is not None:
+            yield file_path
+
+@dataclass
+class AnalysisContext:
+    """一次运行中共享的分析组件与选项"""
+    analyzer: NamingAnalyzer
+    csharp_parser: CSharpParser = field(default_factory=CSharpParser)
+    vue_parser: VueParser = field(default_factory=VueParser)
+    cache: Optional[AnalysisCache] = None
+    profiler: Optional[Profiler] = None
+    # 需要执行的规则，None 表示全部
+    enabled_rules: Optional[FrozenSet[str]] = None
+    # 问题基线；write_baseline 为 True 时记录问题而不是忽略
+    baseline: Optional[Baseline] = None
+    write_baseline: bool = False
+    # 单个文件找到这么多问题即可停止（仅在结果不会再被过滤时设置）
+    issue_limit: Optional[int] = None
+    # 置位后尚未完成的文件放弃分析
+    cancel_event: threading.Event = field(default_factory=threading.Event)
+    # 自动修复：只修复 line_filter(文件, 行号) 为真的问题；dry_run 为 True 时只输出差异
+    line_filter: Optional[Callable[[Path, int], bool]] = None
+    dry_run: bool = False
+    # 项目级规则的符号索引：分析文件时顺带更新内容有变化的文件
+    symbol_index: Optional[SymbolIndex] = None
     
-    return cs_files
+    @property
+    def rules_signature(self) -> str:
+        """启用规则集合的标识，用于区分缓存"""
+        return "all" if self.enabled_rules is None else ",".join(sorted(self.enabled_rules))
 
-def analyze_file(file_path: Path, analyzer: NamingAnalyzer) -> dict:
-    """分析单个 C# 文件"""
+def analyze_file(file_path: Path, context: AnalysisContext) -> dict:
+    """分析单个源文件；上下文中有 profiler 时记录各阶段耗时"""
+    if context.profiler is None:
+        return _analyze_file(file_path, context)
+    with context.profiler.profile(str(file_path)):
+        return _analyze_file(file_path, context)
+
+def _analyze_file(file_path: Path, context: AnalysisContext) -> dict:
+    language = detect_language(file_path) or "csharp"
+    cache = context.cache
     try:
         # 读取文件内容
-        with open(file_path, 'r', encoding='utf-8') as f:
+        with stage("read"), open(file_path, 'r', encoding='utf-8') as f:
             code_content = f.read()
         
-        # 获取 C# 解析器路径
-        parser_path = Path(__file__).parent.parent / "csharp-parser-helper"
-        exe_path = parser_path / "bin" / "Debug" / "net8.0" / "CSharpParserHelper.exe"
-        
-        # 检查解析器是否存在
-        if not exe_path.exists():
-            print(f"错误: C# 解析器不存在，请先构建: {exe_path}")
-            print("运行命令: cd csharp-parser-helper && dotnet build")
-            sys.exit(1)
-        
-        # 调用 C# 解析器
-        result = subprocess.run(
-            [str(exe_path), code_content],
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
+        # 符号索引中该文件已是最新时不需要更新
+        index_digest = None
+        symbol_index = context.symbol_index
+        if symbol_index is not None:
+            index_digest = SymbolIndex.digest(code_content)
+            if symbol_index.is_current(symbol_index.key(file_path), index_digest):
+                index_digest = None
         
-        if result.returncode != 0:
-            return {
-                "file": str(file_path),
-                "error": f"解析器错误: {result.stderr}",
-                "results": [],
-                "parser_errors": []
-            }
+        cache_key = ""
+        if cache is not None:
+            cache_key = AnalysisCache.make_key(language, code_content, context.rules_signature)
+            cached = cache.get(cache_key)
+            if cached is not None:
+                if index_digest is not None:
+                    # 分析结果来自缓存，但索引需要该文件的声明，仍需解析一次
+                    try:
+                        update_symbol_index(file_path, index_digest, language,
+                                            parse_source(file_path, code_content, language, context), context)
+                    except CSharpParserError:
+                        pass
+                return apply_baseline({
+                    "file": str(file_path),
+                    "results": list(cached["results"]),
+                    "parser_errors": list(cached["parser_errors"]),
+                    "total_issues": len(cached["results"])
+                }, code_content, context)
         
-        # 解析 JSON 输出
         try:
-            # --- 终极调试：打印原始 JSON ---
-            print(f"----------- RAW JSON FROM C# PARSER ({file_path.name}) -----------")
-            print(result.stdout)
-            print("---------------------------------------------")
-            
-            parsed_data = json.loads(result.stdout)
-        except json.JSONDecodeError as e:
+            parsed_data = parse_source(file_path, code_content, language, context)
+        except CSharpParserError as e:
+            if context.cancel_event.is_set():
+                return {"file": str(file_path), "cancelled": True}
             return {
                 "file": str(file_path),
-                "error": f"JSON 解析错误: {str(e)}",
+                "error": str(e),
                 "results": [],
                 "parser_errors": []
             }
         
-        # 分析命名规范
-        analysis_results = analyzer.analyze_names(parsed_data)
+        if index_digest is not None:
+            update_symbol_index(file_path, index_digest, language, parsed_data, context)
+        
+        # 分析命名规范（逐个取出问题，达到上限或被取消时不再分析剩余名称）
+        named_results = []
+        truncated = False
+        with stage("analyze"):
+            for finding in context.analyzer.iter_findings(parsed_data, language, context.enabled_rules):
+                if context.cancel_event.is_set():
+                    return {"file": str(file_path), "cancelled": True}
+                named_results.append(finding)
+                if context.issue_limit is not None and len(named_results) >= context.issue_limit:
+                    truncated = True
+                    break
+        with stage("build"):
+            analysis_results = [result.dict() for result in named_results]
         parser_errors = parsed_data.get("errors", [])
         
-        return {
+        # 不完整的结果不能缓存
+        if cache is not None and not truncated:
+            cache.put(cache_key, {"results": analysis_results, "parser_errors": parser_errors})
+        
+        return apply_baseline({
             "file": str(file_path),
-            "results": [result.dict() for result in analysis_results],
-            "parser_errors": parser_errors,
+            "results": list(analysis_results),
+            "parser_errors": list(parser_errors),
             "total_issues": len(analysis_results)
-        }
+        }, code_content, context)
         
     except FileNotFoundError:
         return {
@@ -163,6 +452,151 @@ def analyze_file(file_path: Path, analyzer: NamingAnalyzer) -> dict:
             "parser_errors": []
         }
 
+def update_symbol_index(file_path: Path, digest: str, language: str, parsed_data: dict, context: AnalysisContext):
+    """用解析结果更新符号索引中该文件的声明"""
+    symbol_index = context.symbol_index
+    with stage("index"):
+        symbol_index.update(symbol_index.key(file_path), digest, language, symbols_from_parsed(parsed_data, language))
+
+def parse_source(file_path: Path, code_content: str, language: str, context: AnalysisContext) -> dict:
+    """解析源文件内容（.vue 以外的 Vue 语言文件按纯脚本解析）；C# 解析失败时抛出 CSharpParserError"""
+    if language == "vue":
+        # Vue 解析在进程内完成
+        if file_path.suffix.lower() == ".vue":
+            return context.vue_parser.parse_vue_file(code_content)
+        return context.vue_parser.parse_script_file(code_content)
+    
+    csharp_parser = context.csharp_parser
+    
+    # 检查解析器是否存在
+    if not csharp_parser.is_available():
+        print(f"错误: C# 解析器不存在，请先构建: {csharp_parser.exe_path}")
+        print(f"运行命令: cd csharp-parser-helper && dotnet publish -c Release -r {runtime_identifier()} "
+              f"--self-contained true -o publish/{runtime_identifier()}")
+        sys.exit(1)
+    
+    # 调用 C# 解析器
+    return csharp_parser.parse(code_content)
+
+def fix_file(file_path: Path, context: AnalysisContext) -> dict:
+    """
+    自动修复单个文件：解析一次，按问题的精确位置完成所有可以安全进行的重命名并写回
+
+    context.dry_run 为 True 时不写文件，结果中附带差异。
+    """
+    language = detect_language(file_path) or "csharp"
+    try:
+        # 保留原有的换行符
+        with open(file_path, "r", encoding="utf-8", newline="") as f:
+            code_content = f.read()
+        parsed_data = parse_source(file_path, code_content, language, context)
+        findings = [
+            finding.dict()
+            for finding in context.analyzer.iter_findings(parsed_data, language, context.enabled_rules)
+        ]
+        if context.line_filter is not None:
+            findings = [finding for finding in findings if context.line_filter(file_path, finding["line"])]
+        plan = plan_fixes(
+            code_content,
+            language,
+            file_path.suffix.lower() == ".vue",
+            parsed_data.get("names", []),
+            findings,
+            context.analyzer.suggest_name
+        )
+    except (OSError, UnicodeDecodeError, CSharpParserError) as e:
+        return {"file": str(file_path), "error": f"修复失败: {e}", "renames": [], "skipped": []}
+    
+    result = {
+        "file": str(file_path),
+        "renames": [
+            {"old": rename.old, "new": rename.new, "rule_id": rename.rule_id, "line": rename.line,
+             "occurrences": len(rename.positions)}
+            for rename in plan.renames
+        ],
+        "skipped": [{"name": name, "reason": reason} for name, reason in plan.skipped],
+    }
+    if not plan.renames:
+        return result
+    
+    fixed_content = apply_renames(code_content, plan.renames)
+    if context.dry_run:
+        result["diff"] = unified_diff(file_path.as_posix(), code_content, fixed_content)
+        return result
+    
+    try:
+        tmp_path = file_path.with_name(file_path.name + ".codenamer-tmp")
+        with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+            f.write(fixed_content)
+        tmp_path.replace(file_path)
+    except OSError as e:
+        return {"file": str(file_path), "error": f"写入失败: {e}", "renames": [], "skipped": result["skipped"]}
+    return result
+
+def apply_baseline(file_result: dict, code_content: str, context: AnalysisContext) -> dict:
+    """按基线过滤单个文件的问题（或在生成基线时记录问题）"""
+    baseline = context.baseline
+    if baseline is None:
+        return file_result
+    
+    if context.write_baseline:
+        baseline.add(file_result["file"], file_result["results"], code_content)
+        return file_result
+    
+    file_result["results"], file_result["suppressed"] = baseline.suppress(
+        file_result["file"], file_result["results"], code_content
+    )
+    file_result["total_issues"] = len(file_result["results"])
+    return file_result
+
+def analyze_files(
+    file_paths: Iterable[Path],
+    context: AnalysisContext,
+    jobs: int = 1,
+    worker: Callable[[Path, AnalysisContext], dict] = analyze_file
+) -> Iterator[Tuple[Path, dict]]:
+    """
+    并行处理多个文件（默认为分析，worker 可替换为 fix_file 等），按输入顺序逐个产出 (路径, 结果)
+
+    输入可以是生成器：最多只会预取 jobs * 2 个文件，遍历与分析同时进行。
+    调用方提前结束迭代时，尚未开始的文件直接取消。
+    """
+    if jobs <= 1:
+        for file_path in file_paths:
+            yield file_path, worker(file_path, context)
+        return
+    
+    window = jobs * 2
+    pending: List[Tuple[Path, Future]] = []
+    executor = ThreadPoolExecutor(max_workers=jobs)
+    try:
+        for file_path in file_paths:
+            pending.append((file_path, executor.submit(worker, file_path, context)))
+            if len(pending) >= window:
+                done_path, future = pending.pop(0)
+                yield done_path, future.result()
+        while pending:
+            done_path, future = pending.pop(0)
+            yield done_path, future.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+def analyze_files_remote(
+    file_paths: Iterable[Path],
+    sharded: ShardedAnalyzer,
+    context: AnalysisContext
+) -> Iterator[Tuple[Path, dict]]:
+    """由后端实例分析文件，按输入顺序逐个产出 (路径, 结果)；基线在本地应用"""
+    for file_path, result in sharded.analyze(file_paths):
+        if context.baseline is not None and "error" not in result:
+            try:
+                with open(file_path, "r", encoding="utf-8") as f:
+                    code_content = f.read()
+            except (OSError, UnicodeDecodeError):
+                code_content = ""
+            result = apply_baseline(result, code_content, context)
+        yield file_path, result
+
 def filter_by_severity(results: List[dict], min_severity: str) -> List[dict]:
     """根据严重级别过滤结果"""
     severity_order = {"error": 3, "warning": 2, "info": 1}
@@ -175,6 +609,28 @@ def filter_by_severity(results: List[dict], min_severity: str) -> List[dict]:
     
     return filtered_results
 
+def filter_by_hunks(file_result: dict, hunks: List[Tuple[int, int]]) -> dict:
+    """只保留落在变更行范围内的问题"""
+    if "results" in file_result:
+        file_result["results"] = [
+            result for result in file_result["results"]
+            if line_in_hunks(result.get("line", 0), hunks)
+        ]
+        file_result["total_issues"] = len(file_result["results"])
+    if "parser_errors" in file_result:
+        file_result["parser_errors"] = [
+            error for error in file_result["parser_errors"]
+            if line_in_hunks(error.get("line", 0), hunks)
+        ]
+    return file_result
+
+def describe_skipped_generated(args: argparse.Namespace) -> str:
+    """没有文件可分析时的补充说明（文件都被识别为生成的文件时提示 --include-generated）"""
+    detector = args.generated_detector
+    if detector is None or not detector.total_skipped:
+        return ""
+    return f"（跳过了 {detector.total_skipped} 个生成的文件，可使用 --include-generated 分析它们）"
+
 def print_console_output(analysis_results: List[dict], args: argparse.Namespace):
     """以控制台格式输出结果"""
     total_files = len(analysis_results)
@@ -185,6 +641,12 @@ def print_console_output(analysis_results: List[dict], args: argparse.Namespace)
     print(f"分析文件数: {total_files}")
     print(f"发现问题数: {total_issues}")
     print(f"有问题的文件数: {files_with_issues}")
+    if args.baseline and not args.write_baseline:
+        print(f"基线中已有的问题数: {sum(result.get('suppressed', 0) for result in analysis_results)}")
+    if args.generated_detector is not None and args.generated_detector.total_skipped:
+        print(f"跳过的生成文件数: {args.generated_detector.total_skipped}")
+    if args.stopped_early:
+        print(f"已达到问题上限（{args.issue_budget}），其余文件未分析")
     print("=" * 50)
     
     for file_result in analysis_results:
@@ -228,33 +690,343 @@ def print_json_output(analysis_results: List[dict], args: argparse.Namespace):
         "summary": {
             "total_files": len(analysis_results),
             "total_issues": sum(result.get("total_issues", 0) for result in analysis_results),
-            "files_with_issues": sum(1 for result in analysis_results if result.get("total_issues", 0) > 0)
+            "files_with_issues": sum(1 for result in analysis_results if result.get("total_issues", 0) > 0),
+            "suppressed_by_baseline": sum(result.get("suppressed", 0) for result in analysis_results),
+            "skipped_generated": args.generated_detector.total_skipped if args.generated_detector is not None else 0,
+            "stopped_early": args.stopped_early
         },
-        "files": analysis_results
+        "files": [grouped_file_result(result) for result in analysis_results] if args.grouped_output else analysis_results
     }
     
     print(json.dumps(output, ensure_ascii=False, indent=2))
 
+def apply_project_rules(
+    analysis_results: List[dict],
+    context: AnalysisContext,
+    changed_hunks: Optional[Dict[Path, List[Tuple[int, int]]]] = None
+) -> int:
+    """
+    运行项目级规则，把问题并入本次分析的文件的结果中，返回并入的问题数
+
+    问题只报告在本次分析的文件中（--diff 时只报告变更行内的问题），基线同样适用于这些问题。
+    """
+    symbol_index = context.symbol_index
+    results_by_key = {
+        symbol_index.key(Path(result["file"])): result
+        for result in analysis_results if "error" not in result
+    }
+    grouped: Dict[str, List[dict]] = {}
+    for key, finding in context.analyzer.iter_project_findings(symbol_index, context.enabled_rules):
+        if key in results_by_key:
+            grouped.setdefault(key, []).append(finding.dict())
+    
+    added = 0
+    for key, findings in grouped.items():
+        result = results_by_key[key]
+        file_path = Path(result["file"])
+        if changed_hunks is not None:
+            findings = [finding for finding in findings if line_in_hunks(finding["line"], changed_hunks[file_path])]
+        if context.baseline is not None and findings:
+            try:
+                with open(file_path, "r", encoding="utf-8") as f:
+                    code_content = f.read()
+            except (OSError, UnicodeDecodeError):
+                code_content = ""
+            project_result = apply_baseline({"file": result["file"], "results": findings}, code_content, context)
+            findings = project_result["results"]
+            if "suppressed" in project_result:
+                result["suppressed"] = result.get("suppressed", 0) + project_result["suppressed"]
+        if not findings:
+            continue
+        result["results"] = sorted(result["results"] + findings, key=lambda issue: issue["line"])
+        result["total_issues"] = len(result["results"])
+        added += len(findings)
+    return added
+
+def record_findings(db_path: Path, analysis_results: List[dict], args: argparse.Namespace):
+    """把本次运行的问题写入问题历史库（文件路径相对当前目录）"""
+    root = Path.cwd().resolve()
+    file_results = [
+        {"file": normalize_path(result["file"], root), "results": result.get("results", [])}
+        for result in analysis_results
+    ]
+    try:
+        store = FindingsStore(db_path)
+        try:
+            run_id = store.record_run("cli", file_results, partial=args.stopped_early)
+        finally:
+            store.close()
+    except (sqlite3.Error, ValueError, OSError) as e:
+        print(f"警告: 无法写入问题历史库 {db_path}: {e}", file=sys.stderr)
+        return
+    if args.verbose:
+        print(f"已写入问题历史库: {db_path}（运行编号 {run_id}）")
+
+def run_fix(file_paths: Iterable[Path], context: AnalysisContext, args: argparse.Namespace) -> int:
+    """
+    自动修复所有文件并输出结果，返回退出码
+
+    --dry-run 时存在可修复的问题返回 1，否则返回 0；有文件修复失败时返回 1。
+    """
+    start = time.monotonic()
+    fix_results = []
+    for file_path, result in analyze_files(file_paths, context, args.jobs, worker=fix_file):
+        if result.get("error") or result["renames"] or (args.verbose and result["skipped"]):
+            fix_results.append(result)
+        if args.output == "console":
+            print_fix_result(result, args)
+    
+    renamed = sum(len(result["renames"]) for result in fix_results)
+    occurrences = sum(rename["occurrences"] for result in fix_results for rename in result["renames"])
+    changed_files = sum(1 for result in fix_results if result["renames"])
+    failed = sum(1 for result in fix_results if result.get("error"))
+    elapsed = time.monotonic() - start
+    
+    if args.output == "json":
+        print(json.dumps({
+            "summary": {
+                "dry_run": args.dry_run,
+                "changed_files": changed_files,
+                "renamed_names": renamed,
+                "replaced_occurrences": occurrences,
+                "failed_files": failed,
+                "elapsed": round(elapsed, 3),
+            },
+            "files": fix_results,
+        }, ensure_ascii=False, indent=2))
+    else:
+        action = "可修复" if args.dry_run else "已修复"
+        print(f"\n{action} {changed_files} 个文件中的 {renamed} 个名称（共替换 {occurrences} 处），用时 {elapsed:.2f} 秒")
+        if failed:
+            print(f"修复失败的文件: {failed}")
+    
+    if failed or (args.dry_run and renamed):
+        return 1
+    return 0
+
+def print_fix_result(result: dict, args: argparse.Namespace):
+    """以控制台格式输出单个文件的修复结果"""
+    if result.get("error"):
+        print(f"错误: {result['file']}: {result['error']}")
+        return
+    if result["renames"]:
+        print(f"\n {result['file']} - 重命名 {len(result['renames'])} 个名称:")
+        for rename in result["renames"]:
+            print(f"  第 {rename['line']} 行 [{rename['rule_id']}] {rename['old']} → {rename['new']}"
+                  f"（{rename['occurrences']} 处）")
+    if args.verbose:
+        for skipped in result["skipped"]:
+            print(f"  跳过 {skipped['name']}: {skipped['reason']}（{result['file']}）")
+    if result.get("diff"):
+        print(result["diff"], end="")
+
+# 抽样至少分析这么多个文件后才检查是否达到目标精度
+MIN_SAMPLE_FILES = 30
+
+@dataclass
+class SampleReport:
+    """抽样估计的结果"""
+    sampler: StratifiedSampler
+    estimates: Dict[str, RateEstimate]
+    elapsed: float
+    stop_reason: str
+
+def run_sample(
+    file_paths: Iterable[Path],
+    root: Path,
+    analyze_batch: Callable[[List[Path]], Iterator[Tuple[Path, dict]]],
+    args: argparse.Namespace
+) -> SampleReport:
+    """分轮抽样分析，直到达到目标精度、时间预算或分析完全部文件"""
+    start = time.monotonic()
+    sampler = StratifiedSampler(file_paths, root, args.sample_seed)
+    if args.verbose:
+        print(f"共 {sampler.population} 个源文件，分为 {len(sampler.strata)} 层")
+    
+    round_size = max(16, args.jobs * 4)
+    batch = sampler.initial_batch()
+    stop_reason = "没有可分析的文件"
+    while batch:
+        for file_path, result in analyze_batch(batch):
+            if "error" in result:
+                sampler.record_failure(file_path)
+            else:
+                sampler.record(file_path, Counter(issue["rule_id"] for issue in result["results"]))
+        
+        if sampler.exhausted:
+            stop_reason = "已分析全部文件"
+            break
+        if time.monotonic() - start >= args.sample_time:
+            stop_reason = "达到时间预算"
+            break
+        if sampler.sampled >= MIN_SAMPLE_FILES and sampler.converged(args.sample_precision, args.confidence):
+            stop_reason = "达到目标精度"
+            break
+        if args.verbose:
+            total = sampler.estimates(args.confidence)[TOTAL]
+            print(f"已抽样 {sampler.sampled} 个文件，问题密度 {total.rate:.3f} ± {total.half_width:.3f}")
+        batch = sampler.next_batch(round_size)
+    
+    return SampleReport(sampler, sampler.estimates(args.confidence), time.monotonic() - start, stop_reason)
+
+def sorted_estimates(report: SampleReport) -> List[RateEstimate]:
+    """合计在前，其余规则按密度从高到低"""
+    rules = [estimate for rule_id, estimate in report.estimates.items() if rule_id != TOTAL]
+    return [report.estimates[TOTAL]] + sorted(rules, key=lambda estimate: (-estimate.rate, estimate.rule_id))
+
+def print_sample_console(report: SampleReport, args: argparse.Namespace):
+    """以控制台格式输出抽样估计"""
+    sampler = report.sampler
+    print(f"\n抽样估计: 分析了 {sampler.sampled} / {sampler.population} 个文件（{len(sampler.strata)} 层），"
+          f"用时 {report.elapsed:.1f} 秒，{report.stop_reason}")
+    if sampler.failed:
+        print(f"分析失败的文件: {sampler.failed}（不计入估计）")
+    print(f"置信水平: {args.confidence:.0%}\n")
+    print(f"{'规则':<8}{'每文件问题数':>12}{'置信区间':>24}{'估计问题总数':>14}")
+    for estimate in sorted_estimates(report):
+        label = "合计" if estimate.rule_id == TOTAL else estimate.rule_id
+        interval = f"[{estimate.low:.4f}, {estimate.high:.4f}]"
+        print(f"{label:<8}{estimate.rate:>12.4f}{interval:>24}{estimate.estimated_total:>14.0f}")
+
+def print_sample_json(report: SampleReport, args: argparse.Namespace):
+    """以 JSON 格式输出抽样估计"""
+    sampler = report.sampler
+    output = {
+        "sample": {
+            "sampled_files": sampler.sampled,
+            "failed_files": sampler.failed,
+            "total_files": sampler.population,
+            "strata": len(sampler.strata),
+            "elapsed": round(report.elapsed, 3),
+            "stop_reason": report.stop_reason,
+            "confidence": args.confidence,
+        },
+        "rates": [
+            {
+                "rule_id": "total" if estimate.rule_id == TOTAL else estimate.rule_id,
+                "issues_per_file": estimate.rate,
+                "low": estimate.low,
+                "high": estimate.high,
+                "estimated_issues": estimate.estimated_total,
+            }
+            for estimate in sorted_estimates(report)
+        ],
+    }
+    print(json.dumps(output, ensure_ascii=False, indent=2))
+
+def finding_key(issue: dict) -> Tuple[str, str, str]:
+    """问题的标识（不含行号，避免代码上下移动时被误判为新问题）"""
+    return (issue.get("rule_id", ""), issue.get("name", ""), issue.get("message", ""))
+
+def diff_findings(old: List[dict], new: List[dict]) -> Tuple[List[dict], List[dict]]:
+    """对比同一文件前后两次的问题，返回 (新增, 已解决)"""
+    def subtract(left: List[dict], right: List[dict]) -> List[dict]:
+        remaining = Counter(map(finding_key, right))
+        difference = []
+        for issue in left:
+            key = finding_key(issue)
+            if remaining[key] > 0:
+                remaining[key] -= 1
+            else:
+                difference.append(issue)
+        return difference
+    
+    return subtract(new, old), subtract(old, new)
+
+def print_watch_diff(file_path: str, added: List[dict], resolved: List[dict], args: argparse.Namespace):
+    """输出监听模式下单个文件的问题变化"""
+    if args.output == "json":
+        if args.grouped_output:
+            added, resolved = group_results(added), group_results(resolved)
+        print(json.dumps({"file": file_path, "added": added, "resolved": resolved}, ensure_ascii=False), flush=True)
+        return
+    
+    print(f"\n[{time.strftime('%H:%M:%S')}] {file_path}: 新增 {len(added)} 个, 已解决 {len(resolved)} 个")
+    for sign, issues in (("+", added), ("-", resolved)):
+        for issue in issues:
+            severity_icon = {"error": "🔴", "warning": "🟡", "info": "🔵"}.get(issue["severity"], "🔵")
+            print(f"   {sign} {severity_icon} 第 {issue['line']} 行: {issue['name']}")
+            print(f"        [{issue['rule_id']}] {issue['message']}")
+    sys.stdout.flush()
+
+def run_watch(
+    directory: Path,
+    analysis_results: List[dict],
+    context: AnalysisContext,
+    args: argparse.Namespace
+):
+    """监听目录变更，增量重新分析并输出问题变化"""
+    current = {
+        Path(result["file"]).resolve(): filter_by_severity(result.get("results", []), args.severity)
+        for result in analysis_results
+    }
+    
+    def on_change(changed, deleted):
+        for path in sorted(changed):
+            if detect_language(path) is None or is_excluded(path, args.exclude_patterns) or not path.exists():
+                continue
+            if args.generated_detector is not None and args.generated_detector.detect(path) is not None:
+                continue
+            result = analyze_file(path, context)
+            if "error" in result:
+                print(f"\n {path}\n   错误: {result['error']}", flush=True)
+                continue
+            new = filter_by_severity(result["results"], args.severity)
+            added, resolved = diff_findings(current.get(path.resolve(), []), new)
+            current[path.resolve()] = new
+            if added or resolved:
+                print_watch_diff(str(path), added, resolved, args)
+        
+        for path in sorted(deleted):
+            resolved = current.pop(path.resolve(), [])
+            if resolved:
+                print_watch_diff(str(path), [], resolved, args)
+    
+    if args.output != "json":
+        print(f"\n正在监听 {directory} 的变更（Ctrl+C 退出）...", flush=True)
+    try:
+        watch_directory(
+            directory,
+            on_change,
+            extensions=selected_extensions(args.language),
+            use_ignore_files=not args.no_ignore
+        )
+    except KeyboardInterrupt:
+        pass
+
 def main():
     """主函数"""
     args = parse_arguments()
+    # json-grouped 只改变结果的组织方式，其余行为与 json 相同
+    args.grouped_output = args.output == "json-grouped"
+    if args.grouped_output:
+        args.output = "json"
     
     if args.verbose:
-        print("CodeNamer CLI - C# 代码命名规范分析工具")
+        print("CodeNamer CLI - C# / Vue.js 代码命名规范分析工具")
         print(f"最低严重级别: {args.severity}")
         print(f"输出格式: {args.output}")
     
-    # 收集要分析的文件
-    files_to_analyze = []
+    # 收集要分析的文件（目录模式下为生成器，分析与遍历同时进行）
+    files_to_analyze: Iterable[Path] = []
+    changed_hunks: Optional[Dict[Path, List[Tuple[int, int]]]] = None
+    
+    # 生成的文件在读取全文之前按文件名和文件开头的标记跳过
+    generated = args.generated_detector = None if args.include_generated else GeneratedFileDetector(
+        DEFAULT_NAME_PATTERNS + tuple(args.generated_patterns or ()),
+        DEFAULT_MARKERS + tuple(args.generated_markers or ())
+    )
     
     if args.files:
         # 处理指定的文件
+        selected_files = []
         for file_path in args.files:
             path = Path(file_path)
-            if path.exists() and path.suffix.lower() == '.cs':
-                files_to_analyze.append(path)
+            if path.exists() and detect_language(path) is not None:
+                selected_files.append(path)
             else:
-                print(f"警告: 跳过无效的 C# 文件: {file_path}")
+                print(f"警告: 跳过无效的源文件: {file_path}")
+        files_to_analyze = list(generated.filter(selected_files)) if generated is not None else selected_files
     
     elif args.directory:
         # 处理目录
@@ -263,26 +1035,286 @@ def main():
             print(f"错误: 目录不存在: {args.directory}")
             sys.exit(1)
         
-        files_to_analyze = find_cs_files(directory, args.exclude_patterns)
+        files_to_analyze = find_source_files(directory, args.language, args.exclude_patterns, not args.no_ignore)
+        if generated is not None:
+            files_to_analyze = generated.filter(files_to_analyze)
+    
+    elif args.diff:
+        # 处理相对基准分支的变更
+        try:
+            changed_hunks = get_changed_hunks(args.diff)
+        except GitDiffError as e:
+            print(f"错误: {e}")
+            sys.exit(1)
+        
+        extensions = selected_extensions(args.language)
+        files_to_analyze = [
+            path for path, hunks in changed_hunks.items()
+            if hunks and path.name.lower().endswith(extensions) and detect_language(path) is not None
+            and path.exists() and not is_excluded(path, args.exclude_patterns)
+        ]
+        if generated is not None:
+            files_to_analyze = list(generated.filter(files_to_analyze))
         
         if args.verbose:
-            print(f"在目录 {args.directory} 中找到 {len(files_to_analyze)} 个 C# 文件")
+            print(f"相对 {args.diff} 共有 {len(files_to_analyze)} 个变更的源文件")
+        
+        if not files_to_analyze:
+            print("没有需要分析的变更源文件")
+            sys.exit(0)
+    
+    if args.watch and not args.directory:
+        print("错误: --watch 需要与 --directory 一起使用")
+        sys.exit(1)
+    
+    if args.write_baseline and not args.baseline:
+        print("错误: --write-baseline 需要与 --baseline 一起使用")
+        sys.exit(1)
+    
+    if args.max_issues is not None and args.max_issues < 1:
+        print("错误: --max-issues 必须大于 0")
+        sys.exit(1)
+    
+    # 问题上限：--fail-fast 相当于 --max-issues 1
+    args.issue_budget = 1 if args.fail_fast else args.max_issues
+    args.stopped_early = False
+    if args.issue_budget is not None and (args.watch or args.write_baseline):
+        print("错误: --fail-fast/--max-issues 不能与 --watch 或 --write-baseline 一起使用")
+        sys.exit(1)
+    
+    if args.files and not files_to_analyze:
+        print("错误: 没有找到要分析的源文件" + describe_skipped_generated(args))
+        sys.exit(1)
+    
+    if args.backends and args.spawn_backends:
+        print("错误: --backend 和 --spawn-backends 不能同时使用")
+        sys.exit(1)
+    
+    if args.spawn_backends is not None and args.spawn_backends < 1:
+        print("错误: --spawn-backends 必须大于 0")
+        sys.exit(1)
+    
+    if args.sample:
+        if not args.directory:
+            print("错误: --sample 需要与 --directory 一起使用")
+            sys.exit(1)
+        if args.watch or args.write_baseline or args.issue_budget is not None or args.findings_db:
+            print("错误: --sample 不能与 --watch、--write-baseline、--fail-fast/--max-issues 或 --findings-db 一起使用")
+            sys.exit(1)
+        if args.sample_precision <= 0 or not 0 < args.confidence < 1:
+            print("错误: --sample-precision 必须大于 0，--confidence 必须在 0 和 1 之间")
+            sys.exit(1)
+    
+    remote = bool(args.backends or args.spawn_backends)
+    if args.dry_run and not args.fix:
+        print("错误: --dry-run 需要与 --fix 一起使用")
+        sys.exit(1)
+    
+    if args.fix and (args.watch or args.write_baseline or args.sample or remote
+                     or args.issue_budget is not None or args.findings_db):
+        print("错误: --fix 不能与 --watch、--write-baseline、--sample、--backend/--spawn-backends、"
+              "--fail-fast/--max-issues 或 --findings-db 一起使用")
+        sys.exit(1)
+    
+    if remote and args.watch:
+        print("错误: --backend/--spawn-backends 不能与 --watch 一起使用")
+        sys.exit(1)
     
-    if not files_to_analyze:
-        print("错误: 没有找到要分析的 C# 文件")
+    args.project_rules = args.project_rules or bool(args.symbol_index)
+    if args.project_rules and (args.watch or args.fix or args.sample or remote or args.issue_budget is not None):
+        print("错误: --project-rules/--symbol-index 不能与 --watch、--fix、--sample、--backend/--spawn-backends "
+              "或 --fail-fast/--max-issues 一起使用")
         sys.exit(1)
     
-    # 初始化分析器
+    # 初始化分析器；监听模式下使用常驻解析进程
     analyzer = NamingAnalyzer()
+    backend_dir = Path(__file__).parent
+    verdict_fingerprint = compute_fingerprint([backend_dir / "naming_analyzer.py", backend_dir / "identifier_features.py"])
+    if args.verdict_cache:
+        analyzer.verdict_cache.load(Path(args.verdict_cache), verdict_fingerprint)
+    try:
+        enabled_rules = analyzer.select_rules(args.severity, args.rules, args.disable_rules)
+    except ValueError as e:
+        print(f"错误: {e}")
+        sys.exit(1)
+    
+    baseline = None
+    if args.baseline:
+        baseline_path = Path(args.baseline)
+        if args.write_baseline:
+            baseline = Baseline(baseline_path.resolve().parent)
+        elif baseline_path.exists():
+            try:
+                baseline = Baseline.load(baseline_path)
+            except (OSError, ValueError) as e:
+                print(f"错误: 无法读取基线文件 {args.baseline}: {e}")
+                sys.exit(1)
+        else:
+            print(f"警告: 基线文件不存在，将报告全部问题: {args.baseline}")
+    
+    csharp_parser = CSharpParser(persistent=args.watch)
+    cache = AnalysisCache(
+        Path(args.cache_file) if args.cache_file else None,
+        compute_fingerprint([
+            backend_dir / "naming_analyzer.py",
+            backend_dir / "identifier_features.py",
+            backend_dir / "vue_parser.py",
+            csharp_parser.exe_path,
+        ])
+    )
+    context = AnalysisContext(
+        analyzer=analyzer,
+        csharp_parser=csharp_parser,
+        cache=cache,
+        profiler=Profiler() if args.profile else None,
+        enabled_rules=enabled_rules,
+        baseline=baseline,
+        write_baseline=args.write_baseline,
+        # 基线和 --diff 会在分析后再过滤问题，此时单个文件不能提前停止
+        issue_limit=args.issue_budget if baseline is None and changed_hunks is None else None
+    )
+    if args.project_rules:
+        # 索引中的路径相对索引文件所在目录；不持久化时相对当前目录
+        index_path = Path(args.symbol_index) if args.symbol_index else None
+        context.symbol_index = SymbolIndex(
+            index_path,
+            compute_fingerprint([
+                backend_dir / "symbol_index.py",
+                backend_dir / "vue_parser.py",
+                csharp_parser.exe_path,
+            ]),
+            index_path.resolve().parent if index_path is not None else Path.cwd().resolve()
+        )
+    
+    if args.verbose:
+        # 未启用项目规则时 S001-S003 不会执行，不列出
+        listed_rules = enabled_rules if args.project_rules else enabled_rules - PROJECT_RULES
+        print(f"启用的规则: {', '.join(sorted(listed_rules)) or '无'}")
+    
+    if args.fix:
+        # --diff 下只修复落在变更行内的问题
+        if changed_hunks is not None:
+            context.line_filter = lambda path, line: line_in_hunks(line, changed_hunks[path])
+        context.dry_run = args.dry_run
+        exit_code = run_fix(files_to_analyze, context, args)
+        if args.verdict_cache:
+            analyzer.verdict_cache.save(Path(args.verdict_cache), verdict_fingerprint)
+        sys.exit(exit_code)
+    
+    # 分析文件（指定后端时分片到各后端，本地缓存不参与）
+    local_backends = None
+    sharded = None
+    if remote:
+        endpoints = args.backends
+        if args.spawn_backends:
+            local_backends = LocalBackends(args.spawn_backends)
+            try:
+                endpoints = local_backends.start()
+            except RemoteAnalysisError as e:
+                print(f"错误: {e}")
+                sys.exit(1)
+            if args.verbose:
+                print(f"已启动本地后端: {', '.join(endpoints)}")
+        try:
+            sharded = ShardedAnalyzer(endpoints, {
+                "severity": args.severity,
+                "rules": args.rules,
+                "disable_rules": args.disable_rules,
+            }, batch_size=args.batch_size)
+        except ValueError as e:
+            if local_backends is not None:
+                local_backends.stop()
+            print(f"错误: {e}")
+            sys.exit(1)
+        analyze_batch = lambda paths: analyze_files_remote(paths, sharded, context)
+    else:
+        analyze_batch = lambda paths: analyze_files(paths, context, args.jobs)
+    
+    sample_report = None
+    if args.sample:
+        sample_report = run_sample(files_to_analyze, Path(args.directory), analyze_batch, args)
+        files_to_analyze = []
+    file_results = analyze_batch(files_to_analyze)
     
-    # 分析文件
     analysis_results = []
-    for file_path in files_to_analyze:
+    found_issues = 0
+    for file_path, result in file_results:
+        if result.get("cancelled"):
+            continue
         if args.verbose:
-            print(f"正在分析: {file_path}")
+            print(f"已分析: {file_path}")
         
-        result = analyze_file(file_path, analyzer)
+        if changed_hunks is not None:
+            result = filter_by_hunks(result, changed_hunks[file_path])
         analysis_results.append(result)
+        
+        found_issues += result.get("total_issues", 0)
+        if args.issue_budget is not None and found_issues >= args.issue_budget:
+            # 结论已经确定：截断到上限，取消其余文件并终止进行中的解析进程
+            excess = found_issues - args.issue_budget
+            if excess:
+                result["results"] = result["results"][:-excess]
+                result["total_issues"] = len(result["results"])
+            args.stopped_early = True
+            context.cancel_event.set()
+            csharp_parser.cancel()
+            break
+    file_results.close()
+    if sharded is not None:
+        sharded.close()
+        if args.verbose and sharded.down:
+            print(f"不可用的后端: {', '.join(sorted(sharded.down))}（重试了 {sharded.retried_batches} 个批次）")
+    if local_backends is not None:
+        local_backends.stop()
+    
+    cache.save()
+    if args.verdict_cache:
+        analyzer.verdict_cache.save(Path(args.verdict_cache), verdict_fingerprint)
+    
+    if context.profiler is not None:
+        print(context.profiler.report(args.profile), file=sys.stderr)
+    
+    if sample_report is not None:
+        if args.output == "json":
+            print_sample_json(sample_report, args)
+        else:
+            print_sample_console(sample_report, args)
+        sys.exit(0)
+    
+    if args.directory and args.verbose:
+        print(f"在目录 {args.directory} 中找到 {len(analysis_results)} 个源文件")
+        print(f"缓存命中: {cache.hits}，未命中: {cache.misses}")
+        print(f"规则判定缓存命中: {analyzer.verdict_cache.hits}，未命中: {analyzer.verdict_cache.misses}")
+    
+    if generated is not None and args.verbose:
+        for file_path, reason in generated.skipped:
+            print(f"已跳过生成的文件: {file_path}（{reason}）")
+    
+    if not analysis_results and not args.watch:
+        print("错误: 没有找到要分析的源文件" + describe_skipped_generated(args))
+        sys.exit(1)
+    
+    symbol_index = context.symbol_index
+    if symbol_index is not None:
+        if args.directory:
+            # 扫描了整个目录：从索引中删除已不存在或已被排除的文件
+            symbol_index.retain(
+                (symbol_index.key(Path(result["file"])) for result in analysis_results),
+                LANGUAGE_EXTENSIONS if args.language == "all" else [args.language]
+            )
+        project_issues = apply_project_rules(analysis_results, context, changed_hunks)
+        symbol_index.save()
+        if args.verbose:
+            print(f"符号索引: {len(symbol_index.files)} 个文件（本次更新 {symbol_index.updated} 个），"
+                  f"项目级问题 {project_issues} 个")
+    
+    if args.findings_db:
+        record_findings(Path(args.findings_db), analysis_results, args)
+    
+    if args.write_baseline:
+        baseline.save(Path(args.baseline))
+        print(f"已将 {len(baseline)} 个问题写入基线文件: {args.baseline}")
+        sys.exit(0)
     
     # 输出结果
     if args.output == "json":
@@ -290,6 +1322,11 @@ def main():
     else:
         print_console_output(analysis_results, args)
     
+    if args.watch:
+        with csharp_parser:
+            run_watch(Path(args.directory), analysis_results, context, args)
+        sys.exit(0)
+    
     # 设置退出码
     total_issues = sum(result.get("total_issues", 0) for result in analysis_results)
     if total_issues > 0:
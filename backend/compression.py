@@ -0,0 +1,172 @@
+"""
+响应压缩 - 按 Accept-Encoding 协商 br / gzip 压缩响应体（ASGI 中间件）
+
+- 客户端同时接受时优先使用 brotli（需要安装 brotli 包，未安装时只提供 gzip）
+- 小于 minimum_size 的响应和已经设置了 Content-Encoding 的响应不压缩
+- 流式响应（NDJSON）逐块压缩并立即刷新，压缩不会推迟结果的送达
+- 不论是否压缩，响应都带有 Vary: Accept-Encoding，共享缓存不会把未压缩的版本提供给所有客户端
+"""
+
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+def supported_encodings() -> Tuple[str, ...]:
+    """按优先级排列的可用编码"""
+    return ("br", "gzip") if BROTLI_AVAILABLE else ("gzip",)
+
+def negotiate_encoding(accept_encoding: str, available: Optional[Tuple[str, ...]] = None) -> Optional[str]:
+    """
+    从 Accept-Encoding 中选出响应使用的编码，不压缩时返回 None
+
+    q 值最高者优先，相同时按 available 的顺序；q=0 表示拒绝，* 匹配未列出的编码。
+    """
+    available = available or supported_encodings()
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding] = q
+
+    best, best_q = None, 0.0
+    for coding in available:
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+def vary_accept_encoding(headers: List[Tuple[bytes, bytes]]) -> List[Tuple[bytes, bytes]]:
+    """在响应头的 Vary 中加入 Accept-Encoding（合并已有的 Vary）"""
+    vary = [value for key, value in headers if key.lower() == b"vary"]
+    if any(value.strip() == b"*" or b"accept-encoding" in value.lower() for value in vary):
+        return list(headers)
+    headers = [(key, value) for key, value in headers if key.lower() != b"vary"]
+    headers.append((b"vary", b", ".join(vary + [b"Accept-Encoding"])))
+    return headers
+
+class _Encoder:
+    """一个响应的压缩器；flush 输出目前为止可以解压的全部数据"""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            # wbits=31：带 gzip 头和尾
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        if self.encoding == "br":
+            output = self._brotli.process(data)
+            return output + self._brotli.flush() if flush else output
+        output = self._zlib.compress(data)
+        return output + self._zlib.flush(zlib.Z_SYNC_FLUSH) if flush else output
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_FINISH)
+
+class CompressionMiddleware:
+    """按 Accept-Encoding 压缩 HTTP 响应体"""
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        for key, value in scope["headers"]:
+            if key == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = negotiate_encoding(accept_encoding)
+        if encoding is None:
+            async def send_with_vary(message: Dict[str, Any]):
+                if message["type"] == "http.response.start":
+                    message = {**message, "headers": vary_accept_encoding(message.get("headers", []))}
+                await send(message)
+
+            await self.app(scope, receive, send_with_vary)
+            return
+
+        responder = _CompressingSender(send, encoding, self)
+        await self.app(scope, receive, responder)
+
+class _CompressingSender:
+    """包装 send：根据第一块响应体决定是否压缩，之后逐块压缩"""
+
+    def __init__(self, send: Callable, encoding: str, options: CompressionMiddleware):
+        self.send = send
+        self.encoding = encoding
+        self.options = options
+        self.start: Optional[Dict[str, Any]] = None
+        self.encoder: Optional[_Encoder] = None
+        # 第一块响应体之后才能确定是否压缩；确定不压缩后原样转发
+        self.passthrough = False
+
+    async def __call__(self, message: Dict[str, Any]):
+        if message["type"] == "http.response.start":
+            self.start = {**message, "headers": vary_accept_encoding(message.get("headers", []))}
+            headers = message.get("headers", [])
+            if any(key.lower() == b"content-encoding" for key, _ in headers) or message["status"] in (204, 304):
+                self.passthrough = True
+                await self.send(self.start)
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.encoder is None:
+            if not more_body and len(body) < self.options.minimum_size:
+                self.passthrough = True
+                await self.send(self.start)
+                await self.send(message)
+                return
+            self.encoder = _Encoder(self.encoding, self.options.gzip_level, self.options.brotli_quality)
+            headers = self._compressed_headers()
+            if not more_body:
+                # 完整的响应体：一次压缩完成，可以给出 Content-Length
+                compressed = self.encoder.finish(body)
+                headers.append((b"content-length", str(len(compressed)).encode("latin-1")))
+                await self.send({**self.start, "headers": headers})
+                await self.send({"type": "http.response.body", "body": compressed})
+                return
+            await self.send({**self.start, "headers": headers})
+
+        if more_body:
+            chunk = self.encoder.compress(body, flush=True)
+            if chunk:
+                await self.send({"type": "http.response.body", "body": chunk, "more_body": True})
+        else:
+            await self.send({"type": "http.response.body", "body": self.encoder.finish(body)})
+
+    def _compressed_headers(self) -> List[Tuple[bytes, bytes]]:
+        # self.start 的 Vary 中已经加入了 Accept-Encoding
+        headers = [(key, value) for key, value in self.start.get("headers", []) if key.lower() != b"content-length"]
+        headers.append((b"content-encoding", self.encoding.encode("latin-1")))
+        return headers
@@ -0,0 +1,309 @@
+"""
+C# 解析器封装 - 统一调用 csharp-parser-helper，支持一次性调用和常驻进程两种模式
+
+解析器产物按以下顺序查找：环境变量 CODENAMER_CSHARP_PARSER 指定的路径、
+当前平台的自包含发布产物（publish/<rid>/）、Release 构建、Debug 构建。
+都不存在时可调用 provision() 发布一个当前平台的 Release 自包含产物。
+"""
+
+import json
+import os
+import platform
+import queue
+import subprocess
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from profiling import stage
+
+PARSER_DIR = Path(__file__).parent.parent / "csharp-parser-helper"
+PARSER_NAME = "CSharpParserHelper"
+
+# 预热时解析的示例代码
+WARMUP_CODE = "namespace Warmup { public class WarmupService { public void Run(int count) { var total = count; } } }"
+
+class CSharpParserError(Exception):
+    """C# 解析器调用失败"""
+
+def runtime_identifier() -> str:
+    """返回当前平台的 .NET RID（如 win-x64、linux-arm64）"""
+    system = platform.system().lower()
+    os_name = {"windows": "win", "darwin": "osx"}.get(system, "linux")
+    machine = platform.machine().lower()
+    arch = "arm64" if machine in ("arm64", "aarch64") else "x64"
+    return f"{os_name}-{arch}"
+
+def _executable_name() -> str:
+    return PARSER_NAME + (".exe" if sys.platform == "win32" else "")
+
+def find_parser_command() -> Optional[List[str]]:
+    """查找可用的解析器，返回启动命令；找不到时返回 None"""
+    override = os.environ.get("CODENAMER_CSHARP_PARSER")
+    if override:
+        path = Path(override)
+        if path.suffix.lower() == ".dll":
+            return ["dotnet", str(path)] if path.exists() else None
+        return [str(path)] if path.exists() else None
+
+    rid = runtime_identifier()
+    exe_name = _executable_name()
+    candidates = [
+        PARSER_DIR / "publish" / rid,
+        PARSER_DIR / "bin" / "Release" / "net8.0" / rid / "publish",
+        PARSER_DIR / "bin" / "Release" / "net8.0" / rid,
+        PARSER_DIR / "bin" / "Release" / "net8.0",
+        PARSER_DIR / "bin" / "Debug" / "net8.0",
+    ]
+    for directory in candidates:
+        if (directory / exe_name).exists():
+            return [str(directory / exe_name)]
+
+    # 没有原生启动器（如跨平台复制的构建产物）时通过 dotnet 宿主运行
+    for directory in candidates:
+        if (directory / f"{PARSER_NAME}.dll").exists():
+            return ["dotnet", str(directory / f"{PARSER_NAME}.dll")]
+    return None
+
+# 启动多个后端进程的父进程（serve.py、--spawn-backends）已经构建过解析器时设置；
+# 子进程继承该环境变量，只查找已有产物，不会同时在同一目录中执行 dotnet publish
+PROVISIONED_ENV = "CODENAMER_CSHARP_PROVISIONED"
+
+def provision_parser() -> List[str]:
+    """查找解析器，不存在时发布当前平台的 Release 自包含产物，返回启动命令"""
+    command = find_parser_command()
+    if command is not None:
+        return command
+
+    rid = runtime_identifier()
+    if os.environ.get(PROVISIONED_ENV) == "1":
+        raise CSharpParserError(f"C# 解析器不存在（启动进程构建失败）: {PARSER_DIR / 'publish' / rid}")
+    try:
+        result = subprocess.run(
+            ["dotnet", "publish", "-c", "Release", "-r", rid, "--self-contained", "true",
+             "-o", str(PARSER_DIR / "publish" / rid)],
+            cwd=PARSER_DIR,
+            capture_output=True,
+            text=True
+        )
+    except FileNotFoundError:
+        raise CSharpParserError("未找到 dotnet 命令，无法构建 C# 解析器")
+
+    if result.returncode != 0:
+        raise CSharpParserError(f"构建 C# 解析器失败: {result.stderr or result.stdout}")
+
+    command = find_parser_command()
+    if command is None:
+        raise CSharpParserError("构建完成但未找到 C# 解析器产物")
+    return command
+
+def provision_for_workers(env: Optional[Dict[str, str]] = None) -> Optional[CSharpParserError]:
+    """
+    在启动多个后端进程之前构建一次解析器，返回构建失败的错误
+
+    以 env（默认为当前进程的环境变量）启动的子进程不再各自构建（见 PROVISIONED_ENV）。
+    """
+    try:
+        provision_parser()
+        error = None
+    except CSharpParserError as e:
+        error = e
+    (os.environ if env is None else env)[PROVISIONED_ENV] = "1"
+    return error
+
+class _ServerProcess:
+    """一个 --server 常驻解析进程"""
+
+    def __init__(self, command: List[str], timeout: float):
+        self.command = command
+        self.timeout = timeout
+        self.process: Optional[subprocess.Popen] = None
+
+    def _start(self) -> subprocess.Popen:
+        if self.process is None or self.process.poll() is not None:
+            self.process = subprocess.Popen(
+                self.command + ["--server"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                encoding="utf-8",
+                bufsize=1
+            )
+        return self.process
+
+    def stop(self):
+        # 可能与 request() 并发调用（取消时），先摘下进程引用再终止
+        process, self.process = self.process, None
+        if process is not None and process.poll() is None:
+            process.kill()
+            process.wait()
+
+    def request(self, code: str) -> str:
+        process = self._start()
+        response: Dict[str, str] = {}
+
+        def exchange():
+            try:
+                process.stdin.write(json.dumps({"code": code}) + "\n")
+                process.stdin.flush()
+                response["line"] = process.stdout.readline()
+            except (OSError, ValueError) as e:
+                response["error"] = str(e)
+
+        worker = threading.Thread(target=exchange, daemon=True)
+        worker.start()
+        worker.join(self.timeout)
+
+        if worker.is_alive():
+            # 超时后进程状态不可知，直接重启
+            self.stop()
+            raise subprocess.TimeoutExpired(self.command, self.timeout)
+
+        line = response.get("line", "")
+        if not line:
+            self.stop()
+            raise CSharpParserError(f"解析器错误: {response.get('error', '常驻进程意外退出')}")
+        return line
+
+class CSharpParser:
+    """
+    C# 解析器客户端
+
+    persistent=False 时每次解析启动一个新进程（代码通过命令行参数传入）；
+    persistent=True 时维护 pool_size 个 --server 常驻进程，通过 stdin/stdout 按行交换 JSON，
+    避免每个文件都付出 .NET 进程启动和 Roslyn 加载的开销。
+    """
+
+    def __init__(self, persistent: bool = False, timeout: float = 30, pool_size: int = 1):
+        self.persistent = persistent
+        self.timeout = timeout
+        self.pool_size = max(1, pool_size)
+        self.command: Optional[List[str]] = find_parser_command()
+        self._pool: Optional["queue.Queue[_ServerProcess]"] = None
+        self._pool_lock = threading.Lock()
+        # 进行中的一次性解析进程和全部常驻进程，cancel() 时统一终止
+        self._active: List[subprocess.Popen] = []
+        self._servers: List[_ServerProcess] = []
+        self._cancelled = threading.Event()
+
+    @property
+    def exe_path(self) -> Path:
+        """解析器产物路径（未找到时为默认的 Release 发布位置）"""
+        if self.command:
+            return Path(self.command[-1])
+        return PARSER_DIR / "publish" / runtime_identifier() / _executable_name()
+
+    def is_available(self) -> bool:
+        """检查解析器产物是否存在"""
+        if self.command is None:
+            self.command = find_parser_command()
+        return self.command is not None
+
+    def provision(self):
+        """确保解析器产物存在，必要时构建"""
+        self.command = provision_parser()
+
+    def warm_up(self):
+        """用示例代码预热解析器（常驻模式下预热池中的每个进程）"""
+        for _ in range(self.pool_size if self.persistent else 1):
+            self.parse(WARMUP_CODE)
+
+    def parse(self, code: str) -> Dict[str, Any]:
+        """解析 C# 代码，返回 {"names": [...], "errors": [...]}"""
+        if not self.is_available():
+            raise CSharpParserError(f"C# 解析器不存在: {self.exe_path}")
+        if self._cancelled.is_set():
+            raise CSharpParserError("解析已取消")
+
+        if self.persistent:
+            with stage("csharp.request"):
+                output = self._request_server(code)
+        else:
+            with stage("csharp.spawn"):
+                output = self._run_once(code)
+
+        try:
+            with stage("csharp.decode"):
+                parsed_data = json.loads(output)
+        except json.JSONDecodeError as e:
+            raise CSharpParserError(f"JSON 解析错误: {str(e)}")
+
+        if "fatal" in parsed_data:
+            raise CSharpParserError(f"解析器错误: {parsed_data['fatal']}")
+        return parsed_data
+
+    def _run_once(self, code: str) -> str:
+        process = subprocess.Popen(
+            self.command + [code],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True
+        )
+        with self._pool_lock:
+            self._active.append(process)
+        try:
+            stdout, stderr = process.communicate(timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            raise
+        finally:
+            with self._pool_lock:
+                self._active.remove(process)
+
+        if self._cancelled.is_set():
+            raise CSharpParserError("解析已取消")
+        if process.returncode != 0:
+            raise CSharpParserError(f"解析器错误: {stderr}")
+        return stdout
+
+    def cancel(self):
+        """取消所有进行中和后续的解析：立即终止解析进程，之后的 parse() 直接失败"""
+        self._cancelled.set()
+        with self._pool_lock:
+            processes = list(self._active)
+            servers = list(self._servers)
+        for process in processes:
+            if process.poll() is None:
+                process.kill()
+        for server in servers:
+            server.stop()
+
+    def close(self):
+        """关闭所有常驻进程"""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is None:
+            return
+        while True:
+            try:
+                pool.get_nowait().stop()
+            except queue.Empty:
+                break
+
+    def _get_pool(self) -> "queue.Queue[_ServerProcess]":
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = queue.Queue()
+                self._servers = [_ServerProcess(self.command, self.timeout) for _ in range(self.pool_size)]
+                for server in self._servers:
+                    self._pool.put(server)
+            return self._pool
+
+    def _request_server(self, code: str) -> str:
+        pool = self._get_pool()
+        server = pool.get()
+        try:
+            if self._cancelled.is_set():
+                raise CSharpParserError("解析已取消")
+            return server.request(code)
+        finally:
+            pool.put(server)
+
+    def __enter__(self) -> "CSharpParser":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,229 @@
+"""
+源文件发现 - 基于 os.scandir 的目录遍历，支持目录剪枝、.gitignore/.codenamerignore 和排除模式
+"""
+
+import fnmatch
+import os
+import re
+from functools import lru_cache
+from pathlib import Path, PurePath
+from typing import Iterable, Iterator, List, Optional, Pattern, Tuple
+
+# 默认直接跳过、不会进入的目录
+DEFAULT_PRUNED_DIRS = frozenset({
+    ".git", ".hg", ".svn", ".vs", ".idea", "bin", "obj", "node_modules", "__pycache__"
+})
+
+IGNORE_FILE_NAMES = (".gitignore", ".codenamerignore")
+
+# 各语言对应的文件扩展名；.ts/.js 按 Vue 组合式函数（composables）解析
+LANGUAGE_EXTENSIONS = {
+    "csharp": (".cs",),
+    "vue": (".vue", ".ts", ".js"),
+}
+
+# 类型声明和压缩产物不包含有意义的命名
+SKIPPED_SUFFIXES = (".d.ts", ".min.js")
+
+# (正则, 是否为否定规则, 是否仅匹配目录)
+IgnoreRule = Tuple[Pattern, bool, bool]
+
+@lru_cache(maxsize=32)
+def _compile_exclude_patterns(patterns: Tuple[str, ...]) -> Optional[Pattern]:
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{fnmatch.translate(pattern)})" for pattern in patterns))
+
+def compile_exclude_patterns(patterns: Optional[Iterable[str]]) -> Optional[Pattern]:
+    """将多个排除 glob 预编译为一个正则（匹配文件名）"""
+    return _compile_exclude_patterns(tuple(patterns or ()))
+
+def detect_language(file_path: PurePath) -> Optional[str]:
+    """根据扩展名判断文件语言，不支持的文件返回 None"""
+    name = file_path.name.lower()
+    if name.endswith(SKIPPED_SUFFIXES):
+        return None
+    for language, extensions in LANGUAGE_EXTENSIONS.items():
+        if name.endswith(extensions):
+            return language
+    return None
+
+def _glob_to_regex(glob: str) -> str:
+    """将 gitignore 风格的 glob 转换为正则（不含锚点）"""
+    regex = []
+    i = 0
+    while i < len(glob):
+        char = glob[i]
+        if glob.startswith("**/", i):
+            regex.append("(?:.*/)?")
+            i += 3
+            continue
+        if glob.startswith("**", i):
+            regex.append(".*")
+            i += 2
+            continue
+        if char == "*":
+            regex.append("[^/]*")
+        elif char == "?":
+            regex.append("[^/]")
+        elif char == "[":
+            end = glob.find("]", i + 1)
+            if end == -1:
+                regex.append(re.escape(char))
+            else:
+                content = glob[i + 1:end]
+                if content.startswith("!"):
+                    content = "^" + content[1:]
+                regex.append(f"[{content}]")
+                i = end
+        elif char == "\\" and i + 1 < len(glob):
+            i += 1
+            regex.append(re.escape(glob[i]))
+        else:
+            regex.append(re.escape(char))
+        i += 1
+    return "".join(regex)
+
+def parse_ignore_file(path: Path) -> List[IgnoreRule]:
+    """解析 .gitignore 格式的忽略文件"""
+    rules: List[IgnoreRule] = []
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return rules
+
+    for line in lines:
+        pattern = line.rstrip()
+        if not pattern or pattern.startswith("#"):
+            continue
+
+        negate = pattern.startswith("!")
+        if negate:
+            pattern = pattern[1:]
+        dir_only = pattern.endswith("/")
+        pattern = pattern.rstrip("/")
+        if not pattern:
+            continue
+
+        # 含 "/" 的模式相对忽略文件所在目录锚定，否则可匹配任意层级
+        if "/" in pattern:
+            regex = _glob_to_regex(pattern.lstrip("/"))
+        else:
+            regex = "(?:.*/)?" + _glob_to_regex(pattern)
+        rules.append((re.compile(f"^{regex}$"), negate, dir_only))
+
+    return rules
+
+def _is_ignored(relative_path: str, is_dir: bool, rule_sets: List[Tuple[str, List[IgnoreRule]]]) -> bool:
+    """按 git 语义判断路径是否被忽略：后出现的规则优先"""
+    ignored = False
+    for base, rules in rule_sets:
+        if not relative_path.startswith(base):
+            continue
+        candidate = relative_path[len(base):]
+        for regex, negate, dir_only in rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(candidate):
+                ignored = not negate
+    return ignored
+
+def _with_local_rules(
+    directory: str,
+    prefix: str,
+    rule_sets: List[Tuple[str, List[IgnoreRule]]]
+) -> List[Tuple[str, List[IgnoreRule]]]:
+    """追加目录下忽略文件的规则（作用于前缀为 prefix 的相对路径）"""
+    local_rules = []
+    for ignore_name in IGNORE_FILE_NAMES:
+        local_rules.extend(parse_ignore_file(Path(directory) / ignore_name))
+    if local_rules:
+        return rule_sets + [(prefix, local_rules)]
+    return rule_sets
+
+def is_path_ignored(
+    directory: Path,
+    path: Path,
+    use_ignore_files: bool = True,
+    pruned_dirs: Iterable[str] = DEFAULT_PRUNED_DIRS
+) -> bool:
+    """
+    判断 directory 下的文件是否会被 iter_source_files 跳过（位于剪枝目录中或被忽略文件排除）
+
+    从根目录逐级读取沿途的 .gitignore/.codenamerignore，不在 directory 下的路径视为未忽略。
+    """
+    parts = PurePath(os.path.relpath(os.path.abspath(path), os.path.abspath(directory))).parts
+    if not parts or parts[0] == os.pardir:
+        return False
+    pruned = frozenset(pruned_dirs)
+
+    current_dir, prefix = str(directory), ""
+    rule_sets: List[Tuple[str, List[IgnoreRule]]] = []
+    for name in parts[:-1]:
+        if use_ignore_files:
+            rule_sets = _with_local_rules(current_dir, prefix, rule_sets)
+        relative_path = prefix + name
+        if name in pruned or _is_ignored(relative_path, True, rule_sets):
+            return True
+        current_dir, prefix = os.path.join(current_dir, name), relative_path + "/"
+
+    if use_ignore_files:
+        rule_sets = _with_local_rules(current_dir, prefix, rule_sets)
+    return bool(rule_sets) and _is_ignored(prefix + parts[-1], False, rule_sets)
+
+def iter_source_files(
+    directory: Path,
+    extensions: Iterable[str] = (".cs",),
+    exclude_patterns: Optional[List[str]] = None,
+    use_ignore_files: bool = True,
+    pruned_dirs: Iterable[str] = DEFAULT_PRUNED_DIRS
+) -> Iterator[Path]:
+    """
+    遍历目录并逐个产出待分析的源文件
+
+    被剪枝或被忽略的目录不会进入；以生成器形式返回，调用方可以边遍历边分析。
+    """
+    suffixes = tuple(ext.lower() for ext in extensions)
+    exclude_regex = compile_exclude_patterns(exclude_patterns)
+    pruned = frozenset(pruned_dirs)
+
+    # 栈元素: (目录路径, 相对根目录的前缀, 生效的忽略规则)
+    stack: List[Tuple[str, str, List[Tuple[str, List[IgnoreRule]]]]] = [(str(directory), "", [])]
+
+    while stack:
+        current_dir, prefix, rule_sets = stack.pop()
+
+        if use_ignore_files:
+            rule_sets = _with_local_rules(current_dir, prefix, rule_sets)
+
+        try:
+            with os.scandir(current_dir) as iterator:
+                entries = sorted(iterator, key=lambda entry: entry.name)
+        except OSError:
+            continue
+
+        subdirs = []
+        for entry in entries:
+            relative_path = prefix + entry.name
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+
+            if is_dir:
+                if entry.name in pruned or _is_ignored(relative_path, True, rule_sets):
+                    continue
+                subdirs.append((entry.path, relative_path + "/", rule_sets))
+                continue
+
+            if not entry.name.lower().endswith(suffixes):
+                continue
+            if exclude_regex is not None and exclude_regex.match(entry.name):
+                continue
+            if rule_sets and _is_ignored(relative_path, False, rule_sets):
+                continue
+            yield Path(entry.path)
+
+        # 逆序入栈以保持按名称排序的深度优先顺序
+        stack.extend(reversed(subdirs))
@@ -0,0 +1,293 @@
+"""
+问题历史库 - 把每次分析发现的问题写入本地 SQLite 数据库，之后无需重新分析即可查询统计
+
+每次运行（一次 CLI 分析或一个批量 API 请求）写入 runs 表一行，其中的问题写入 findings 表；
+findings 在 file、directory、rule_id、severity 和 run_id 上建有索引。
+一次运行的全部问题在同一个事务中批量插入，数据库使用 WAL 日志，写入开销足以在每次 CI 中开启。
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started_at REAL NOT NULL,
+    source TEXT NOT NULL,
+    project TEXT,
+    total_files INTEGER NOT NULL,
+    total_issues INTEGER NOT NULL,
+    partial INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS findings (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    file TEXT NOT NULL,
+    directory TEXT NOT NULL,
+    rule_id TEXT NOT NULL,
+    severity TEXT NOT NULL,
+    name TEXT NOT NULL,
+    line INTEGER NOT NULL,
+    message TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_started_at ON runs(started_at);
+CREATE INDEX IF NOT EXISTS findings_run ON findings(run_id);
+CREATE INDEX IF NOT EXISTS findings_file ON findings(file);
+CREATE INDEX IF NOT EXISTS findings_directory ON findings(directory);
+CREATE INDEX IF NOT EXISTS findings_rule ON findings(rule_id);
+CREATE INDEX IF NOT EXISTS findings_severity ON findings(severity);
+"""
+
+# 聚合查询可用的分组方式
+GROUP_COLUMNS = {
+    "rule": "f.rule_id",
+    "severity": "f.severity",
+    "file": "f.file",
+    "directory": "f.directory",
+    "run": "f.run_id",
+}
+
+SEVERITY_LEVELS = {"error": ("error",), "warning": ("error", "warning"), "info": ("error", "warning", "info")}
+
+@dataclass
+class RunRecord:
+    """一次待写入的运行：file_results 为 CLI/API 的逐文件结果（{file, results, ...}）"""
+    source: str
+    file_results: List[Dict[str, Any]]
+    project: Optional[str] = None
+    partial: bool = False
+    started_at: Optional[float] = None
+
+def _finding_rows(run_id: int, file_results: Iterable[Dict[str, Any]]) -> Iterator[Tuple]:
+    for file_result in file_results:
+        file_path = file_result["file"].replace("\\", "/")
+        directory = str(PurePosixPath(file_path).parent)
+        for issue in file_result.get("results", []):
+            yield (
+                run_id,
+                file_path,
+                directory,
+                issue.get("rule_id", ""),
+                issue.get("severity", "warning"),
+                issue.get("name", ""),
+                issue.get("line", 0),
+                issue.get("message", ""),
+            )
+
+class FindingsStore:
+    """问题历史库（同一个实例可在多个线程中使用）"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version not in (0, SCHEMA_VERSION):
+                self._conn.close()
+                raise ValueError(f"不支持的问题历史库版本: {version}")
+            self._conn.executescript(SCHEMA)
+            self._conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    def record_run(
+        self,
+        source: str,
+        file_results: List[Dict[str, Any]],
+        project: Optional[str] = None,
+        partial: bool = False,
+        started_at: Optional[float] = None
+    ) -> int:
+        """写入一次运行，返回运行编号"""
+        return self.record_runs([RunRecord(source, file_results, project, partial, started_at)])[0]
+
+    def record_runs(self, runs: List[RunRecord]) -> List[int]:
+        """在同一个事务中写入多次运行"""
+        run_ids = []
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for run in runs:
+                    total_issues = sum(len(result.get("results", [])) for result in run.file_results)
+                    cursor = self._conn.execute(
+                        "INSERT INTO runs (started_at, source, project, total_files, total_issues, partial) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (run.started_at or time.time(), run.source, run.project,
+                         len(run.file_results), total_issues, int(run.partial))
+                    )
+                    run_id = cursor.lastrowid
+                    self._conn.executemany(
+                        "INSERT INTO findings (run_id, file, directory, rule_id, severity, name, line, message) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        _finding_rows(run_id, run.file_results)
+                    )
+                    run_ids.append(run_id)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return run_ids
+
+    def _run_filter(
+        self,
+        since: Optional[float],
+        project: Optional[str],
+        latest: bool
+    ) -> Tuple[str, List[Any]]:
+        """运行范围的 WHERE 条件（作用于 runs 表，别名 r）"""
+        clauses, params = [], []
+        if since is not None:
+            clauses.append("r.started_at >= ?")
+            params.append(since)
+        if project is not None:
+            clauses.append("r.project IS ?")
+            params.append(project)
+        if latest:
+            inner = " AND ".join(clauses) or "1"
+            clauses = [f"r.id = (SELECT MAX(r.id) FROM runs r WHERE {inner})"]
+        return " AND ".join(clauses) or "1", params
+
+    def aggregate(
+        self,
+        group_by: str = "rule",
+        path_prefix: Optional[str] = None,
+        rules: Optional[List[str]] = None,
+        severity: Optional[str] = None,
+        since: Optional[float] = None,
+        project: Optional[str] = None,
+        latest: bool = False,
+        limit: Optional[int] = None
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        按 group_by 统计问题数，返回 (范围内的运行次数, 各分组的统计)
+
+        path_prefix 只统计该路径（文件或目录）下的问题；severity 为最低严重级别；
+        latest 为 True 时只统计范围内最近的一次运行。
+        """
+        if group_by not in GROUP_COLUMNS:
+            raise ValueError(f"无效的分组方式: {group_by}（可用: {', '.join(GROUP_COLUMNS)}）")
+
+        run_where, run_params = self._run_filter(since, project, latest)
+        clauses, params = [run_where], list(run_params)
+        if path_prefix:
+            prefix = path_prefix.replace("\\", "/").rstrip("/")
+            # 用区间比较代替 LIKE，可以走 file 索引
+            clauses.append("(f.file = ? OR (f.file >= ? AND f.file < ?))")
+            params.extend([prefix, prefix + "/", prefix + "0"])
+        if rules:
+            clauses.append(f"f.rule_id IN ({', '.join('?' * len(rules))})")
+            params.extend(rules)
+        if severity:
+            levels = SEVERITY_LEVELS[severity]
+            clauses.append(f"f.severity IN ({', '.join('?' * len(levels))})")
+            params.extend(levels)
+
+        sql = (
+            f"SELECT {GROUP_COLUMNS[group_by]} AS key, COUNT(*) AS findings, "
+            "COUNT(DISTINCT f.file) AS files, COUNT(DISTINCT f.run_id) AS runs "
+            "FROM findings f JOIN runs r ON r.id = f.run_id "
+            f"WHERE {' AND '.join(clauses)} GROUP BY key ORDER BY findings DESC, key"
+        )
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+
+        with self._lock:
+            total_runs = self._conn.execute(f"SELECT COUNT(*) FROM runs r WHERE {run_where}", run_params).fetchone()[0]
+            rows = self._conn.execute(sql, params).fetchall()
+        return total_runs, [
+            {
+                "key": key,
+                "findings": findings,
+                "files": files,
+                "runs": runs,
+                "per_run": round(findings / total_runs, 2) if total_runs else 0,
+            }
+            for key, findings, files, runs in rows
+        ]
+
+    def recent_runs(
+        self,
+        since: Optional[float] = None,
+        project: Optional[str] = None,
+        limit: int = 20
+    ) -> List[Dict[str, Any]]:
+        """最近的运行记录（新的在前）"""
+        run_where, params = self._run_filter(since, project, False)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, started_at, source, project, total_files, total_issues, partial FROM runs r "
+                f"WHERE {run_where} ORDER BY id DESC LIMIT {int(limit)}",
+                params
+            ).fetchall()
+        return [
+            {
+                "id": run_id,
+                "started_at": started_at,
+                "source": source,
+                "project": project_name,
+                "total_files": total_files,
+                "total_issues": total_issues,
+                "partial": bool(partial),
+            }
+            for run_id, started_at, source, project_name, total_files, total_issues, partial in rows
+        ]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+class FindingsWriter:
+    """
+    后台写入线程：服务端把运行记录放入队列后立即返回，
+    写入线程每次取出队列中的全部记录，在一个事务中写入
+    """
+
+    def __init__(self, store: FindingsStore, max_pending: int = 1000):
+        self.store = store
+        self.dropped = 0
+        self._queue: "queue.Queue[Optional[RunRecord]]" = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._run, name="findings-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, run: RunRecord):
+        """加入写入队列；队列已满时丢弃该记录，不阻塞分析"""
+        if run.started_at is None:
+            run.started_at = time.time()
+        try:
+            self._queue.put_nowait(run)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            runs = []
+            item = self._queue.get()
+            while True:
+                if item is None:
+                    stopping = True
+                else:
+                    runs.append(item)
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if runs:
+                try:
+                    self.store.record_runs(runs)
+                except sqlite3.Error:
+                    self.dropped += len(runs)
+
+    def close(self):
+        """写完队列中剩余的记录后关闭数据库"""
+        self._queue.put(None)
+        self._thread.join()
+        self.store.close()
@@ -0,0 +1,114 @@
+"""
+生成文件识别 - 在完整读取和解析之前跳过工具生成的源文件
+
+设计器文件、gRPC/Protobuf 桩代码、EF 迁移、源生成器输出等文件中的名称由工具决定，
+分析它们只会产生大量无关的问题。识别只看文件名和文件开头的 sniff_bytes 字节：
+- 文件名匹配生成文件的模式（如 *.g.cs、*.Designer.cs），不需要读取文件
+- 开头的注释中含有生成标记（如 <auto-generated>、@generated、Code generated by）
+
+只在注释行中查找标记，代码中恰好出现的同名字符串不会导致文件被跳过。
+"""
+
+import fnmatch
+import re
+import threading
+from pathlib import Path, PurePath
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# 默认读取的文件开头字节数
+SNIFF_BYTES = 4096
+
+# 生成文件的文件名模式（不区分大小写）
+DEFAULT_NAME_PATTERNS: Tuple[str, ...] = (
+    "*.g.cs", "*.g.i.cs", "*.designer.cs", "*.generated.cs", "*.assemblyinfo.cs",
+    "*.generated.ts", "*.generated.js", "*_pb.js", "*_pb.d.ts", "*_grpc_pb.js", "*.pb.ts",
+    # EF 迁移：20240101120000_AddUsers.cs、20240101120000_AddUsers.Designer.cs 及模型快照
+    "[0-9]" * 14 + "_*.cs", "*modelsnapshot.cs",
+)
+
+# 文件开头注释中的生成标记（不区分大小写）；单独的 "do not edit" 也常见于手写的注释，不作为标记，
+# Go 风格的 "Code generated ... DO NOT EDIT." 由 "code generated by" 识别
+DEFAULT_MARKERS: Tuple[str, ...] = (
+    "<auto-generated", "<autogenerated", "@generated", "code generated by",
+    "generated by the protocol buffer compiler", "this code was generated by a tool",
+    "this file was automatically generated", "this file is auto-generated",
+)
+
+COMMENT_PREFIXES = ("//", "/*", "*", "<!--", "#")
+
+class GeneratedFileDetector:
+    """生成文件识别（线程安全）；记录跳过的文件及原因"""
+
+    def __init__(
+        self,
+        name_patterns: Sequence[str] = DEFAULT_NAME_PATTERNS,
+        markers: Sequence[str] = DEFAULT_MARKERS,
+        sniff_bytes: int = SNIFF_BYTES
+    ):
+        self.name_pattern = (
+            re.compile("|".join(fnmatch.translate(pattern) for pattern in name_patterns), re.IGNORECASE)
+            if name_patterns else None
+        )
+        self.marker_pattern = (
+            re.compile("|".join(re.escape(marker) for marker in markers), re.IGNORECASE)
+            if markers else None
+        )
+        self.sniff_bytes = sniff_bytes
+        # (文件, 原因)
+        self.skipped: List[Tuple[str, str]] = []
+        self._lock = threading.Lock()
+
+    def match_name(self, name: str) -> bool:
+        return self.name_pattern is not None and self.name_pattern.match(PurePath(name).name) is not None
+
+    def match_header(self, head: str) -> Optional[str]:
+        """文件开头的注释中找到的生成标记，没有时为 None"""
+        if self.marker_pattern is None:
+            return None
+        in_block = False
+        for line in head.lstrip("\ufeff").splitlines():
+            stripped = line.strip()
+            if not stripped:
+                continue
+            is_comment = in_block or stripped.startswith(COMMENT_PREFIXES)
+            if stripped.startswith("/*") or stripped.startswith("<!--"):
+                in_block = "*/" not in stripped and "-->" not in stripped
+            elif in_block and ("*/" in stripped or "-->" in stripped):
+                in_block = False
+            if not is_comment:
+                continue
+            match = self.marker_pattern.search(stripped)
+            if match is not None:
+                return match.group()
+        return None
+
+    def detect(self, file_path: Path) -> Optional[str]:
+        """文件是生成文件时返回原因，否则为 None；读取失败时交给后续分析报告错误"""
+        if self.match_name(file_path.name):
+            return "文件名"
+        if self.marker_pattern is None:
+            return None
+        try:
+            with open(file_path, "rb") as f:
+                head = f.read(self.sniff_bytes)
+        except OSError:
+            return None
+        marker = self.match_header(head.decode("utf-8", errors="ignore"))
+        return f"标记 {marker}" if marker is not None else None
+
+    def record(self, name: str, reason: str):
+        with self._lock:
+            self.skipped.append((name, reason))
+
+    def filter(self, file_paths: Iterable[Path]) -> Iterator[Path]:
+        """跳过生成文件，逐个产出其余文件"""
+        for file_path in file_paths:
+            reason = self.detect(file_path)
+            if reason is None:
+                yield file_path
+            else:
+                self.record(str(file_path), reason)
+
+    @property
+    def total_skipped(self) -> int:
+        return len(self.skipped)
@@ -0,0 +1,86 @@
+"""
+Git 差异解析 - 为 CLI 的 --diff 模式提供变更文件及变更行范围
+"""
+
+import bisect
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# 匹配 unified diff 的 hunk 头，例如 "@@ -10,2 +12,3 @@"
+HUNK_HEADER_PATTERN = re.compile(r'^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@')
+
+class GitDiffError(Exception):
+    """git 命令执行失败"""
+
+def _run_git(args: List[str], cwd: Optional[Path] = None) -> str:
+    """执行 git 命令并返回标准输出"""
+    try:
+        result = subprocess.run(
+            ["git", *args],
+            cwd=cwd,
+            capture_output=True,
+            text=True,
+            encoding="utf-8"
+        )
+    except FileNotFoundError:
+        raise GitDiffError("未找到 git 命令，请确认已安装 git")
+
+    if result.returncode != 0:
+        raise GitDiffError(f"git {' '.join(args)} 执行失败: {result.stderr.strip()}")
+    return result.stdout
+
+def get_changed_hunks(base_ref: str, cwd: Optional[Path] = None) -> Dict[Path, List[Tuple[int, int]]]:
+    """
+    获取相对 base_ref 的变更文件及新增/修改行范围
+
+    以 base_ref 与 HEAD 的合并基点为比较对象，并包含工作区中尚未提交的修改，
+    返回 {文件绝对路径: [(起始行, 结束行), ...]}，行号均为新文件中的行号（闭区间）。
+    未跟踪的文件（git ls-files --others --exclude-standard，即不含被忽略的文件）整个视为变更。
+    """
+    repo_root = Path(_run_git(["rev-parse", "--show-toplevel"], cwd).strip())
+    merge_base = _run_git(["merge-base", base_ref, "HEAD"], cwd).strip()
+    diff_output = _run_git(
+        ["-c", "core.quotePath=false", "diff", "--unified=0", "--no-color", "--no-ext-diff",
+         "--diff-filter=ACMR", merge_base, "--"],
+        cwd
+    )
+
+    hunks: Dict[Path, List[Tuple[int, int]]] = {}
+    current_file: Optional[Path] = None
+
+    for line in diff_output.splitlines():
+        if line.startswith("+++ "):
+            target = line[4:]
+            current_file = repo_root / target[2:] if target.startswith("b/") else None
+            if current_file is not None:
+                hunks.setdefault(current_file, [])
+            continue
+
+        if current_file is None:
+            continue
+
+        match = HUNK_HEADER_PATTERN.match(line)
+        if match:
+            start = int(match.group(1))
+            count = int(match.group(2)) if match.group(2) is not None else 1
+            # 纯删除的 hunk 在新文件中没有对应行
+            if count > 0:
+                hunks[current_file].append((start, start + count - 1))
+
+    untracked_output = _run_git(
+        ["-c", "core.quotePath=false", "ls-files", "--others", "--exclude-standard", "-z"],
+        repo_root
+    )
+    for relative_path in untracked_output.split("\0"):
+        if relative_path:
+            hunks[repo_root / relative_path] = [(1, sys.maxsize)]
+
+    return hunks
+
+def line_in_hunks(line: int, hunks: List[Tuple[int, int]]) -> bool:
+    """判断行号是否落在变更范围内（hunks 需按起始行升序排列）"""
+    index = bisect.bisect_right(hunks, (line, float("inf"))) - 1
+    return index >= 0 and hunks[index][0] <= line <= hunks[index][1]
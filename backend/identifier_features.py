@@ -0,0 +1,157 @@
+"""
+标识符特征 - 一次遍历计算一批标识符的特征，规则以位掩码的形式对整批求值
+
+逐个名称判定时，每个名称要分别运行 PascalCase/camelCase 正则，动词检查和名词检查各按大小写拆分一次，
+每条规则再各自运行中文/特殊字符正则。IdentifierBatch 对一批名称只遍历一次，得到：
+- 长度列（array 数组）和按大小写拆分出的单词
+- 位掩码（Python 整数，第 i 位对应第 i 个名称）：大小写类别、含中文、含特殊字符、以各组前缀开头
+- 首/末单词的词表：每个不同的单词只出现一次，词性等单词级判定对每个单词只做一次
+
+规则条件是掩码之间的按位运算，在 C 层对整批一次完成；只需为结果中置位的名称生成消息。
+"""
+
+import re
+from array import array
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+CASE_PATTERN = re.compile(r"(?:(?P<pascal>[A-Z])|(?P<camel>[a-z]))[a-zA-Z0-9]*$")
+WORD_SPLIT_PATTERN = re.compile(r"[A-Z][a-z0-9]*|[a-z]+[a-z0-9]*")
+CJK_PATTERN = re.compile(r"[\u4e00-\u9fff]")
+SPECIAL_PATTERN = re.compile(r"[^\w]")
+
+def bits(indexes: Iterable[int]) -> int:
+    """由下标得到位掩码"""
+    mask = 0
+    for index in indexes:
+        mask |= 1 << index
+    return mask
+
+def iter_bits(mask: int) -> Iterator[int]:
+    """按从小到大的顺序产出掩码中置位的下标"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+class PrefixGroup:
+    """
+    一组前缀；名称以其中任一前缀开头时置位
+
+    strict 为 True 时名称必须比前缀长。每个名称记录按顺序第一个匹配的前缀的下标（未匹配为 -1）。
+    """
+
+    def __init__(self, prefixes: Sequence[str], strict: bool = False):
+        self.prefixes = tuple(prefixes)
+        self.strict = strict
+
+    def match(self, name: str) -> int:
+        if not name.startswith(self.prefixes):
+            return -1
+        for index, prefix in enumerate(self.prefixes):
+            if name.startswith(prefix) and (not self.strict or len(name) > len(prefix)):
+                return index
+        return -1
+
+class IdentifierBatch:
+    """一批名称的特征（名称在批内的下标即掩码中的位）"""
+
+    def __init__(self, names: Sequence[str], prefix_groups: Optional[Dict[str, PrefixGroup]] = None):
+        self.names = list(names)
+        self.all = (1 << len(self.names)) - 1
+        self.length = array("I")
+        self.words: List[Tuple[str, ...]] = []
+        self.pascal = 0
+        self.camel = 0
+        self.cjk = 0
+        self.special = 0
+        # 前缀组名 -> 掩码，以及每个名称匹配的前缀下标
+        self.prefix_groups = prefix_groups or {}
+        self.prefixed: Dict[str, int] = {group: 0 for group in self.prefix_groups}
+        self.prefix_ids: Dict[str, array] = {group: array("h") for group in self.prefix_groups}
+        # 首/末单词（小写）的词表，及每个单词出现在哪些名称的首/末位置
+        self.vocabulary: List[str] = []
+        self.first_word_rows: List[int] = []
+        self.last_word_rows: List[int] = []
+        self._word_ids: Dict[str, int] = {}
+        self._rows: Optional[Dict[str, int]] = None
+
+        for index, name in enumerate(self.names):
+            bit = 1 << index
+            self.length.append(len(name))
+
+            match = CASE_PATTERN.match(name)
+            if match is not None:
+                if match.lastgroup == "pascal":
+                    self.pascal |= bit
+                else:
+                    self.camel |= bit
+
+            if name.isascii():
+                # ASCII 名称不含中文；下划线之外的非字母数字字符即为特殊字符
+                if not name.replace("_", "a").isalnum():
+                    self.special |= bit
+            else:
+                if CJK_PATTERN.search(name):
+                    self.cjk |= bit
+                if SPECIAL_PATTERN.search(name):
+                    self.special |= bit
+
+            words = tuple(WORD_SPLIT_PATTERN.findall(name))
+            self.words.append(words)
+            if words:
+                self.first_word_rows[self._word_id(words[0].lower())] |= bit
+                self.last_word_rows[self._word_id(words[-1].lower())] |= bit
+
+            for group_name, group in self.prefix_groups.items():
+                prefix_id = group.match(name)
+                self.prefix_ids[group_name].append(prefix_id)
+                if prefix_id >= 0:
+                    self.prefixed[group_name] |= bit
+
+    def _word_id(self, word: str) -> int:
+        word_id = self._word_ids.get(word)
+        if word_id is None:
+            word_id = self._word_ids[word] = len(self.vocabulary)
+            self.vocabulary.append(word)
+            self.first_word_rows.append(0)
+            self.last_word_rows.append(0)
+        return word_id
+
+    def select(self, values: Iterable[str]) -> int:
+        """名称等于 values 中任一值的掩码"""
+        if self._rows is None:
+            self._rows = {}
+            for index, name in enumerate(self.names):
+                self._rows[name] = self._rows.get(name, 0) | (1 << index)
+        mask = 0
+        for value in values:
+            mask |= self._rows.get(value, 0)
+        return mask
+
+    def length_at_most(self, limit: int) -> int:
+        return bits(index for index, length in enumerate(self.length) if length <= limit)
+
+    def tail_pascal(self, offset: int) -> int:
+        """去掉前 offset 个字符后为 PascalCase 的名称的掩码（如接口名去掉 I 后）"""
+        mask = 0
+        for index, name in enumerate(self.names):
+            match = CASE_PATTERN.match(name, offset)
+            if match is not None and match.lastgroup == "pascal":
+                mask |= 1 << index
+        return mask
+
+    def first_word_mask(self, predicate: Callable[[str], bool], within: int = -1) -> int:
+        """首单词满足 predicate 的名称的掩码；只对 within 中的名称的单词求值，每个单词一次"""
+        return self._word_mask(self.first_word_rows, predicate, within)
+
+    def last_word_mask(self, predicate: Callable[[str], bool], within: int = -1) -> int:
+        """末单词满足 predicate 的名称的掩码；只对 within 中的名称的单词求值，每个单词一次"""
+        return self._word_mask(self.last_word_rows, predicate, within)
+
+    def _word_mask(self, word_rows: List[int], predicate: Callable[[str], bool], within: int) -> int:
+        mask = 0
+        for word, rows in zip(self.vocabulary, word_rows):
+            rows &= within
+            if rows and predicate(word):
+                mask |= rows
+        return mask
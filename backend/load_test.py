@@ -0,0 +1,692 @@
+#!/usr/bin/env python3
+"""
+负载测试 - 以逐级增加的并发向后端 /analyze 回放 C# 与 Vue 请求，生成饱和度报告
+
+默认在本机启动一个后端（serve.py，worker 数和 CODENAMER_* 配置可指定），也可以用 --target 指向已有的部署。
+请求内容按 --mix（语言比例）和 --sizes（大小比例）离线生成，或用 --corpus 回放目录中的真实文件。
+
+每一级并发持续 --duration 秒：每个虚拟用户使用自己的 keep-alive 连接和 X-Client-Id，
+收到响应后立即发送下一个请求（闭环）。每一级记录吞吐、延迟分位数、拒绝（429）、错误和超时比例，
+以及后端进程树的 RSS。报告中的拐点为吞吐达到峰值 90% 的最小并发：超过该并发后，
+增加的并发主要转化为排队延迟。
+"""
+
+import argparse
+import http.client
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from contextlib import nullcontext
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from file_discovery import detect_language, iter_source_files
+from remote_analysis import free_port
+
+BACKEND_DIR = Path(__file__).parent
+
+# 生成的请求中成员（方法/属性）的数量
+PAYLOAD_SIZES = {"small": 8, "medium": 40, "large": 200}
+
+# 吞吐达到峰值的该比例即视为到达拐点
+KNEE_THROUGHPUT_RATIO = 0.9
+
+WORDS = [
+    "user", "order", "item", "price", "total", "count", "name", "value", "data", "list",
+    "cache", "config", "status", "result", "request", "response", "handler", "index", "page", "token",
+]
+BAD_NAMES = ["tmp", "x", "DATA", "do_it", "flag2", "Handle_Click", "myvar", "ValueStr"]
+
+@dataclass
+class Payload:
+    language: str
+    size: str
+    body: bytes
+
+@dataclass
+class StepResult:
+    """一级并发的测量结果"""
+    concurrency: int
+    duration: float
+    requests: int = 0
+    succeeded: int = 0
+    rejected: int = 0
+    errors: int = 0
+    timeouts: int = 0
+    throughput: float = 0.0
+    latency_ms: Dict[str, float] = field(default_factory=dict)
+    rss_mb: Optional[Dict[str, float]] = None
+    error_samples: List[str] = field(default_factory=list)
+
+    @property
+    def failure_rate(self) -> float:
+        return (self.rejected + self.errors + self.timeouts) / self.requests if self.requests else 0.0
+
+def parse_ratio(value: str, choices: List[str]) -> Dict[str, float]:
+    """解析 "a=3,b=1" 形式的比例"""
+    weights = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        key, _, weight = item.partition("=")
+        key = key.strip().lower()
+        if key not in choices:
+            raise argparse.ArgumentTypeError(f"无效的取值: {key}（可用: {', '.join(choices)}）")
+        try:
+            weights[key] = float(weight) if weight else 1.0
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"无效的比例: {item}")
+        if weights[key] < 0:
+            raise argparse.ArgumentTypeError(f"比例不能为负数: {item}")
+    if not weights or sum(weights.values()) <= 0:
+        raise argparse.ArgumentTypeError(f"比例不能全为 0: {value}")
+    return weights
+
+def parse_levels(value: str) -> List[int]:
+    """解析逗号分隔的并发级别"""
+    try:
+        levels = sorted({int(item) for item in value.split(",") if item.strip()})
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"无效的并发级别: {value}")
+    if not levels or levels[0] < 1:
+        raise argparse.ArgumentTypeError(f"并发级别必须大于 0: {value}")
+    return levels
+
+def parse_env(value: str) -> Tuple[str, str]:
+    key, sep, env_value = value.partition("=")
+    if not sep or not key.startswith("CODENAMER_"):
+        raise argparse.ArgumentTypeError(f"无效的配置: {value}（格式: CODENAMER_XXX=值）")
+    return key, env_value
+
+def _identifier(rng: random.Random, style: str) -> str:
+    """按 style（pascal/camel）生成合规名称，约十分之一替换为不合规名称"""
+    if rng.random() < 0.1:
+        return rng.choice(BAD_NAMES)
+    words = rng.sample(WORDS, rng.randint(1, 3))
+    name = "".join(word.capitalize() for word in words)
+    return name if style == "pascal" else name[0].lower() + name[1:]
+
+def generate_csharp(rng: random.Random, members: int) -> str:
+    lines = ["using System;", "", "namespace LoadTest.Generated", "{",
+             f"    public class {_identifier(rng, 'pascal')}Service", "    {"]
+    for _ in range(members):
+        if rng.random() < 0.3:
+            lines.append(f"        public int {_identifier(rng, 'pascal')} {{ get; set; }}")
+            continue
+        parameter = _identifier(rng, "camel")
+        local = _identifier(rng, "camel")
+        lines.extend([
+            f"        public int {_identifier(rng, 'pascal')}(int {parameter})",
+            "        {",
+            f"            var {local} = {parameter} * {rng.randint(2, 9)};",
+            f"            return {local};",
+            "        }",
+        ])
+    lines.extend(["    }", "}", ""])
+    return "\n".join(lines)
+
+def generate_vue(rng: random.Random, members: int) -> str:
+    handler = _identifier(rng, "camel")
+    lines = ["<template>", "  <div>", f'    <button @click="{handler}">{{{{ title }}}}</button>', "  </div>",
+             "</template>", "", "<script>", "export default {",
+             "  data() {", "    return {", "      title: ''", "    }", "  },",
+             "  computed: {"]
+    for _ in range(max(1, members // 4)):
+        lines.append(f"    {_identifier(rng, 'camel')}() {{ return this.title.length }},")
+    lines.extend(["  },", "  methods: {", f"    {handler}() {{ this.title = 'clicked' }},"])
+    for _ in range(members):
+        parameter = _identifier(rng, "camel")
+        lines.extend([
+            f"    {_identifier(rng, 'camel')}({parameter}) {{",
+            f"      const {_identifier(rng, 'camel')} = {parameter} + 1",
+            f"      return {parameter}",
+            "    },",
+        ])
+    lines.extend(["  }", "}", "</script>", ""])
+    return "\n".join(lines)
+
+GENERATORS = {"csharp": generate_csharp, "vue": generate_vue}
+
+def _request_body(language: str, code: str, priority: str) -> bytes:
+    return json.dumps({"language": language, "code": code, "priority": priority}, ensure_ascii=False).encode("utf-8")
+
+def _weighted_counts(weights: Dict[str, float], total: int) -> Dict[str, int]:
+    scale = total / sum(weights.values())
+    return {key: max(1, round(weight * scale)) for key, weight in weights.items() if weight > 0}
+
+def build_payloads(
+    mix: Dict[str, float],
+    sizes: Dict[str, float],
+    count: int,
+    seed: int,
+    priority: str
+) -> List[Payload]:
+    """按语言和大小比例生成 count 个左右的请求"""
+    rng = random.Random(seed)
+    payloads = []
+    for language, language_count in _weighted_counts(mix, count).items():
+        for size, size_count in _weighted_counts(sizes, language_count).items():
+            for _ in range(size_count):
+                code = GENERATORS[language](rng, PAYLOAD_SIZES[size])
+                payloads.append(Payload(language, size, _request_body(language, code, priority)))
+    rng.shuffle(payloads)
+    return payloads
+
+def load_corpus(directory: Path, mix: Dict[str, float], count: int, seed: int, priority: str) -> List[Payload]:
+    """从目录中的 .cs/.vue 文件按语言比例抽取请求，大小按文件长度分档"""
+    rng = random.Random(seed)
+    files: Dict[str, List[Path]] = {language: [] for language in mix}
+    for file_path in iter_source_files(directory, (".cs", ".vue")):
+        language = detect_language(file_path)
+        if language in files:
+            files[language].append(file_path)
+
+    payloads = []
+    for language, language_count in _weighted_counts(mix, count).items():
+        candidates = files.get(language, [])
+        rng.shuffle(candidates)
+        for file_path in candidates[:language_count]:
+            try:
+                code = file_path.read_text(encoding="utf-8")
+            except (OSError, UnicodeDecodeError):
+                continue
+            size_bytes = len(code)
+            size = "small" if size_bytes < 2 * 1024 else "medium" if size_bytes < 16 * 1024 else "large"
+            payloads.append(Payload(language, size, _request_body(language, code, priority)))
+    rng.shuffle(payloads)
+    return payloads
+
+def _process_tree(pid: int) -> List[int]:
+    """pid 及其全部子孙进程（读取 /proc，仅 Linux）"""
+    pids, index = [pid], 0
+    while index < len(pids):
+        task_dir = Path(f"/proc/{pids[index]}/task")
+        index += 1
+        try:
+            for task in task_dir.iterdir():
+                children = (task / "children").read_text().split()
+                pids.extend(int(child) for child in children)
+        except OSError:
+            continue
+    return pids
+
+def process_tree_rss(pid: int) -> Optional[int]:
+    """进程树的 RSS 之和（字节）；无法读取 /proc 时返回 None。共享页会被重复计算"""
+    total = 0
+    found = False
+    for tree_pid in _process_tree(pid):
+        try:
+            status = Path(f"/proc/{tree_pid}/status").read_text()
+        except OSError:
+            continue
+        for line in status.splitlines():
+            if line.startswith("VmRSS:"):
+                total += int(line.split()[1]) * 1024
+                found = True
+                break
+    return total if found else None
+
+class RssSampler:
+    """在后台按固定间隔采样进程树的 RSS"""
+
+    def __init__(self, pid: int, interval: float = 0.25):
+        self.pid = pid
+        self.interval = interval
+        self.samples: List[int] = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            rss = process_tree_rss(self.pid)
+            if rss is not None:
+                self.samples.append(rss)
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> "RssSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def summary(self) -> Optional[Dict[str, float]]:
+        if not self.samples:
+            return None
+        return {
+            "mean": round(sum(self.samples) / len(self.samples) / 2 ** 20, 1),
+            "peak": round(max(self.samples) / 2 ** 20, 1),
+        }
+
+class LocalServer:
+    """在本机通过 serve.py 启动一个后端（可多 worker），用于测量不同部署配置"""
+
+    def __init__(self, workers: int, env: Dict[str, str], startup_timeout: float = 120):
+        self.workers = workers
+        self.env = env
+        self.startup_timeout = startup_timeout
+        self.process: Optional[subprocess.Popen] = None
+        self.endpoint = ""
+
+    def start(self, wait_ready: bool) -> str:
+        port = free_port()
+        env = dict(os.environ)
+        env.update(self.env)
+        self.process = subprocess.Popen(
+            [sys.executable, "serve.py", "--host", "127.0.0.1", "--port", str(port), "--workers", str(self.workers)],
+            cwd=BACKEND_DIR,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        self.endpoint = f"http://127.0.0.1:{port}"
+
+        deadline = time.monotonic() + self.startup_timeout
+        path = "/ready" if wait_ready else "/health"
+        while True:
+            status, body = _get(self.endpoint, path)
+            if status == 200:
+                break
+            if self.process.poll() is not None:
+                raise RuntimeError(f"后端进程启动失败（退出码 {self.process.returncode}）")
+            # 服务已启动但 C# 解析器无法就绪：继续测试，C# 请求会计为错误
+            parser_failed = status == 503 and b'"failed"' in body
+            if parser_failed or time.monotonic() > deadline:
+                if status is not None:
+                    print("警告: C# 解析器未就绪，C# 请求将失败", file=sys.stderr)
+                    break
+                self.stop()
+                raise RuntimeError(f"等待后端启动超时: {self.endpoint}")
+            time.sleep(0.5)
+        return self.endpoint
+
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+
+def _get(endpoint: str, path: str) -> Tuple[Optional[int], bytes]:
+    """GET 请求，返回 (状态码, 响应体)；连接失败时状态码为 None"""
+    parsed = urlsplit(endpoint)
+    connection = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=2)
+    try:
+        connection.request("GET", parsed.path.rstrip("/") + path)
+        response = connection.getresponse()
+        return response.status, response.read()
+    except (OSError, http.client.HTTPException):
+        return None, b""
+    finally:
+        connection.close()
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """最近秩法分位数"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+class _VirtualUser(threading.Thread):
+    """闭环虚拟用户：在截止时间前不断发送请求"""
+
+    def __init__(self, index: int, endpoint: str, payloads: List[Payload], deadline: float, timeout: float):
+        super().__init__(name=f"load-user-{index}", daemon=True)
+        parsed = urlsplit(endpoint)
+        self.scheme = parsed.scheme
+        self.host = parsed.hostname
+        self.port = parsed.port
+        self.path = parsed.path.rstrip("/") + "/analyze"
+        self.client_id = f"load-test-{index}"
+        self.payloads = payloads
+        # 各用户从不同的位置开始轮换请求
+        self.offset = index * 7919
+        self.deadline = deadline
+        self.timeout = timeout
+        self.latencies: List[float] = []
+        self.counts = {"requests": 0, "succeeded": 0, "rejected": 0, "errors": 0, "timeouts": 0}
+        self.error_samples: List[str] = []
+        self._connection: Optional[http.client.HTTPConnection] = None
+
+    def _connect(self) -> http.client.HTTPConnection:
+        if self._connection is None:
+            connection_class = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+            self._connection = connection_class(self.host, self.port, timeout=self.timeout)
+        return self._connection
+
+    def _drop_connection(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _error(self, message: str):
+        self.counts["errors"] += 1
+        if len(self.error_samples) < 3:
+            self.error_samples.append(message)
+
+    def run(self):
+        sequence = 0
+        while time.monotonic() < self.deadline:
+            payload = self.payloads[(self.offset + sequence) % len(self.payloads)]
+            sequence += 1
+            self.counts["requests"] += 1
+            started = time.perf_counter()
+            try:
+                connection = self._connect()
+                connection.request("POST", self.path, body=payload.body, headers={
+                    "Content-Type": "application/json",
+                    "X-Client-Id": self.client_id,
+                })
+                response = connection.getresponse()
+                data = response.read()
+            except (socket.timeout, TimeoutError):
+                self.counts["timeouts"] += 1
+                self._drop_connection()
+                continue
+            except (OSError, http.client.HTTPException) as e:
+                self._error(f"{type(e).__name__}: {e}")
+                self._drop_connection()
+                # 连接被拒绝等错误立即重试会空转，稍作等待
+                time.sleep(0.05)
+                continue
+            elapsed = time.perf_counter() - started
+            if response.will_close:
+                self._drop_connection()
+
+            if response.status == 200:
+                self.counts["succeeded"] += 1
+                self.latencies.append(elapsed)
+            elif response.status == 429:
+                self.counts["rejected"] += 1
+                # 闭环客户端按 Retry-After 退避会让负载低于设定的并发，这里只短暂等待
+                time.sleep(0.01)
+            else:
+                self._error(f"HTTP {response.status} ({payload.language}): {data[:120].decode('utf-8', 'replace')}")
+        self._drop_connection()
+
+def run_step(
+    endpoint: str,
+    payloads: List[Payload],
+    concurrency: int,
+    duration: float,
+    timeout: float,
+    server_pid: Optional[int]
+) -> StepResult:
+    """以 concurrency 个虚拟用户持续 duration 秒，返回测量结果"""
+    started = time.monotonic()
+    deadline = started + duration
+    users = [_VirtualUser(index, endpoint, payloads, deadline, timeout) for index in range(concurrency)]
+    sampler = RssSampler(server_pid) if server_pid is not None else None
+    with sampler if sampler is not None else nullcontext():
+        for user in users:
+            user.start()
+        for user in users:
+            user.join()
+    elapsed = time.monotonic() - started
+
+    result = StepResult(concurrency=concurrency, duration=round(elapsed, 2))
+    latencies: List[float] = []
+    for user in users:
+        latencies.extend(user.latencies)
+        for key, value in user.counts.items():
+            setattr(result, key, getattr(result, key) + value)
+        result.error_samples.extend(user.error_samples[:3 - len(result.error_samples)])
+    latencies.sort()
+    result.throughput = round(result.succeeded / elapsed, 2) if elapsed else 0.0
+    result.latency_ms = {
+        name: round(percentile(latencies, fraction) * 1000, 1)
+        for name, fraction in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99))
+    }
+    result.latency_ms["max"] = round(latencies[-1] * 1000, 1) if latencies else 0.0
+    if sampler is not None:
+        result.rss_mb = sampler.summary()
+    return result
+
+def find_knee(steps: List[StepResult], max_failure_rate: float) -> Dict[str, Optional[int]]:
+    """
+    拐点：吞吐达到峰值 KNEE_THROUGHPUT_RATIO 的最小并发；
+    饱和点：失败（拒绝、错误、超时）比例首次超过 max_failure_rate 的并发
+    """
+    peak = max((step.throughput for step in steps), default=0.0)
+    knee = next((step.concurrency for step in steps if peak and step.throughput >= peak * KNEE_THROUGHPUT_RATIO), None)
+    saturated = next((step.concurrency for step in steps if step.failure_rate > max_failure_rate), None)
+    peak_step = next((step for step in steps if step.throughput == peak), None)
+    return {
+        "knee_concurrency": knee,
+        "peak_throughput": peak,
+        "peak_concurrency": peak_step.concurrency if peak_step else None,
+        "saturated_concurrency": saturated,
+    }
+
+def print_report(report: Dict, file=sys.stdout):
+    print(f"=== 负载测试: {report['label']} ===", file=file)
+    config = report["config"]
+    print(f"目标: {config['target']}  请求: {config['payloads']} 个（{config['mix_summary']}）  "
+          f"每级 {config['duration']} 秒", file=file)
+    print(f"{'并发':>6} {'请求':>8} {'吞吐/秒':>9} {'p50(ms)':>9} {'p90(ms)':>9} {'p99(ms)':>9} "
+          f"{'拒绝':>7} {'错误':>7} {'超时':>7} {'RSS均值(MB)':>12} {'RSS峰值(MB)':>12}", file=file)
+    for step in report["steps"]:
+        requests = step["requests"] or 1
+        rss = step["rss_mb"] or {}
+        print(
+            f"{step['concurrency']:>6} {step['requests']:>8} {step['throughput']:>9.1f} "
+            f"{step['latency_ms']['p50']:>9.1f} {step['latency_ms']['p90']:>9.1f} {step['latency_ms']['p99']:>9.1f} "
+            f"{step['rejected'] / requests:>7.1%} {step['errors'] / requests:>7.1%} {step['timeouts'] / requests:>7.1%} "
+            f"{rss.get('mean', '-'):>12} {rss.get('peak', '-'):>12}",
+            file=file
+        )
+
+    summary = report["summary"]
+    print("", file=file)
+    if summary["knee_concurrency"] is None:
+        print("没有成功的请求，无法确定拐点", file=file)
+    else:
+        print(f"峰值吞吐: {summary['peak_throughput']:.1f} 请求/秒（并发 {summary['peak_concurrency']}）", file=file)
+        print(f"拐点: 并发 {summary['knee_concurrency']}（吞吐达到峰值的 {KNEE_THROUGHPUT_RATIO:.0%}，"
+              f"更高并发主要增加延迟）", file=file)
+    if summary["saturated_concurrency"] is not None:
+        print(f"饱和: 并发 {summary['saturated_concurrency']} 时失败比例超过 {config['max_failure_rate']:.0%}", file=file)
+    for step in report["steps"]:
+        for sample in step["error_samples"]:
+            print(f"  错误示例（并发 {step['concurrency']}）: {sample}", file=file)
+
+def print_comparison(reports: List[Dict]):
+    """对比多份报告（不同部署配置）的峰值吞吐和拐点"""
+    width = max([4] + [len(report["label"]) for report in reports])
+    print(f"{'配置':<{width}} {'峰值吞吐/秒':>11} {'拐点并发':>8} {'拐点p99(ms)':>12} {'饱和并发':>8} {'RSS峰值(MB)':>12}")
+    for report in reports:
+        summary = report["summary"]
+        knee_step = next((step for step in report["steps"] if step["concurrency"] == summary["knee_concurrency"]), None)
+        peaks = [step["rss_mb"]["peak"] for step in report["steps"] if step["rss_mb"]]
+        print(
+            f"{report['label']:<{width}} {summary['peak_throughput']:>11.1f} "
+            f"{summary['knee_concurrency'] if summary['knee_concurrency'] is not None else '-':>8} "
+            f"{knee_step['latency_ms']['p99'] if knee_step else '-':>12} "
+            f"{summary['saturated_concurrency'] if summary['saturated_concurrency'] is not None else '-':>8} "
+            f"{max(peaks) if peaks else '-':>12}"
+        )
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="对 CodeNamer API 进行负载测试，生成饱和度报告",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+示例用法:
+  %(prog)s --workers 2 --concurrency 1,2,4,8,16,32 --report w2.json
+  %(prog)s --workers 4 --env CODENAMER_MAX_QUEUE=128 --label w4-q128 --report w4.json
+  %(prog)s --target http://10.0.0.1:8000 --mix csharp=1,vue=3 --duration 30
+  %(prog)s --corpus ../src --sizes small=1
+  %(prog)s --compare w2.json w4.json
+        """
+    )
+    target = parser.add_argument_group("目标")
+    target.add_argument("--target", help="已运行的后端地址；不指定时在本机启动一个后端")
+    target.add_argument("--workers", type=int, default=1, help="本机启动的后端 worker 进程数（默认: 1）")
+    target.add_argument(
+        "--env",
+        type=parse_env,
+        action="append",
+        default=[],
+        help="本机后端的配置，如 CODENAMER_MAX_WORKERS=4（可重复）"
+    )
+
+    load = parser.add_argument_group("负载")
+    load.add_argument(
+        "--concurrency",
+        type=parse_levels,
+        default=[1, 2, 4, 8, 16, 32],
+        help="逐级测试的并发数，逗号分隔（默认: 1,2,4,8,16,32）"
+    )
+    load.add_argument("--duration", type=float, default=10, help="每级并发的持续时间（秒，默认: 10）")
+    load.add_argument("--warmup", type=float, default=2, help="正式测量前的预热时间（秒，默认: 2，不计入结果）")
+    load.add_argument("--timeout", type=float, default=30, help="单个请求的超时（秒，默认: 30）")
+    load.add_argument(
+        "--mix",
+        type=lambda value: parse_ratio(value, list(GENERATORS)),
+        default={"csharp": 1.0, "vue": 1.0},
+        help="语言比例（默认: csharp=1,vue=1）"
+    )
+    load.add_argument(
+        "--sizes",
+        type=lambda value: parse_ratio(value, list(PAYLOAD_SIZES)),
+        default={"small": 5.0, "medium": 3.0, "large": 1.0},
+        help="生成请求的大小比例（默认: small=5,medium=3,large=1）"
+    )
+    load.add_argument("--payloads", type=int, default=200, help="生成或抽取的不同请求数（默认: 200）")
+    load.add_argument("--corpus", help="回放该目录中的 .cs/.vue 文件，而不是生成请求")
+    load.add_argument("--priority", choices=["interactive", "bulk"], default="interactive", help="请求优先级")
+    load.add_argument("--seed", type=int, default=0, help="请求生成的随机种子（默认: 0）")
+    load.add_argument(
+        "--max-failure-rate",
+        type=float,
+        default=0.01,
+        help="失败比例超过该值视为饱和（默认: 0.01）"
+    )
+    load.add_argument(
+        "--stop-failure-rate",
+        type=float,
+        default=0.5,
+        help="某级失败比例超过该值时不再测试更高的并发（默认: 0.5）"
+    )
+
+    output = parser.add_argument_group("输出")
+    output.add_argument("--label", help="报告中的配置名称（默认根据 worker 数和配置生成）")
+    output.add_argument("--report", help="把报告保存为 JSON 文件，供 --compare 对比")
+    output.add_argument(
+        "--output", "-o",
+        choices=["console", "json"],
+        default="console",
+        help="输出格式（默认: console）"
+    )
+    output.add_argument("--compare", nargs="+", metavar="REPORT", help="对比已保存的报告，不进行测试")
+    return parser.parse_args()
+
+def default_label(args: argparse.Namespace) -> str:
+    if args.target:
+        return args.target
+    return ",".join([f"workers={args.workers}"] + [f"{key[len('CODENAMER_'):].lower()}={value}" for key, value in args.env])
+
+def main():
+    args = parse_arguments()
+
+    if args.compare:
+        reports = []
+        for report_path in args.compare:
+            try:
+                reports.append(json.loads(Path(report_path).read_text(encoding="utf-8")))
+            except (OSError, ValueError) as e:
+                print(f"错误: 无法读取报告 {report_path}: {e}")
+                sys.exit(1)
+        print_comparison(reports)
+        return
+
+    if args.workers < 1 or args.duration <= 0 or args.timeout <= 0 or args.payloads < 1:
+        print("错误: --workers、--duration、--timeout 和 --payloads 必须大于 0")
+        sys.exit(1)
+
+    if args.corpus:
+        corpus = Path(args.corpus)
+        if not corpus.is_dir():
+            print(f"错误: 目录不存在: {args.corpus}")
+            sys.exit(1)
+        payloads = load_corpus(corpus, args.mix, args.payloads, args.seed, args.priority)
+    else:
+        payloads = build_payloads(args.mix, args.sizes, args.payloads, args.seed, args.priority)
+    if not payloads:
+        print("错误: 没有可用的请求")
+        sys.exit(1)
+
+    server = None
+    if args.target:
+        endpoint = args.target if "://" in args.target else f"http://{args.target}"
+        if _get(endpoint, "/health")[0] != 200:
+            print(f"错误: 无法连接后端: {endpoint}")
+            sys.exit(1)
+    else:
+        server = LocalServer(args.workers, dict(args.env))
+        print(f"正在启动后端（{args.workers} 个 worker）...", file=sys.stderr)
+        try:
+            endpoint = server.start(wait_ready="csharp" in args.mix)
+        except RuntimeError as e:
+            print(f"错误: {e}")
+            sys.exit(1)
+
+    languages: Dict[str, int] = {}
+    for payload in payloads:
+        languages[payload.language] = languages.get(payload.language, 0) + 1
+    report = {
+        "label": args.label or default_label(args),
+        "config": {
+            "target": endpoint,
+            "workers": None if args.target else args.workers,
+            "env": dict(args.env),
+            "duration": args.duration,
+            "payloads": len(payloads),
+            "mix_summary": ", ".join(f"{language} {count}" for language, count in sorted(languages.items())),
+            "source": str(args.corpus) if args.corpus else "generated",
+            "priority": args.priority,
+            "max_failure_rate": args.max_failure_rate,
+        },
+        "steps": [],
+    }
+
+    server_pid = server.process.pid if server is not None else None
+    try:
+        if args.warmup > 0:
+            run_step(endpoint, payloads, args.concurrency[0], args.warmup, args.timeout, None)
+        for concurrency in args.concurrency:
+            print(f"并发 {concurrency}...", file=sys.stderr)
+            step = run_step(endpoint, payloads, concurrency, args.duration, args.timeout, server_pid)
+            report["steps"].append(step)
+            if step.failure_rate > args.stop_failure_rate:
+                print(f"并发 {concurrency} 时失败比例为 {step.failure_rate:.0%}，停止提高并发", file=sys.stderr)
+                break
+    except KeyboardInterrupt:
+        print("已中断，报告只包含已完成的并发级别", file=sys.stderr)
+    finally:
+        if server is not None:
+            server.stop()
+
+    report["summary"] = find_knee(report["steps"], args.max_failure_rate)
+    report["steps"] = [asdict(step) for step in report["steps"]]
+
+    if args.report:
+        Path(args.report).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    if args.output == "json":
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print_report(report)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,615 @@
+#!/usr/bin/env python3
+"""
+CodeNamer 语言服务器 - 通过 stdio 提供 Language Server Protocol 支持
+
+编辑器启动 `python lsp_server.py` 后以 JSON-RPC（Content-Length 分帧）通信。
+NamingAnalyzer、VueParser 和常驻的 C# 解析进程在整个会话中只创建一次；
+文档使用增量同步，内容变化后静默 debounce 秒再分析。同一文档有新版本时，
+旧版本的分析在下一个问题处放弃，不再发布过期的诊断。
+诊断附带建议名称，textDocument/codeAction 返回对应的重命名快速修复：编辑由 auto_fix.plan_fixes
+在当前文档上生成，覆盖名称的全部引用；plan_fixes 判定不能安全重命名时不提供快速修复。
+"""
+
+import argparse
+import json
+import queue
+import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import PurePosixPath
+from typing import Any, BinaryIO, Dict, FrozenSet, List, Optional, Set, Tuple
+from urllib.parse import unquote, urlparse
+
+from auto_fix import plan_fixes
+from csharp_parser import CSharpParser, CSharpParserError
+from file_discovery import detect_language
+from naming_analyzer import NamingAnalyzer
+from rule_list import parse_rule_list
+from vue_parser import VueParser
+
+SERVER_NAME = "codenamer"
+
+# LSP 常量
+TEXT_DOCUMENT_SYNC_INCREMENTAL = 2
+SEVERITY_CODES = {"error": 1, "warning": 2, "info": 3}
+MESSAGE_TYPE_WARNING = 2
+
+# JSON-RPC 错误码
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+SERVER_NOT_INITIALIZED = -32002
+REQUEST_CANCELLED = -32800
+
+LANGUAGE_IDS = {
+    "csharp": "csharp",
+    "vue": "vue",
+    "typescript": "vue",
+    "javascript": "vue",
+}
+
+class ResponseError(Exception):
+    """请求处理失败，以 JSON-RPC 错误返回给客户端"""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+class JsonRpcConnection:
+    """基于 Content-Length 分帧的 JSON-RPC 连接"""
+
+    def __init__(self, reader: BinaryIO, writer: BinaryIO):
+        self.reader = reader
+        self.writer = writer
+        self._write_lock = threading.Lock()
+
+    def read_message(self) -> Optional[Dict[str, Any]]:
+        """读取一条消息；输入结束时返回 None"""
+        content_length = None
+        while True:
+            header = self.reader.readline()
+            if not header:
+                return None
+            header = header.strip()
+            if not header:
+                break
+            field, _, value = header.decode("ascii").partition(":")
+            if field.strip().lower() == "content-length":
+                content_length = int(value.strip())
+
+        if content_length is None:
+            raise ResponseError(PARSE_ERROR, "Missing Content-Length header")
+        body = self.reader.read(content_length)
+        try:
+            return json.loads(body.decode("utf-8"))
+        except ValueError as e:
+            raise ResponseError(PARSE_ERROR, str(e))
+
+    def send(self, message: Dict[str, Any]):
+        body = json.dumps({"jsonrpc": "2.0", **message}, ensure_ascii=False).encode("utf-8")
+        with self._write_lock:
+            self.writer.write(f"Content-Length: {len(body)}\r\n\r\n".encode("ascii") + body)
+            self.writer.flush()
+
+    def notify(self, method: str, params: Any):
+        self.send({"method": method, "params": params})
+
+@dataclass
+class Document:
+    uri: str
+    language: str
+    script_only: bool
+    text: str
+    version: int
+    # 最近一次发布诊断时的版本、解析出的声明和问题（快速修复的输入）
+    analyzed_version: Optional[int] = None
+    names: List[Dict[str, Any]] = field(default_factory=list)
+    findings: List[Dict[str, Any]] = field(default_factory=list)
+
+def uri_to_path(uri: str) -> PurePosixPath:
+    return PurePosixPath(unquote(urlparse(uri).path))
+
+def document_language(uri: str, language_id: str) -> Optional[Tuple[str, bool]]:
+    """文档对应的 (分析语言, 是否为纯脚本文件)；不支持的文档返回 None"""
+    path = uri_to_path(uri)
+    language = detect_language(path) or LANGUAGE_IDS.get(language_id)
+    if language is None:
+        return None
+    script_only = language == "vue" and path.suffix.lower() != ".vue" and language_id != "vue"
+    return language, script_only
+
+def to_column(text: str, column: int, utf16: bool) -> int:
+    """把行内的 Python 字符下标转换为 LSP 列号"""
+    if not utf16:
+        return column
+    return column + sum(1 for char in text[:column] if ord(char) > 0xFFFF)
+
+def from_column(text: str, column: int, utf16: bool) -> int:
+    """把 LSP 列号转换为行内的 Python 字符下标"""
+    if not utf16:
+        return min(column, len(text))
+    units = 0
+    for index, char in enumerate(text):
+        if units >= column:
+            return index
+        units += 2 if ord(char) > 0xFFFF else 1
+    return len(text)
+
+def position_to_offset(text: str, position: Dict[str, int], utf16: bool) -> int:
+    """把 LSP 位置转换为文本中的字符偏移"""
+    line_start = 0
+    for _ in range(position["line"]):
+        newline = text.find("\n", line_start)
+        if newline == -1:
+            return len(text)
+        line_start = newline + 1
+    line_end = text.find("\n", line_start)
+    if line_end == -1:
+        line_end = len(text)
+    return line_start + from_column(text[line_start:line_end], position["character"], utf16)
+
+def offset_to_position(text: str, offset: int, utf16: bool) -> Dict[str, int]:
+    """把文本中的字符偏移转换为 LSP 位置"""
+    line_start = text.rfind("\n", 0, offset) + 1
+    return {
+        "line": text.count("\n", 0, offset),
+        "character": to_column(text[line_start:offset], offset - line_start, utf16),
+    }
+
+def apply_content_change(text: str, change: Dict[str, Any], utf16: bool) -> str:
+    """应用一条 didChange 内容变更（带 range 为增量变更，否则为全文替换）"""
+    if "range" not in change:
+        return change["text"]
+    start = position_to_offset(text, change["range"]["start"], utf16)
+    end = position_to_offset(text, change["range"]["end"], utf16)
+    return text[:start] + change["text"] + text[end:]
+
+class CodeNamerLanguageServer:
+    """常驻的命名规范语言服务器"""
+
+    def __init__(
+        self,
+        connection: JsonRpcConnection,
+        analyzer: NamingAnalyzer,
+        enabled_rules: Optional[FrozenSet[str]] = None,
+        debounce: float = 0.3,
+        csharp_pool: int = 1
+    ):
+        self.connection = connection
+        self.analyzer = analyzer
+        self.enabled_rules = enabled_rules
+        self.debounce = debounce
+        self.vue_parser = VueParser()
+        self.csharp_parser = CSharpParser(persistent=True, pool_size=csharp_pool)
+        self.executor = ThreadPoolExecutor(max_workers=max(2, csharp_pool), thread_name_prefix="lsp-analysis")
+        self.documents: Dict[str, Document] = {}
+        self.utf16 = True
+        self.initialized = False
+        self.shutdown_requested = False
+        self._timers: Dict[str, threading.Timer] = {}
+        self._lock = threading.Lock()
+        self._incoming: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        self._cancelled_requests: Set[Any] = set()
+        self._csharp_warning_sent = False
+
+    # ---- 消息循环 ----
+
+    def serve(self) -> int:
+        """处理消息直到收到 exit 或输入结束，返回进程退出码"""
+        reader = threading.Thread(target=self._read_loop, name="lsp-reader", daemon=True)
+        reader.start()
+        try:
+            while True:
+                message = self._incoming.get()
+                if message is None:
+                    return 0 if self.shutdown_requested else 1
+                if message.get("method") == "exit":
+                    return 0 if self.shutdown_requested else 1
+                self._dispatch(message)
+        finally:
+            self.close()
+
+    def _read_loop(self):
+        """读取线程：取消通知立即生效，其余消息按顺序交给主循环"""
+        while True:
+            try:
+                message = self.connection.read_message()
+            except ResponseError as e:
+                self.connection.send({"id": None, "error": {"code": e.code, "message": e.message}})
+                continue
+            if message is None:
+                self._incoming.put(None)
+                return
+            if message.get("method") == "$/cancelRequest":
+                with self._lock:
+                    self._cancelled_requests.add(message.get("params", {}).get("id"))
+                continue
+            self._incoming.put(message)
+            if message.get("method") == "exit":
+                # 不再读取 stdin，避免解释器退出时读取线程仍持有 stdin 的锁
+                return
+
+    def _dispatch(self, message: Dict[str, Any]):
+        method = message.get("method")
+        request_id = message.get("id")
+        is_request = "id" in message
+
+        if method is None:
+            # 客户端对服务端请求的响应，本服务器不发请求，忽略即可
+            return
+
+        if is_request:
+            with self._lock:
+                cancelled = request_id in self._cancelled_requests
+                self._cancelled_requests.discard(request_id)
+            if cancelled:
+                self._reply_error(request_id, REQUEST_CANCELLED, "Request cancelled")
+                return
+
+        handler = self.REQUEST_HANDLERS.get(method) if is_request else self.NOTIFICATION_HANDLERS.get(method)
+        if handler is None:
+            if is_request:
+                self._reply_error(request_id, METHOD_NOT_FOUND, f"Method not found: {method}")
+            return
+
+        if not self.initialized and method != "initialize":
+            if is_request:
+                self._reply_error(request_id, SERVER_NOT_INITIALIZED, "Server not initialized")
+            return
+
+        params = message.get("params") or {}
+        try:
+            result = handler(self, params)
+        except ResponseError as e:
+            if is_request:
+                self._reply_error(request_id, e.code, e.message)
+            return
+        except Exception as e:
+            if is_request:
+                self._reply_error(request_id, INVALID_REQUEST, f"{type(e).__name__}: {e}")
+            else:
+                self._log(f"处理 {method} 失败: {e}")
+            return
+
+        if is_request:
+            self.connection.send({"id": request_id, "result": result})
+
+    def _reply_error(self, request_id: Any, code: int, message: str):
+        self.connection.send({"id": request_id, "error": {"code": code, "message": message}})
+
+    def _log(self, message: str, message_type: int = 4):
+        self.connection.notify("window/logMessage", {"type": message_type, "message": message})
+
+    # ---- 生命周期 ----
+
+    def on_initialize(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        encodings = params.get("capabilities", {}).get("general", {}).get("positionEncodings", [])
+        self.utf16 = "utf-32" not in encodings
+        self.initialized = True
+
+        options = params.get("initializationOptions") or {}
+        if "debounce" in options:
+            self.debounce = float(options["debounce"])
+
+        return {
+            "capabilities": {
+                "positionEncoding": "utf-16" if self.utf16 else "utf-32",
+                "textDocumentSync": {
+                    "openClose": True,
+                    "change": TEXT_DOCUMENT_SYNC_INCREMENTAL,
+                },
+                "codeActionProvider": {"codeActionKinds": ["quickfix"]},
+            },
+            "serverInfo": {"name": SERVER_NAME},
+        }
+
+    def on_initialized(self, params: Dict[str, Any]):
+        pass
+
+    def on_shutdown(self, params: Dict[str, Any]) -> None:
+        self.shutdown_requested = True
+        return None
+
+    def close(self):
+        with self._lock:
+            timers = list(self._timers.values())
+            self._timers.clear()
+            self.documents.clear()
+        for timer in timers:
+            timer.cancel()
+        self.csharp_parser.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.csharp_parser.close()
+
+    # ---- 文档同步 ----
+
+    def on_did_open(self, params: Dict[str, Any]):
+        item = params["textDocument"]
+        detected = document_language(item["uri"], item.get("languageId", ""))
+        if detected is None:
+            return
+        language, script_only = detected
+        with self._lock:
+            self.documents[item["uri"]] = Document(
+                uri=item["uri"],
+                language=language,
+                script_only=script_only,
+                text=item["text"],
+                version=item.get("version", 0)
+            )
+        # 打开文档时立即分析
+        self._schedule(item["uri"], delay=0)
+
+    def on_did_change(self, params: Dict[str, Any]):
+        identifier = params["textDocument"]
+        uri = identifier["uri"]
+        with self._lock:
+            document = self.documents.get(uri)
+            if document is None:
+                return
+            text = document.text
+            for change in params.get("contentChanges", []):
+                text = apply_content_change(text, change, self.utf16)
+            document.text = text
+            document.version = identifier.get("version", document.version + 1)
+        self._schedule(uri, delay=self.debounce)
+
+    def on_did_close(self, params: Dict[str, Any]):
+        uri = params["textDocument"]["uri"]
+        with self._lock:
+            self.documents.pop(uri, None)
+            timer = self._timers.pop(uri, None)
+        if timer is not None:
+            timer.cancel()
+        self.connection.notify("textDocument/publishDiagnostics", {"uri": uri, "diagnostics": []})
+
+    def on_did_save(self, params: Dict[str, Any]):
+        pass
+
+    # ---- 分析 ----
+
+    def _schedule(self, uri: str, delay: float):
+        """（重新）安排文档的分析；连续修改时只在最后一次修改静默 delay 秒后分析"""
+        timer = threading.Timer(delay, self._submit, args=(uri,))
+        timer.daemon = True
+        with self._lock:
+            previous = self._timers.get(uri)
+            self._timers[uri] = timer
+        if previous is not None:
+            previous.cancel()
+        timer.start()
+
+    def _submit(self, uri: str):
+        with self._lock:
+            document = self.documents.get(uri)
+            if document is None:
+                return
+            snapshot = (document.language, document.script_only, document.text, document.version)
+        try:
+            self.executor.submit(self._analyze, uri, *snapshot)
+        except RuntimeError:
+            # 服务器正在关闭
+            pass
+
+    def _is_current(self, uri: str, version: int) -> bool:
+        document = self.documents.get(uri)
+        return document is not None and document.version == version
+
+    def _analyze(self, uri: str, language: str, script_only: bool, text: str, version: int):
+        if not self._is_current(uri, version):
+            return
+
+        try:
+            if language == "vue":
+                if script_only:
+                    parsed_data = self.vue_parser.parse_script_file(text)
+                else:
+                    parsed_data = self.vue_parser.parse_vue_file(text)
+            else:
+                if not self.csharp_parser.is_available():
+                    if not self._csharp_warning_sent:
+                        self._csharp_warning_sent = True
+                        self.connection.notify("window/showMessage", {
+                            "type": MESSAGE_TYPE_WARNING,
+                            "message": f"C# 解析器不存在，请先构建: {self.csharp_parser.exe_path}",
+                        })
+                    return
+                parsed_data = self.csharp_parser.parse(text)
+        except CSharpParserError as e:
+            self._log(f"解析 {uri} 失败: {e}")
+            return
+
+        lines = text.split("\n")
+        diagnostics = []
+        findings = []
+        for finding in self.analyzer.iter_findings(parsed_data, language, self.enabled_rules):
+            # 文档已有新版本，放弃本次分析
+            if not self._is_current(uri, version):
+                return
+            findings.append(finding.dict())
+            diagnostics.append(self._to_diagnostic(findings[-1], lines))
+        for error in parsed_data.get("errors", []):
+            diagnostics.append(self._error_diagnostic(error, lines))
+
+        with self._lock:
+            if not self._is_current(uri, version):
+                return
+            document = self.documents[uri]
+            document.analyzed_version = version
+            document.names = parsed_data.get("names", [])
+            document.findings = findings
+            self.connection.notify("textDocument/publishDiagnostics", {
+                "uri": uri,
+                "version": version,
+                "diagnostics": diagnostics,
+            })
+
+    def _name_range(
+        self,
+        name: str,
+        line: int,
+        lines: List[str],
+        span: Optional[Dict[str, int]] = None
+    ) -> Dict[str, Any]:
+        """名称的范围：优先使用解析器给出的精确位置，否则在所在行中查找；找不到名称时覆盖整行"""
+        if span is not None and 0 < span["line"] <= len(lines):
+            text = lines[span["line"] - 1]
+            start, end = span["column"], span["column"] + span["length"]
+            if text[start:end] == name:
+                return {
+                    "start": {"line": span["line"] - 1, "character": to_column(text, start, self.utf16)},
+                    "end": {"line": span["line"] - 1, "character": to_column(text, end, self.utf16)},
+                }
+
+        row = max(0, min(line - 1, len(lines) - 1))
+        text = lines[row] if lines else ""
+        match = re.search(r"(?<![\w$])" + re.escape(name) + r"(?![\w$])", text) if name else None
+        start, end = (match.start(), match.end()) if match else (0, len(text))
+        return {
+            "start": {"line": row, "character": to_column(text, start, self.utf16)},
+            "end": {"line": row, "character": to_column(text, end, self.utf16)},
+        }
+
+    def _to_diagnostic(self, issue: Dict[str, Any], lines: List[str]) -> Dict[str, Any]:
+        diagnostic = {
+            "range": self._name_range(issue["name"], issue["line"], lines, issue.get("span")),
+            "severity": SEVERITY_CODES.get(issue["severity"], 3),
+            "code": issue["rule_id"],
+            "source": SERVER_NAME,
+            "message": issue["message"],
+        }
+        suggestion = self.analyzer.suggest_name(issue["rule_id"], issue["name"], issue["message"])
+        if suggestion is not None:
+            diagnostic["data"] = {"name": issue["name"], "suggestion": suggestion}
+        return diagnostic
+
+    def _error_diagnostic(self, error: Dict[str, Any], lines: List[str]) -> Dict[str, Any]:
+        return {
+            "range": self._name_range("", error.get("line", 1), lines),
+            "severity": SEVERITY_CODES["error"],
+            "source": SERVER_NAME,
+            "message": error.get("message", ""),
+        }
+
+    # ---- 快速修复 ----
+
+    def on_code_action(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        uri = params["textDocument"]["uri"]
+        with self._lock:
+            document = self.documents.get(uri)
+            # 文档在最近一次分析之后已经修改，声明位置可能已经过期
+            if document is None or document.analyzed_version != document.version:
+                return []
+            text, names, findings = document.text, document.names, document.findings
+            is_vue_file = document.language == "vue" and not document.script_only
+
+        actions = []
+        for diagnostic in params.get("context", {}).get("diagnostics", []):
+            data = diagnostic.get("data") or {}
+            if diagnostic.get("source") != SERVER_NAME or "suggestion" not in data:
+                continue
+            name = data["name"]
+            plan = plan_fixes(
+                text,
+                document.language,
+                is_vue_file,
+                names,
+                [finding for finding in findings if finding["name"] == name],
+                self.analyzer.suggest_name
+            )
+            rename = next((rename for rename in plan.renames if rename.old == name), None)
+            if rename is None:
+                continue
+            edits = [
+                {
+                    "range": {
+                        "start": offset_to_position(text, position, self.utf16),
+                        "end": offset_to_position(text, position + len(name), self.utf16),
+                    },
+                    "newText": rename.new,
+                }
+                for position in rename.positions
+            ]
+            actions.append({
+                "title": f"重命名为 '{rename.new}'",
+                "kind": "quickfix",
+                "diagnostics": [diagnostic],
+                "isPreferred": True,
+                "edit": {"changes": {uri: edits}},
+            })
+        return actions
+
+    REQUEST_HANDLERS = {
+        "initialize": on_initialize,
+        "shutdown": on_shutdown,
+        "textDocument/codeAction": on_code_action,
+    }
+
+    NOTIFICATION_HANDLERS = {
+        "initialized": on_initialized,
+        "textDocument/didOpen": on_did_open,
+        "textDocument/didChange": on_did_change,
+        "textDocument/didClose": on_did_close,
+        "textDocument/didSave": on_did_save,
+    }
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="CodeNamer 语言服务器（LSP，通过 stdio 通信）")
+    parser.add_argument(
+        "--severity",
+        choices=["error", "warning", "info"],
+        default="info",
+        help="最低报告的问题严重级别，低于该级别的规则不会执行（默认: info）"
+    )
+    parser.add_argument(
+        "--rules",
+        type=parse_rule_list,
+        help="只执行指定的规则，逗号分隔（如 'C001,M001'）"
+    )
+    parser.add_argument(
+        "--disable-rules",
+        type=parse_rule_list,
+        help="不执行指定的规则，逗号分隔（如 'C002,M002'）"
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=0.3,
+        help="文档修改后静默多少秒再分析（默认: 0.3）"
+    )
+    parser.add_argument(
+        "--csharp-pool",
+        type=int,
+        default=1,
+        help="常驻 C# 解析进程数（默认: 1）"
+    )
+    return parser.parse_args()
+
+def main():
+    args = parse_arguments()
+
+    # stdout 只用于协议消息，分析过程中的打印输出重定向到 stderr
+    protocol_out = sys.stdout.buffer
+    sys.stdout = sys.stderr
+
+    analyzer = NamingAnalyzer()
+    try:
+        enabled_rules = analyzer.select_rules(args.severity, args.rules, args.disable_rules)
+    except ValueError as e:
+        print(f"错误: {e}", file=sys.stderr)
+        sys.exit(2)
+
+    server = CodeNamerLanguageServer(
+        JsonRpcConnection(sys.stdin.buffer, protocol_out),
+        analyzer,
+        enabled_rules=enabled_rules,
+        debounce=args.debounce,
+        csharp_pool=args.csharp_pool
+    )
+    sys.exit(server.serve())
+
+if __name__ == "__main__":
+    main()
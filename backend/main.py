@@ -1,12 +1,38 @@
+import asyncio
+import concurrent.futures
 import json
 import subprocess
 import os
-from pathlib import Path
-from fastapi import FastAPI, HTTPException
+import threading
+import time
+from collections import Counter
+from pathlib import Path, PurePosixPath
+from typing import Any, AsyncIterator, Callable, Dict, FrozenSet, List, Optional, Tuple, Union
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from models import CodeAnalysisRequest, CodeAnalysisResponse, AnalysisResult
+from models import (
+    AnalysisResult,
+    BatchAnalysisRequest,
+    BatchAnalysisResponse,
+    BatchFile,
+    CodeAnalysisRequest,
+    CodeAnalysisResponse,
+)
 from naming_analyzer import NamingAnalyzer
 from vue_parser import VueParser
+from csharp_parser import WARMUP_CODE, CSharpParser, CSharpParserError
+from profiling import record, stage
+from scheduler import AnalysisScheduler, SchedulerBusy
+from archive_upload import ArchiveEntry, ArchiveError, BodyPipe, create_body_feeder, iter_archive_entries
+from file_discovery import DEFAULT_PRUNED_DIRS, detect_language
+from generated_files import GeneratedFileDetector
+from baseline import Baseline, BaselineStore
+from shared_data import LEXICON_FILE, VERDICTS_FILE, open_table
+from verdict_cache import VerdictCache
+from findings_store import FindingsStore, FindingsWriter, RunRecord
+from result_groups import RESPONSE_FORMATS, group_results, grouped_file_result
+from compression import CompressionMiddleware
 
 app = FastAPI(title="CodeNamer API", version="1.0.0")
 
@@ -18,17 +44,516 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-analyzer = NamingAnalyzer()
-vue_parser = VueParser()
+# 按 Accept-Encoding 以 br/gzip 压缩响应，小于 CODENAMER_COMPRESS_MIN_BYTES 的响应不压缩
+app.add_middleware(CompressionMiddleware, minimum_size=int(os.environ.get("CODENAMER_COMPRESS_MIN_BYTES", 1024)))
+
+# 单个请求（归档中为单个文件）的 CPU 预算（秒），超出后返回已得到的部分结果
+cpu_budget = float(os.environ.get("CODENAMER_CPU_BUDGET", 5))
+
+# 多 worker 模式（serve.py）下，主进程准备好的词性词表和判定快照以只读内存映射方式共享
+shared_data_dir = os.environ.get("CODENAMER_SHARED_DATA")
+if shared_data_dir:
+    analyzer = NamingAnalyzer(
+        verdict_cache=VerdictCache(shared=open_table(Path(shared_data_dir) / VERDICTS_FILE)),
+        lexicon=open_table(Path(shared_data_dir) / LEXICON_FILE)
+    )
+else:
+    analyzer = NamingAnalyzer()
+vue_parser = VueParser(cpu_budget=cpu_budget)
+
+# 设置 CODENAMER_SERVER_TIMING=1 后，/analyze 响应会附带 Server-Timing 头
+server_timing_enabled = os.environ.get("CODENAMER_SERVER_TIMING", "").lower() in ("1", "true", "yes")
+
+# 分析任务调度：并发上限、队列长度和单客户端并发数均可通过环境变量调整
+scheduler = AnalysisScheduler(
+    max_workers=int(os.environ.get("CODENAMER_MAX_WORKERS", min(8, os.cpu_count() or 1))),
+    max_queue=int(os.environ.get("CODENAMER_MAX_QUEUE", 64)),
+    max_per_client=int(os.environ.get("CODENAMER_MAX_PER_CLIENT", 4)),
+)
+
+# C# 解析器常驻进程池，大小与分析并发数一致；启动时在后台完成构建与预热
+csharp_parser = CSharpParser(persistent=True, pool_size=scheduler.max_workers)
+parser_state = {"status": "starting", "error": None}
+
+# 各项目的问题基线存放在 CODENAMER_BASELINE_DIR/<project>.json（由 CLI 的 --write-baseline 生成）
+baseline_dir = os.environ.get("CODENAMER_BASELINE_DIR")
+baseline_store = BaselineStore(Path(baseline_dir)) if baseline_dir else None
+
+# 设置 CODENAMER_FINDINGS_DB 后，批量接口（/analyze/batch、/analyze/archive）的结果写入问题历史库
+findings_db = os.environ.get("CODENAMER_FINDINGS_DB")
+findings_writer = FindingsWriter(FindingsStore(Path(findings_db))) if findings_db else None
+
+# /analyze/stream 每批最多的问题数和最长的攒批时间（秒）
+STREAM_BATCH_SIZE = 500
+STREAM_BATCH_INTERVAL = 0.1
+
+# /analyze/batch 单个请求最多包含的文件数
+batch_max_files = int(os.environ.get("CODENAMER_BATCH_MAX_FILES", 500))
+
+# 归档上传限制：请求体总大小、单个文件大小和条目数量
+archive_max_bytes = int(os.environ.get("CODENAMER_ARCHIVE_MAX_BYTES", 100 * 1024 * 1024))
+archive_max_entry_bytes = int(os.environ.get("CODENAMER_ARCHIVE_MAX_ENTRY_BYTES", 1024 * 1024))
+archive_max_entries = int(os.environ.get("CODENAMER_ARCHIVE_MAX_ENTRIES", 20000))
+
+# 归档解包线程最多领先分析的条目数、交接时检查断开的间隔（秒）、调度器饱和时的最长重试等待（秒）
+ARCHIVE_ENTRY_BACKLOG = 8
+ARCHIVE_HAND_OFF_POLL = 0.5
+ARCHIVE_RETRY_MAX_WAIT = 1.0
+
+# 归档中生成的文件（*.g.cs、*.Designer.cs、带 <auto-generated> 标记等）默认跳过
+generated_files = GeneratedFileDetector()
+
+class UploadStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse that leaves receive() to the request body reader
+
+    The default implementation listens for client disconnects on receive(), which would
+    steal body chunks from an upload that is still being read while results stream back.
+    """
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+
+def provision_csharp_parser():
+    """Locate or build the C# parser and warm it up with a sample parse"""
+    try:
+        parser_state["status"] = "provisioning"
+        csharp_parser.provision()
+        parser_state["status"] = "warming"
+        csharp_parser.warm_up()
+        # 同时预热命名分析（首次调用 NLTK 标注器时需要加载模型）
+        analyzer.analyze_names(csharp_parser.parse(WARMUP_CODE))
+        parser_state["status"] = "ready"
+    except (CSharpParserError, subprocess.TimeoutExpired, OSError) as e:
+        parser_state["status"] = "failed"
+        parser_state["error"] = str(e)
+
+@app.on_event("startup")
+async def start_provisioning():
+    threading.Thread(target=provision_csharp_parser, name="csharp-provision", daemon=True).start()
+
+@app.on_event("shutdown")
+async def shutdown_scheduler():
+    scheduler.shutdown()
+    csharp_parser.close()
+    if findings_writer is not None:
+        findings_writer.close()
 
 @app.get("/")
 async def root():
     return {"message": "CodeNamer API is running"}
 
 @app.post("/analyze", response_model=CodeAnalysisResponse)
-async def analyze_code(request: CodeAnalysisRequest):
-    """Analyze code for naming convention issues"""
+async def analyze_code(request: CodeAnalysisRequest, response: Response, http_request: Request):
+    """Analyze code for naming convention issues (response_format=grouped returns the grouped shape)"""
+    client_id = _client_id(http_request)
+
+    try:
+        result, server_timing = await scheduler.submit(
+            client_id, request.priority, lambda: _analyze_code_with_timing(request)
+        )
+    except SchedulerBusy as e:
+        raise HTTPException(
+            status_code=429,
+            detail=e.reason,
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+    if isinstance(result, dict):
+        # 分组格式已是可以直接序列化的字典，不经过响应模型的校验
+        return JSONResponse(result, headers={"Server-Timing": server_timing} if server_timing is not None else None)
+    if server_timing is not None:
+        response.headers["Server-Timing"] = server_timing
+    return result
+
+@app.post("/analyze/batch", response_model=BatchAnalysisResponse)
+async def analyze_batch(request: BatchAnalysisRequest, http_request: Request):
+    """Analyze several files in one request; a failing file is reported in its own entry"""
+    client_id = _client_id(http_request)
+
+    if len(request.files) > batch_max_files:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {batch_max_files} files")
+
+    _validate_response_format(request.response_format)
+
+    try:
+        enabled_rules = analyzer.select_rules(request.severity, request.rules, request.disable_rules)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    baseline = _project_baseline(request.project)
+
+    try:
+        files = await scheduler.submit(
+            client_id,
+            request.priority,
+            lambda: [_analyze_batch_file(file, enabled_rules, baseline) for file in request.files]
+        )
+    except SchedulerBusy as e:
+        raise HTTPException(
+            status_code=429,
+            detail=e.reason,
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    _record_findings("batch", files, request.project)
+    if request.response_format == "grouped":
+        return JSONResponse({"files": [grouped_file_result(file) for file in files]})
+    return BatchAnalysisResponse(files=files)
+
+@app.post("/analyze/archive")
+async def analyze_archive(
+    http_request: Request,
+    severity: str = "info",
+    rules: Optional[str] = None,
+    disable_rules: Optional[str] = None,
+    project: Optional[str] = None,
+    include_generated: bool = False
+):
+    """Analyze every source file in an uploaded zip/tar archive, streaming one NDJSON line per file"""
+    client_id = _client_id(http_request)
+
+    content_length = http_request.headers.get("Content-Length", "")
+    if content_length.isdigit() and int(content_length) > archive_max_bytes:
+        raise HTTPException(status_code=413, detail=f"Archive exceeds {archive_max_bytes} bytes")
+
+    try:
+        enabled_rules = analyzer.select_rules(severity, _split_rules(rules), _split_rules(disable_rules))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    baseline = _project_baseline(project)
+    pipe = BodyPipe()
+    try:
+        feeder = create_body_feeder(http_request.headers.get("Content-Type", ""), pipe)
+    except ArchiveError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        scheduler.check_admission(client_id)
+    except SchedulerBusy as e:
+        raise HTTPException(
+            status_code=429,
+            detail=e.reason,
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+    return UploadStreamingResponse(
+        _stream_archive_results(
+            http_request, client_id, pipe, feeder, enabled_rules, baseline, project,
+            None if include_generated else generated_files
+        ),
+        media_type="application/x-ndjson"
+    )
+
+@app.post("/analyze/stream")
+async def analyze_code_stream(request: CodeAnalysisRequest, http_request: Request):
+    """Analyze code like /analyze, streaming findings as NDJSON batches while the rules run"""
+    client_id = _client_id(http_request)
+    enabled_rules, baseline = _validate_request(request)
+    if request.response_format != "full":
+        raise HTTPException(status_code=400, detail="/analyze/stream only supports response_format 'full'")
+
+    try:
+        scheduler.check_admission(client_id)
+    except SchedulerBusy as e:
+        raise HTTPException(
+            status_code=429,
+            detail=e.reason,
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+    cancelled = threading.Event()
+    return StreamingResponse(
+        _stream_job(
+            client_id,
+            request.priority,
+            lambda emit: _analyze_code_batches(request, enabled_rules, baseline, emit, cancelled),
+            cancelled
+        ),
+        media_type="application/x-ndjson"
+    )
+
+@app.get("/metrics")
+async def metrics():
+    """Scheduler queue depth and throughput metrics"""
+    return scheduler.metrics()
+
+def _client_id(http_request: Request) -> str:
+    return http_request.headers.get("X-Client-Id") or (http_request.client.host if http_request.client else "unknown")
+
+def _split_rules(value: Optional[str]) -> Optional[List[str]]:
+    """Parse a comma separated rule list from a query parameter"""
+    if value is None:
+        return None
+    return [rule.strip().upper() for rule in value.split(",") if rule.strip()]
+
+def _project_baseline(project: Optional[str]) -> Optional[Baseline]:
+    """Look up the suppression baseline of a project, if the server has one"""
+    if not project or baseline_store is None:
+        return None
+    try:
+        return baseline_store.get(project)
+    except (OSError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid baseline for project '{project}': {e}")
+
+def _record_findings(source: str, files: List[Dict[str, Any]], project: Optional[str], partial: bool = False):
+    """Queue the findings of a bulk request for the findings database, if one is configured"""
+    if findings_writer is not None:
+        findings_writer.submit(RunRecord(
+            source,
+            files,
+            project,
+            partial or any(file.get("partial") for file in files)
+        ))
+
+def _is_archive_source(name: str) -> bool:
+    """Select archive entries worth analyzing, skipping build output and dependencies"""
+    path = PurePosixPath(name)
+    return detect_language(path) is not None and not any(part in DEFAULT_PRUNED_DIRS for part in path.parts)
+
+async def _stream_job(
+    client_id: str,
+    priority: str,
+    job: Callable[[Callable[[Dict[str, Any]], None]], Optional[Dict[str, Any]]],
+    cancelled: threading.Event
+) -> AsyncIterator[str]:
+    """
+    Run job(emit) on the scheduler and stream everything it emits as NDJSON lines
+
+    The job's return value, if any, becomes the last line. Setting `cancelled` (done when the
+    client goes away) tells the job to stop early.
+    """
+    loop = asyncio.get_running_loop()
+    items: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue()
+
+    def emit(item: Dict[str, Any]):
+        loop.call_soon_threadsafe(items.put_nowait, item)
+
+    task = asyncio.create_task(scheduler.submit(client_id, priority, lambda: job(emit)))
+    # 任务结束的回调排在线程中已提交的结果之后，None 表示结果已全部送达
+    task.add_done_callback(lambda _: items.put_nowait(None))
+
+    try:
+        while True:
+            item = await items.get()
+            if item is None:
+                break
+            yield json.dumps(item, ensure_ascii=False) + "\n"
+
+        try:
+            final = task.result()
+        except SchedulerBusy as e:
+            final = {"error": e.reason}
+        if final is not None:
+            yield json.dumps(final, ensure_ascii=False) + "\n"
+    finally:
+        cancelled.set()
+
+async def _stream_archive_results(
+    http_request: Request,
+    client_id: str,
+    pipe: BodyPipe,
+    feeder,
+    enabled_rules: FrozenSet[str],
+    baseline: Optional[Baseline],
+    project: Optional[str],
+    generated: Optional[GeneratedFileDetector]
+) -> AsyncIterator[str]:
+    """
+    Feed the upload into the extractor while streaming per-file results back
+
+    Reading and extracting the archive happens on a dedicated thread outside the analysis
+    pool; each extracted entry is then submitted to the scheduler as its own bulk job, so a
+    slow upload never holds an analysis worker.
+    """
+    loop = asyncio.get_running_loop()
+    cancelled = threading.Event()
+    summary = {"files": 0, "failed": 0, "total_issues": 0, "suppressed": 0, "skipped_generated": 0}
+    entries: "asyncio.Queue[Optional[Union[ArchiveEntry, Dict[str, Any]]]]" = asyncio.Queue(ARCHIVE_ENTRY_BACKLOG)
+
+    async def pump_body():
+        received = 0
+        try:
+            async for chunk in http_request.stream():
+                received += len(chunk)
+                if received > archive_max_bytes:
+                    raise ArchiveError(f"Archive exceeds {archive_max_bytes} bytes")
+                if pipe.reader_closed:
+                    break
+                # 管道满时写入会阻塞，放到线程中执行以免卡住事件循环
+                await loop.run_in_executor(None, feeder.feed, chunk)
+            await loop.run_in_executor(None, feeder.finish)
+            pipe.close()
+        except Exception as e:
+            pipe.close(error=str(e))
+            return
+
+        # 上传结束后继续监听断开，客户端提前离开时不再分析剩余条目
+        while (await http_request.receive())["type"] != "http.disconnect":
+            pass
+        cancelled.set()
+
+    def hand_off(item: Optional[Union[ArchiveEntry, Dict[str, Any]]]) -> bool:
+        # 分析跟不上时在解包线程中等待，客户端断开后放弃
+        future = asyncio.run_coroutine_threadsafe(entries.put(item), loop)
+        while not cancelled.is_set():
+            try:
+                future.result(timeout=ARCHIVE_HAND_OFF_POLL)
+                return True
+            except concurrent.futures.TimeoutError:
+                continue
+        future.cancel()
+        return False
+
+    def extract():
+        def wanted(name: str) -> bool:
+            # Generated files matched by name are skipped without extracting them
+            if not _is_archive_source(name):
+                return False
+            if generated is not None and generated.match_name(name):
+                summary["skipped_generated"] += 1
+                return False
+            return True
+
+        try:
+            for entry in iter_archive_entries(pipe, wanted, archive_max_entry_bytes, archive_max_entries):
+                if entry.error is None and generated is not None and generated.match_header(
+                    entry.data[:generated.sniff_bytes].decode("utf-8", errors="ignore")
+                ) is not None:
+                    summary["skipped_generated"] += 1
+                    continue
+                if not hand_off(entry):
+                    return
+        except ArchiveError as e:
+            hand_off({"error": str(e)})
+        finally:
+            pipe.close_reader()
+            hand_off(None)
+
+    async def analyze(entry: ArchiveEntry) -> Optional[Dict[str, Any]]:
+        # 队列已满或并发超限时按 Retry-After 等待后重试，客户端断开时返回 None
+        while not cancelled.is_set():
+            try:
+                return await scheduler.submit(
+                    client_id,
+                    "bulk",
+                    lambda: _analyze_archive_entry(entry.name, entry.data, enabled_rules, baseline)
+                )
+            except SchedulerBusy as e:
+                await asyncio.sleep(min(e.retry_after, ARCHIVE_RETRY_MAX_WAIT))
+        return None
+
+    recorded: List[Dict[str, Any]] = []
+    finished = False
+    pump = asyncio.create_task(pump_body())
+    threading.Thread(target=extract, name="archive-extract", daemon=True).start()
+    try:
+        while True:
+            item = await entries.get()
+            if item is None:
+                finished = True
+                break
+            if isinstance(item, dict):
+                yield json.dumps(item, ensure_ascii=False) + "\n"
+                continue
+
+            if item.error is None:
+                result = await analyze(item)
+                if result is None:
+                    break
+            else:
+                result = {"file": item.name, "error": item.error}
+            summary["files"] += 1
+            summary["failed"] += "error" in result
+            summary["total_issues"] += result.get("total_issues", 0)
+            summary["suppressed"] += result.get("suppressed", 0)
+            if findings_writer is not None:
+                recorded.append(result)
+            yield json.dumps(result, ensure_ascii=False) + "\n"
+
+        yield json.dumps({"summary": summary}, ensure_ascii=False) + "\n"
+    finally:
+        _record_findings("archive", recorded, project, partial=not finished)
+        # 客户端断开或处理结束：停止解包并丢弃剩余的上传数据
+        cancelled.set()
+        pipe.close_reader()
+        pump.cancel()
 
+def _analyze_archive_entry(
+    name: str,
+    data: bytes,
+    enabled_rules: FrozenSet[str],
+    baseline: Optional[Baseline]
+) -> Dict[str, Any]:
+    """Analyze one archive entry, reporting failures in the result instead of raising"""
+    code = data.decode("utf-8-sig", errors="replace")
+    return _analyze_source_file(name, detect_language(PurePosixPath(name)), code, enabled_rules, baseline)
+
+def _analyze_batch_file(
+    file: BatchFile,
+    enabled_rules: FrozenSet[str],
+    baseline: Optional[Baseline]
+) -> Dict[str, Any]:
+    """Analyze one file of a batch request, reporting failures in the result instead of raising"""
+    language = file.language.lower() if file.language else detect_language(PurePosixPath(file.path))
+    if language not in ("csharp", "vue"):
+        return {"file": file.path, "error": f"Unsupported file: {file.path}"}
+    return _analyze_source_file(file.path, language, file.code, enabled_rules, baseline)
+
+def _analyze_source_file(
+    name: str,
+    language: str,
+    code: str,
+    enabled_rules: FrozenSet[str],
+    baseline: Optional[Baseline]
+) -> Dict[str, Any]:
+    """Analyze one named source file (.ts/.js are parsed as Vue script files)"""
+    deadline = time.thread_time() + cpu_budget
+
+    try:
+        parsed_data = _parse_source(language, code, script_only=PurePosixPath(name).suffix.lower() != ".vue")
+        analysis_results, partial = _collect_findings(parsed_data, language, enabled_rules, deadline)
+    except HTTPException as e:
+        if e.status_code == 503 and parser_state["status"] != "failed":
+            return {"file": name, "error": e.detail, "retryable": True}
+        return {"file": name, "error": e.detail}
+    except subprocess.TimeoutExpired:
+        return {"file": name, "error": "Parser timeout"}
+
+    results = [result.dict() for result in analysis_results]
+    suppressed = 0
+    if baseline is not None:
+        results, suppressed = baseline.suppress(name, results, code)
+
+    return {
+        "file": name,
+        "results": results,
+        "parser_errors": parsed_data.get("errors", []),
+        "total_issues": len(results),
+        "suppressed": suppressed,
+        "partial": partial,
+    }
+
+def _analyze_code_with_timing(
+    request: CodeAnalysisRequest
+) -> Tuple[Union[CodeAnalysisResponse, Dict[str, Any]], Optional[str]]:
+    """Run the analysis in a worker thread, optionally collecting Server-Timing data"""
+    if not server_timing_enabled:
+        return _analyze_code(request), None
+
+    with record("analyze") as recorder:
+        result = _analyze_code(request)
+    return result, recorder.server_timing()
+
+def _validate_response_format(response_format: str):
+    if response_format not in RESPONSE_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported response_format '{response_format}'. Supported formats: {', '.join(RESPONSE_FORMATS)}"
+        )
+
+def _validate_request(request: CodeAnalysisRequest) -> Tuple[FrozenSet[str], Optional[Baseline]]:
+    """Check the request and resolve its rule selection and project baseline"""
     supported_languages = ["csharp", "vue"]
     if request.language.lower() not in supported_languages:
         raise HTTPException(
@@ -39,78 +564,178 @@ async def analyze_code(request: CodeAnalysisRequest):
     if not request.code.strip():
         raise HTTPException(status_code=400, detail="Code cannot be empty")
 
+    _validate_response_format(request.response_format)
+
     try:
-        # 根据语言选择不同的解析器
+        enabled_rules = analyzer.select_rules(request.severity, request.rules, request.disable_rules)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return enabled_rules, _project_baseline(request.project)
+
+def _analyze_code(request: CodeAnalysisRequest) -> Union[CodeAnalysisResponse, Dict[str, Any]]:
+    enabled_rules, baseline = _validate_request(request)
+    deadline = time.thread_time() + cpu_budget
+
+    try:
+        parsed_data = _parse_source(request.language.lower(), request.code)
         if request.language.lower() == "vue":
-            # 使用Vue解析器
-            parsed_data = vue_parser.parse_vue_file(request.code)
             print("----------- RAW JSON FROM VUE PARSER -----------")
             print(json.dumps(parsed_data, indent=2))
             print("---------------------------------------------")
 
-        else:
-            # 使用C#解析器
-            parser_path = Path(__file__).parent.parent / "csharp-parser-helper"
-            exe_path = parser_path / "bin" / "Debug" / "net8.0" / "CSharpParserHelper.exe"
-
-            if not exe_path.exists():
-                build_result = subprocess.run(
-                    ["dotnet", "build"],
-                    cwd=parser_path,
-                    capture_output=True,
-                    text=True
-                )
-                if build_result.returncode != 0:
-                    raise HTTPException(
-                        status_code=500,
-                        detail=f"Failed to build C# parser: {build_result.stderr}"
-                    )
-
-            result = subprocess.run(
-                [str(exe_path), request.code],
-                capture_output=True,
-                text=True,
-                timeout=30
+        # 分析命名规范
+        with stage("analyze"):
+            analysis_results, partial = _collect_findings(
+                parsed_data, request.language.lower(), enabled_rules, deadline
             )
+        parser_errors = parsed_data.get("errors", [])
 
-            if result.returncode != 0:
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"Parser error: {result.stderr}"
-                )
-
-            try:
-                print("----------- RAW JSON FROM C# PARSER -----------")
-                print(result.stdout)
-                print("---------------------------------------------")
-
-                parsed_data = json.loads(result.stdout)
-            except json.JSONDecodeError as e:
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"Failed to parse parser output: {str(e)}"
+        suppressed = 0
+        if baseline is not None:
+            with stage("baseline"):
+                analysis_results, suppressed = baseline.suppress(
+                    request.file_path or "", [result.dict() for result in analysis_results], request.code
                 )
-
-        # 分析命名规范
-        analysis_results = analyzer.analyze_names(parsed_data, request.language.lower())
-        parser_errors = parsed_data.get("errors", [])
         
-        return CodeAnalysisResponse(
-            results=analysis_results,
-            total_issues=len(analysis_results),
-            parser_errors=parser_errors
-        )
+        with stage("build"):
+            if request.response_format == "grouped":
+                return {
+                    **group_results(analysis_results),
+                    "total_issues": len(analysis_results),
+                    "parser_errors": parser_errors,
+                    "suppressed": suppressed,
+                    "partial": partial,
+                }
+            return CodeAnalysisResponse(
+                results=analysis_results,
+                total_issues=len(analysis_results),
+                parser_errors=parser_errors,
+                suppressed=suppressed,
+                partial=partial
+            )
         
     except subprocess.TimeoutExpired:
         raise HTTPException(status_code=500, detail="Parser timeout")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
+def _collect_findings(
+    parsed_data: Dict[str, Any],
+    language: str,
+    enabled_rules: FrozenSet[str],
+    deadline: float
+) -> Tuple[List[AnalysisResult], bool]:
+    """Collect findings lazily until the request's CPU deadline passes; returns (findings, partial)"""
+    findings = []
+    for finding in analyzer.iter_findings(parsed_data, language, enabled_rules):
+        findings.append(finding)
+        if time.thread_time() > deadline:
+            parsed_data.setdefault("errors", []).append(
+                {"message": "Analysis exceeded the CPU budget; results are incomplete", "line": finding.line}
+            )
+            return findings, True
+    return findings, bool(parsed_data.get("truncated"))
+
+def _analyze_code_batches(
+    request: CodeAnalysisRequest,
+    enabled_rules: FrozenSet[str],
+    baseline: Optional[Baseline],
+    emit: Callable[[Dict[str, Any]], None],
+    cancelled: threading.Event
+) -> Optional[Dict[str, Any]]:
+    """Emit {"results": [...]} batches as findings are produced; return the closing summary line"""
+    language = request.language.lower()
+    deadline = time.thread_time() + cpu_budget
+
+    try:
+        parsed_data = _parse_source(language, request.code)
+    except HTTPException as e:
+        return {"error": e.detail}
+    except subprocess.TimeoutExpired:
+        return {"error": "Parser timeout"}
+
+    batch: List[Dict[str, Any]] = []
+    total_issues = 0
+    suppressed = 0
+    partial = bool(parsed_data.get("truncated"))
+    used_fingerprints: Counter = Counter()
+    last_flush = time.perf_counter()
+
+    def flush():
+        nonlocal batch, total_issues, suppressed, last_flush
+        if baseline is not None:
+            batch, batch_suppressed = baseline.suppress(request.file_path or "", batch, request.code, used_fingerprints)
+            suppressed += batch_suppressed
+        if batch:
+            emit({"results": batch})
+            total_issues += len(batch)
+        batch = []
+        last_flush = time.perf_counter()
+
+    for finding in analyzer.iter_findings(parsed_data, language, enabled_rules):
+        if cancelled.is_set():
+            return None
+        batch.append(finding.dict())
+        if time.thread_time() > deadline:
+            parsed_data.setdefault("errors", []).append(
+                {"message": "Analysis exceeded the CPU budget; results are incomplete", "line": finding.line}
+            )
+            partial = True
+            break
+        # 按数量或时间分批，首批结果尽快送达
+        if len(batch) >= STREAM_BATCH_SIZE or time.perf_counter() - last_flush > STREAM_BATCH_INTERVAL:
+            flush()
+    flush()
+
+    return {
+        "done": True,
+        "total_issues": total_issues,
+        "parser_errors": parsed_data.get("errors", []),
+        "suppressed": suppressed,
+        "partial": partial,
+    }
+
+def _parse_source(language: str, code: str, script_only: bool = False) -> Dict[str, Any]:
+    """Parse code with the parser for its language; script_only parses plain .ts/.js files"""
+    # 根据语言选择不同的解析器
+    if language == "vue":
+        # 使用Vue解析器
+        if script_only:
+            return vue_parser.parse_script_file(code)
+        return vue_parser.parse_vue_file(code)
+
+    # 使用C#解析器
+    if parser_state["status"] != "ready":
+        raise HTTPException(
+            status_code=503,
+            detail=f"C# parser is not ready ({parser_state['status']})",
+            headers={"Retry-After": "5"}
+        )
+
+    try:
+        return csharp_parser.parse(code)
+    except CSharpParserError as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Parser error: {str(e)}"
+        )
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
     return {"status": "healthy"}
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness check: 200 once the C# parser is built and warmed up, 503 otherwise"""
+    body = {"status": parser_state["status"], "parser": str(csharp_parser.exe_path)}
+    if parser_state["error"]:
+        body["error"] = parser_state["error"]
+    return JSONResponse(status_code=200 if parser_state["status"] == "ready" else 503, content=body)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -1,9 +1,21 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 class CodeAnalysisRequest(BaseModel):
     language: str
     code: str
+    severity: str = "info"  # 最低严重级别，低于该级别的规则不会执行
+    rules: Optional[List[str]] = None  # 只执行这些规则
+    disable_rules: Optional[List[str]] = None  # 不执行这些规则
+    priority: str = "interactive"  # interactive（编辑器等交互请求）或 bulk（CI 等批量请求）
+    project: Optional[str] = None  # 项目名，存在该项目的基线时忽略基线中已有的问题
+    file_path: Optional[str] = None  # 文件相对项目根目录的路径，用于匹配基线
+    response_format: str = "full"  # full 或 grouped（按规则和名称分组，消息模板只发送一次，见 result_groups.py）
+
+class SourceSpan(BaseModel):
+    line: int
+    column: int  # 名称在该行中的起始字符下标（从 0 开始）
+    length: int
 
 class AnalysisResult(BaseModel):
     line: int
@@ -11,8 +23,30 @@ class AnalysisResult(BaseModel):
     rule_id: str
     message: str
     severity: str = "warning"  # warning, error, info
+    span: Optional[SourceSpan] = None  # 名称在源代码中的精确位置（解析器提供时）
 
 class CodeAnalysisResponse(BaseModel):
     results: List[AnalysisResult]
     total_issues: int
     parser_errors: List[dict] = []
+    suppressed: int = 0  # 被基线忽略的问题数
+    partial: bool = False  # 超出 CPU 预算，结果不完整
+
+class BatchFile(BaseModel):
+    path: str
+    code: str
+    language: Optional[str] = None  # 省略时按扩展名判断（.cs 为 csharp，.vue/.ts/.js 为 vue）
+
+class BatchAnalysisRequest(BaseModel):
+    files: List[BatchFile]
+    severity: str = "info"
+    rules: Optional[List[str]] = None
+    disable_rules: Optional[List[str]] = None
+    priority: str = "bulk"
+    project: Optional[str] = None  # 按各文件的 path 匹配该项目的基线
+    response_format: str = "full"  # grouped 时每个文件的 results 替换为分组格式
+
+class BatchAnalysisResponse(BaseModel):
+    # 与请求中的 files 一一对应：{file, results, parser_errors, total_issues, suppressed, partial} 或 {file, error}；
+    # 暂时无法分析（C# 解析器正在准备）的文件另有 retryable: true
+    files: List[Dict[str, Any]]
@@ -1,20 +1,102 @@
 import re
-import nltk
-from typing import List, Dict, Any, Callable
+import threading
+from collections import Counter
+from typing import AbstractSet, Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
 from models import AnalysisResult
-
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt', quiet=True)
-
-try:
-    nltk.data.find('taggers/averaged_perceptron_tagger')
-except LookupError:
-    nltk.download('averaged_perceptron_tagger', quiet=True)
+from profiling import stage
+from shared_data import MappedTable
+from symbol_index import SymbolIndex, SymbolRef, expand_words, split_words
+from verdict_cache import Verdict, VerdictCache, VerdictKey
+from identifier_features import CASE_PATTERN, IdentifierBatch, PrefixGroup, bits, iter_bits
+
+# Vue 规则的消息中附带的建议名称，如 "建议：'userName'"
+SUGGESTION_PATTERN = re.compile(r"建议：'([^']+)'")
+
+# 只涉及大小写风格的规则，建议名称可以直接转换得到
+PASCAL_CASE_RULES = frozenset({"C001", "M001", "P001", "F001"})
+CAMEL_CASE_RULES = frozenset({"V001", "PA001", "VM001"})
+
+IDENTIFIER_PATTERN = re.compile(r"^[A-Za-z_$][\w$]*$")
+
+# 项目级规则：只在启用项目规则（符号索引）时由 iter_project_findings 检查
+PROJECT_RULES = frozenset({"S001", "S002", "S003"})
+
+# 每批计算特征并判定的名称数；迭代在批之间可以停止，剩余的名称不会被分析
+FEATURE_BATCH_SIZE = 512
+
+# 不检查命名的 C# 方法
+SPECIAL_METHODS = ("Main", "ToString", "GetHashCode", "Equals", "Dispose")
+
+# 布尔属性的前缀，这类属性不要求为名词
+BOOLEAN_PREFIXES = ("Is", "Has", "Can", "Should", "Will", "Would", "Could", "Must", "Might")
+
+VUE_LIFECYCLE_HOOKS = frozenset({
+    'beforeCreate', 'created', 'beforeMount', 'mounted',
+    'beforeUpdate', 'updated', 'beforeUnmount', 'unmounted',
+    'beforeDestroy', 'destroyed', 'activated', 'deactivated',
+    'errorCaptured', 'renderTracked', 'renderTriggered',
+    'onBeforeMount', 'onMounted', 'onBeforeUpdate', 'onUpdated',
+    'onBeforeUnmount', 'onUnmounted', 'onActivated', 'onDeactivated',
+    'onErrorCaptured', 'onRenderTracked', 'onRenderTriggered'
+})
+
+# 计算属性名不应以这些动词开头（按顺序取第一个匹配的前缀给出建议）
+COMPUTED_VERB_PREFIXES = ('get', 'set', 'fetch', 'load', 'save', 'update', 'delete', 'create', 'make', 'build', 'generate')
+
+# 不需要标注词性即可确定的常见动词
+COMMON_VERBS = frozenset({
+    "get", "set", "is", "has", "can", "should", "will", "would", "could",
+    "add", "remove", "delete", "create", "update", "save", "load", "insert",
+    "find", "search", "filter", "sort", "validate", "check", "verify",
+    "calculate", "compute", "process", "handle", "execute", "run", "perform",
+    "start", "stop", "pause", "resume", "reset", "clear", "clean", "flush",
+    "build", "make", "construct", "destroy", "dispose", "release",
+    "batch", "parse", "format", "convert", "transform", "map", "reduce", "merge",
+    "generate", "render", "display", "show", "hide", "toggle", "switch", "process",
+    "send", "receive", "transmit", "broadcast", "publish", "subscribe",
+    "connect", "disconnect", "bind", "unbind", "attach", "detach",
+    "open", "close", "read", "write", "copy", "move", "rename", "backup",
+    "import", "export", "sync", "upload", "download", "fetch", "push", "pull",
+    "enable", "disable", "activate", "deactivate", "initialize", "finalize",
+    "begin", "end", "complete", "finish", "cancel", "abort", "retry",
+    "lock", "unlock", "encrypt", "decrypt", "compress", "decompress",
+    "serialize", "deserialize", "encode", "decode", "hash", "sign",
+    "click", "select", "choose", "pick", "drag", "drop", "scroll", "zoom",
+    "navigate", "redirect", "refresh", "reload", "submit", "apply", "confirm",
+    "query", "count", "sum", "average", "group", "join", "split", "slice",
+    "append", "prepend", "replace", "substitute", "trim", "pad", "fill",
+    "track", "monitor", "observe", "watch", "listen", "notify", "alert",
+    "log", "record", "store", "cache", "buffer", "queue", "schedule"
+})
+
+# 一类名称的批量判定：(特征, 各名称的 DataType, 启用的规则) -> 各名称的判定
+BatchHandler = Callable[[IdentifierBatch, Sequence[str], AbstractSet[str]], List[List[Verdict]]]
+
+_nltk = None
+_nltk_lock = threading.Lock()
+
+def load_nltk():
+    """按需导入 NLTK 并确保所需数据已下载（有共享词性词表时，只有词表未收录的单词才需要）"""
+    global _nltk
+    with _nltk_lock:
+        if _nltk is None:
+            import nltk
+
+            try:
+                nltk.data.find('tokenizers/punkt')
+            except LookupError:
+                nltk.download('punkt', quiet=True)
+
+            try:
+                nltk.data.find('taggers/averaged_perceptron_tagger')
+            except LookupError:
+                nltk.download('averaged_perceptron_tagger', quiet=True)
+
+            _nltk = nltk
+    return _nltk
 
 class NamingAnalyzer:
-    def __init__(self):
+    def __init__(self, verdict_cache: Optional[VerdictCache] = None, lexicon: Optional[MappedTable] = None):
         self.rules = {
             # C# 规则
             "C001": "类名应使用帕斯卡命名法（PascalCase）",
@@ -38,7 +120,12 @@ class NamingAnalyzer:
             "VM004": "方法名应避免使用中文字符或特殊符号",
             "VM005": "异步方法建议包含'async'或相关描述词",
             "VM006": "计算属性名应为有意义的名词",
-            "VM007": "watch方法名应与被监听属性一致"
+            "VM007": "watch方法名应与被监听属性一致",
+
+            # 项目级规则（基于符号索引跨文件检查）
+            "S001": "同一概念在项目中应使用一致的命名（如 userId 与 uid）",
+            "S002": "实现类的类名应包含其实现的接口的核心名词",
+            "S003": "类型名不应在多个命名空间中重复"
         }
         
         self.IGNORED_PREFIXES = {
@@ -46,377 +133,553 @@ class NamingAnalyzer:
             "TearDown", "Benchmark", "Mock", "Stub"
         }
         
-        self.handler_map: Dict[str, Callable[[str, int], List[AnalysisResult]]] = {
-            "class": self._analyze_class_name,
-            "interface": self._analyze_interface_name,
-            "method": self._analyze_method_name,
-            "property": self._analyze_property_name,
-            "field": self._analyze_field_name,
-            "variable": self._analyze_variable_name,
-            "parameter": self._analyze_parameter_name,
+        # 各规则产生的问题的严重级别（未实现的规则按 info 处理）
+        self.rule_severities = {
+            "C001": "warning", "C002": "info",
+            "M001": "warning", "M002": "info",
+            "P001": "warning", "P002": "info",
+            "F001": "warning", "F002": "info",
+            "V001": "warning", "V002": "info",
+            "PA001": "warning", "PA002": "info",
+            "I001": "warning",
+            "VM001": "warning", "VM002": "info", "VM003": "info", "VM004": "warning",
+            "VM005": "info", "VM006": "info", "VM007": "info",
+            "S001": "info", "S002": "info", "S003": "warning",
+        }
+        
+        # 各类名称的处理器：对一批名称计算一次特征，规则以掩码对整批求值
+        self.handler_map: Dict[str, BatchHandler] = {
+            "class": self._batch_class_names,
+            "interface": self._batch_interface_names,
+            "method": self._batch_method_names,
+            "property": self._batch_property_names,
+            "field": self._batch_field_names,
+            "variable": self._batch_variable_names,
+            "parameter": self._batch_parameter_names,
         }
 
         # Vue.js 特定的处理器映射
-        self.vue_handler_map: Dict[str, Callable[[str, int, str], List[AnalysisResult]]] = {
-            "method": self._analyze_vue_method_name,
-            "variable": self._analyze_vue_variable_name,
-            "computed": self._analyze_vue_computed_name,
-            "parameter": self._analyze_vue_parameter_name,
+        self.vue_handler_map: Dict[str, BatchHandler] = {
+            "method": self._batch_vue_method_names,
+            "variable": self._batch_vue_variable_names,
+            "computed": self._batch_vue_computed_names,
+            "parameter": self._batch_vue_parameter_names,
         }
-    
-    def analyze_names(self, parsed_data: Dict[str, Any], language: str = "csharp") -> List[AnalysisResult]:
-        results = []
-        names = parsed_data.get("names", [])
-
-        for name_info in names:
-            name_type = name_info.get("Type", "").lower()
-            name = name_info.get("Name", "")
-            line = name_info.get("Line", 0)
-            data_type = name_info.get("DataType", "")
 
-            if not name or name.startswith("<") or name.startswith("_"):
-                continue
-
-            # 根据语言选择不同的处理器
-            if language.lower() == "vue":
-                # 对于Vue，使用DataType字段来确定处理器
-                actual_type = data_type if data_type else name_type
-                handler = self.vue_handler_map.get(actual_type)
-                if handler:
-                    results.extend(handler(name, line, data_type))
-            else:
-                handler = self.handler_map.get(name_type)
-                if handler:
-                    results.extend(handler(name, line))
+        # 各处理器用到的前缀组，计算特征时一并匹配
+        self.handler_prefixes: Dict[str, Dict[str, PrefixGroup]] = {
+            "interface": {"interface": PrefixGroup(["I"])},
+            "method": {"ignored": PrefixGroup(sorted(self.IGNORED_PREFIXES))},
+            "property": {"boolean": PrefixGroup(BOOLEAN_PREFIXES)},
+            "field": {"private": PrefixGroup(["_"])},
+        }
+        self.vue_handler_prefixes: Dict[str, Dict[str, PrefixGroup]] = {
+            "method": {"handler": PrefixGroup(["handle", "on"])},
+            "computed": {"computed_verb": PrefixGroup(COMPUTED_VERB_PREFIXES, strict=True)},
+        }
+        
+        # 各处理器可能产生的规则，用于跳过没有启用规则的处理器
+        self.handler_rules: Dict[str, FrozenSet[str]] = {
+            "class": frozenset({"C001", "C002"}),
+            "interface": frozenset({"I001"}),
+            "method": frozenset({"M001", "M002"}),
+            "property": frozenset({"P001", "P002"}),
+            "field": frozenset({"F001"}),
+            "variable": frozenset({"V001", "V002"}),
+            "parameter": frozenset({"PA001", "PA002"}),
+        }
+        self.vue_handler_rules: Dict[str, FrozenSet[str]] = {
+            "method": frozenset({"VM001", "VM002", "VM003", "VM004", "VM006"}),
+            "variable": frozenset({"VM001", "VM002", "VM004"}),
+            "computed": frozenset({"VM001", "VM004", "VM006"}),
+            "parameter": frozenset({"VM001", "VM002", "VM004"}),
+        }
+        self.all_rules: FrozenSet[str] = frozenset(self.rules)
+        
+        # 规则判定只取决于名称本身（行号除外），相同标识符只判定一次
+        self.verdict_cache = verdict_cache if verdict_cache is not None else VerdictCache()
 
-        return results
-    
-    def _analyze_class_name(self, name: str, line: int) -> List[AnalysisResult]:
-        results = []
-        if not self._is_pascal_case(name):
-            results.append(AnalysisResult(line=line, name=name, rule_id="C001", message=f"类名 '{name}' 应使用帕斯卡命名法（PascalCase）", severity="warning"))
-        if not self._is_noun_phrase(name):
-            results.append(AnalysisResult(line=line, name=name, rule_id="C002", message=f"类名 '{name}' 应为名词或名词短语", severity="info"))
-        return results
+        # 预先标注好的 {单词: 词性} 表（见 shared_data），命中时不需要调用 NLTK
+        self.lexicon = lexicon
     
-    def _analyze_interface_name(self, name: str, line: int) -> List[AnalysisResult]:
-        results = []
-        if not name.startswith("I") or not self._is_pascal_case(name[1:]):
-            results.append(AnalysisResult(line=line, name=name, rule_id="I001", message=f"接口名 '{name}' 应以大写字母'I'开头并使用帕斯卡命名法（PascalCase）", severity="warning"))
-        return results
-    
-    def _analyze_method_name(self, name: str, line: int) -> List[AnalysisResult]:
-        results = []
+    def select_rules(
+        self,
+        min_severity: str = "info",
+        rules: Optional[Iterable[str]] = None,
+        disabled_rules: Optional[Iterable[str]] = None
+    ) -> FrozenSet[str]:
+        """根据最低严重级别和规则白名单/黑名单计算需要执行的规则"""
+        severity_order = {"error": 3, "warning": 2, "info": 1}
+        if min_severity not in severity_order:
+            raise ValueError(f"未知的严重级别: {min_severity}")
         
-        if name in ["Main", "ToString", "GetHashCode", "Equals", "Dispose"]:
-            return results
+        selected = set(rules) if rules else set(self.rules)
+        disabled = set(disabled_rules or [])
+        unknown = (selected | disabled) - self.all_rules
+        if unknown:
+            raise ValueError(f"未知的规则: {', '.join(sorted(unknown))}")
         
-        if any(name.startswith(prefix) for prefix in self.IGNORED_PREFIXES):
-            return results
-        
-        if not self._is_pascal_case(name):
-            results.append(AnalysisResult(line=line, name=name, rule_id="M001", message=f"方法名 '{name}' 应使用帕斯卡命名法（PascalCase）", severity="warning"))
-        if not self._starts_with_verb(name):
-            results.append(AnalysisResult(line=line, name=name, rule_id="M002", message=f"方法名 '{name}' 应以动词开头", severity="info"))
-        return results
+        min_level = severity_order[min_severity]
+        return frozenset(
+            rule_id for rule_id in selected - disabled
+            if severity_order[self.rule_severities.get(rule_id, "info")] >= min_level
+        )
+    
+    def analyze_names(
+        self,
+        parsed_data: Dict[str, Any],
+        language: str = "csharp",
+        enabled_rules: Optional[AbstractSet[str]] = None
+    ) -> List[AnalysisResult]:
+        """
+        分析解析结果中的名称
+
+        enabled_rules 为需要执行的规则（见 select_rules），None 表示全部；
+        未启用的规则不会被求值，所有规则都未启用的处理器整个跳过。
+        判定结果按标识符记忆在 verdict_cache 中，重复出现的名称只附加行号。
+        """
+        return list(self.iter_findings(parsed_data, language, enabled_rules))
+    
+    def iter_findings(
+        self,
+        parsed_data: Dict[str, Any],
+        language: str = "csharp",
+        enabled_rules: Optional[AbstractSet[str]] = None
+    ) -> Iterator[AnalysisResult]:
+        """
+        按名称出现顺序逐个产出问题（生成器）
+
+        名称每 FEATURE_BATCH_SIZE 个一批：判定缓存未命中的名称按类别分组，每组计算一次特征后整批判定。
+        调用方停止迭代后剩余批次的名称不会被分析，适合只需要知道"是否存在问题"的场景。
+        """
+        names = parsed_data.get("names", [])
+        enabled = self.all_rules if enabled_rules is None else enabled_rules
+        language = language.lower()
+        is_vue = language == "vue"
+        handler_map = self.vue_handler_map if is_vue else self.handler_map
+        handler_rules = self.vue_handler_rules if is_vue else self.handler_rules
+        handler_prefixes = self.vue_handler_prefixes if is_vue else self.handler_prefixes
+        active_kinds = {kind for kind, kind_rules in handler_rules.items() if kind_rules & enabled}
+        rules_signature = ",".join(sorted(enabled))
+        verdict_cache = self.verdict_cache
+
+        for start in range(0, len(names), FEATURE_BATCH_SIZE):
+            occurrences = []
+            resolved: Dict[VerdictKey, Tuple[Verdict, ...]] = {}
+            # 类别 -> {缓存键: (名称, DataType)}
+            pending: Dict[str, Dict[VerdictKey, Tuple[str, str]]] = {}
+
+            for name_info in names[start:start + FEATURE_BATCH_SIZE]:
+                name_type = name_info.get("Type", "").lower()
+                name = name_info.get("Name", "")
+                line = name_info.get("Line", 0)
+                data_type = name_info.get("DataType", "")
+                span = name_info.get("Span")
+
+                if not name or name.startswith("<") or name.startswith("_"):
+                    continue
+
+                # 根据语言选择不同的处理器
+                if is_vue:
+                    # 对于Vue，使用DataType字段来确定处理器
+                    kind = data_type if data_type else name_type
+                    if kind not in active_kinds:
+                        continue
+                    key = (language, kind, data_type, name, rules_signature)
+                else:
+                    # C# 处理器不使用 DataType，不纳入缓存键以提高命中率
+                    kind = name_type
+                    if kind not in active_kinds:
+                        continue
+                    key = (language, kind, "", name, rules_signature)
+
+                occurrences.append((name, line, span, key))
+                if key in resolved or key in pending.get(kind, ()):
+                    continue
+                verdicts = verdict_cache.get(key)
+                if verdicts is None:
+                    pending.setdefault(kind, {})[key] = (name, data_type)
+                else:
+                    resolved[key] = verdicts
+
+            for kind, entries in pending.items():
+                with stage(("rule.vue." if is_vue else "rule.") + kind):
+                    batch = IdentifierBatch([name for name, _ in entries.values()], handler_prefixes.get(kind))
+                    batch_verdicts = handler_map[kind](batch, [data_type for _, data_type in entries.values()], enabled)
+                for key, verdicts in zip(entries, batch_verdicts):
+                    resolved[key] = tuple(verdicts)
+                    verdict_cache.put(key, resolved[key])
+
+            for name, line, span, key in occurrences:
+                for rule_id, message, severity in resolved[key]:
+                    yield AnalysisResult(line=line, name=name, rule_id=rule_id, message=message, severity=severity, span=span)
     
-    def _analyze_property_name(self, name: str, line: int) -> List[AnalysisResult]:
+    def suggest_name(self, rule_id: str, name: str, message: str = "") -> Optional[str]:
+        """问题对应的建议名称（用于重命名快速修复）；规则无法自动给出建议时返回 None"""
+        match = SUGGESTION_PATTERN.search(message)
+        if match:
+            suggestion = match.group(1)
+        elif rule_id in PASCAL_CASE_RULES:
+            suggestion = self._to_pascal_case(name)
+        elif rule_id in CAMEL_CASE_RULES:
+            suggestion = self._to_camel_case(name)
+        elif rule_id == "I001":
+            core = name[1:] if len(name) > 1 and name[0] == "I" and name[1].isupper() else name
+            suggestion = "I" + self._to_pascal_case(core)
+        else:
+            return None
+
+        if suggestion == name or not IDENTIFIER_PATTERN.match(suggestion):
+            return None
+        return suggestion
+
+    def iter_project_findings(
+        self,
+        index: SymbolIndex,
+        enabled_rules: Optional[AbstractSet[str]] = None
+    ) -> Iterator[Tuple[str, AnalysisResult]]:
+        """
+        项目级规则：基于符号索引跨文件检查，逐个产出 (文件, 问题)
+
+        各规则只查询索引中的映射（概念、类型名、基类型），开销与相关的声明数成正比，
+        不需要在文件之间两两比较。
+        """
+        enabled = self.all_rules if enabled_rules is None else enabled_rules
+        checks = (
+            ("S001", self._check_concept_consistency),
+            ("S002", self._check_interface_implementations),
+            ("S003", self._check_duplicate_types),
+        )
+        for rule_id, check in checks:
+            if rule_id in enabled:
+                with stage("rule.project." + rule_id):
+                    findings = check(index)
+                yield from findings
+
+    def _check_concept_consistency(self, index: SymbolIndex) -> List[Tuple[str, AnalysisResult]]:
+        """同一概念（缩写展开后单词相同）有多种写法时，报告少数写法（数量相同时以不含缩写的写法为准）"""
         results = []
-        if not self._is_pascal_case(name):
-            results.append(AnalysisResult(line=line, name=name, rule_id="P001", message=f"属性名 '{name}' 应使用帕斯卡命名法（PascalCase）", severity="warning"))
-        
-        boolean_prefixes = ["Is", "Has", "Can", "Should", "Will", "Would", "Could", "Must", "Might"]
-        is_boolean_property = any(name.startswith(prefix) for prefix in boolean_prefixes)
-        
-        if not is_boolean_property and not self._is_noun_phrase(name):
-            results.append(AnalysisResult(line=line, name=name, rule_id="P002", message=f"属性名 '{name}' 应为名词或名词短语", severity="info"))
+        severity = self.rule_severities["S001"]
+        for concept in list(index.abbreviated):
+            members = index.concepts[concept]
+            spellings = Counter(index.symbol(ref).words for ref in members)
+            if len(spellings) < 2:
+                continue
+            preferred = max(spellings, key=lambda words: (spellings[words], words == concept, words))
+            for ref in sorted(members):
+                symbol = index.symbol(ref)
+                if symbol.words == preferred:
+                    continue
+                suggestion = self._restyle(preferred, symbol.name)
+                results.append((ref[0], AnalysisResult(
+                    line=symbol.line, name=symbol.name, rule_id="S001",
+                    message=f"名称 '{symbol.name}' 与项目中其他 {spellings[preferred]} 处对同一概念的命名不一致，建议：'{suggestion}'",
+                    severity=severity
+                )))
         return results
-    
-    def _analyze_field_name(self, name: str, line: int) -> List[AnalysisResult]:
+
+    def _check_interface_implementations(self, index: SymbolIndex) -> List[Tuple[str, AnalysisResult]]:
+        """类实现了项目中声明的接口，但类名不包含其中任何一个接口的核心名词（如 UserStore : IUserRepository）"""
+        heads: Dict[str, Optional[str]] = {}
+
+        def interface_head(type_name: str) -> Optional[str]:
+            if type_name not in heads:
+                heads[type_name] = self._interface_head(index, type_name)
+            return heads[type_name]
+
+        candidates: Set[SymbolRef] = set()
+        for base_name, refs in index.implementations.items():
+            if interface_head(base_name) is not None:
+                candidates |= refs
+
         results = []
-        if name.startswith("_"):
-            field_name = name.lstrip("_")
-            if field_name.isupper() or "_" in field_name:
-                results.append(AnalysisResult(line=line, name=name, rule_id="F001", message=f"私有字段名 '{name}' 应使用驼峰命名法（camelCase，去除下划线后）", severity="warning"))
-            elif not self._is_camel_case(field_name):
-                results.append(AnalysisResult(line=line, name=name, rule_id="F001", message=f"私有字段名 '{name}' 应使用驼峰命名法（camelCase，去除下划线后）", severity="warning"))
-        elif not self._is_pascal_case(name):
-             results.append(AnalysisResult(line=line, name=name, rule_id="F001", message=f"公有/内部字段名 '{name}' 应使用帕斯卡命名法（PascalCase）", severity="warning"))
+        severity = self.rule_severities["S002"]
+        for ref in sorted(candidates):
+            symbol = index.symbol(ref)
+            if symbol.kind != "class":
+                continue
+            implemented = [(base, interface_head(base)) for base in symbol.bases if interface_head(base)]
+            concept = set(symbol.concept)
+            if not implemented or any(head in concept for _, head in implemented):
+                continue
+            base, head = implemented[0]
+            results.append((ref[0], AnalysisResult(
+                line=symbol.line, name=symbol.name, rule_id="S002",
+                message=f"类名 '{symbol.name}' 应体现其实现的接口 '{base}'（包含 '{head.capitalize()}'）",
+                severity=severity
+            )))
         return results
-    
-    def _analyze_variable_name(self, name: str, line: int) -> List[AnalysisResult]:
+
+    def _check_duplicate_types(self, index: SymbolIndex) -> List[Tuple[str, AnalysisResult]]:
+        """同名的类/接口声明在多个不同的命名空间中（同一命名空间中的 partial 类不算重复）"""
         results = []
-        if not self._is_camel_case(name):
-            results.append(AnalysisResult(line=line, name=name, rule_id="V001", message=f"变量名 '{name}' 应使用驼峰命名法（camelCase）", severity="warning"))
-        if len(name) == 1 and name not in "ijkxyz":
-            results.append(AnalysisResult(line=line, name=name, rule_id="V002", message=f"变量名 '{name}' 应更具描述性", severity="info"))
+        severity = self.rule_severities["S003"]
+        for name, refs in index.types.items():
+            if len(refs) < 2:
+                continue
+            namespaces = {index.symbol(ref).namespace for ref in refs} - {None}
+            if len(namespaces) < 2:
+                continue
+            listed = sorted(namespace or "全局命名空间" for namespace in namespaces)
+            description = "、".join(listed[:3]) + ("等" if len(listed) > 3 else "")
+            for ref in sorted(refs):
+                symbol = index.symbol(ref)
+                if symbol.namespace is None:
+                    continue
+                results.append((ref[0], AnalysisResult(
+                    line=symbol.line, name=name, rule_id="S003",
+                    message=f"类型名 '{name}' 在 {len(namespaces)} 个命名空间中重复（{description}）",
+                    severity=severity
+                )))
         return results
 
-    def _analyze_vue_method_name(self, name: str, line: int, method_type: str) -> List[AnalysisResult]:
+    def _interface_head(self, index: SymbolIndex, type_name: str) -> Optional[str]:
+        """项目中声明的接口的核心名词（去掉 I 前缀后的最后一个单词）；不是项目中的接口或以 -able 结尾时返回 None"""
+        refs = index.types.get(type_name)
+        if not refs or not any(index.symbol(ref).kind == "interface" for ref in refs):
+            return None
+        core = type_name[1:] if len(type_name) > 1 and type_name[0] == "I" and type_name[1].isupper() else type_name
+        words = expand_words(split_words(core))
+        if not words or words[-1].endswith(("able", "ible")):
+            return None
+        return words[-1]
+
+    def _restyle(self, words: Tuple[str, ...], original: str) -> str:
+        """按 original 的命名风格（帕斯卡、驼峰、下划线）拼接单词"""
+        if "_" in original.strip("_"):
+            joined = "_".join(words)
+            return joined.upper() if original.isupper() else joined
+        pascal = "".join(word.capitalize() for word in words)
+        return pascal if original[:1].isupper() else pascal[:1].lower() + pascal[1:]
+
+    def _flag(
+        self,
+        verdicts: List[List[Verdict]],
+        batch: IdentifierBatch,
+        mask: int,
+        rule_id: str,
+        message: Callable[[str, int], str]
+    ):
+        """为掩码中的每个名称追加一条判定（message 为 (名称, 批内下标) -> 消息）"""
+        severity = self.rule_severities[rule_id]
+        for index in iter_bits(mask):
+            verdicts[index].append((rule_id, message(batch.names[index], index), severity))
+
+    def _batch_class_names(self, batch: IdentifierBatch, data_types: Sequence[str], enabled: AbstractSet[str]) -> List[List[Verdict]]:
+        verdicts: List[List[Verdict]] = [[] for _ in batch.names]
+        if "C001" in enabled:
+            self._flag(verdicts, batch, batch.all & ~batch.pascal, "C001", lambda name, _: f"类名 '{name}' 应使用帕斯卡命名法（PascalCase）")
+        if "C002" in enabled:
+            self._flag(verdicts, batch, batch.all & ~self._noun_mask(batch, batch.all), "C002", lambda name, _: f"类名 '{name}' 应为名词或名词短语")
+        return verdicts
+
+    def _batch_interface_names(self, batch: IdentifierBatch, data_types: Sequence[str], enabled: AbstractSet[str]) -> List[List[Verdict]]:
+        verdicts: List[List[Verdict]] = [[] for _ in batch.names]
+        if "I001" in enabled:
+            valid = batch.prefixed["interface"] & batch.tail_pascal(1)
+            self._flag(verdicts, batch, batch.all & ~valid, "I001", lambda name, _: f"接口名 '{name}' 应以大写字母'I'开头并使用帕斯卡命名法（PascalCase）")
+        return verdicts
+
+    def _batch_method_names(self, batch: IdentifierBatch, data_types: Sequence[str], enabled: AbstractSet[str]) -> List[List[Verdict]]:
+        verdicts: List[List[Verdict]] = [[] for _ in batch.names]
+        checked = batch.all & ~batch.select(SPECIAL_METHODS) & ~batch.prefixed["ignored"]
+        if "M001" in enabled:
+            self._flag(verdicts, batch, checked & ~batch.pascal, "M001", lambda name, _: f"方法名 '{name}' 应使用帕斯卡命名法（PascalCase）")
+        if "M002" in enabled:
+            self._flag(verdicts, batch, checked & ~self._verb_mask(batch, checked), "M002", lambda name, _: f"方法名 '{name}' 应以动词开头")
+        return verdicts
+
+    def _batch_property_names(self, batch: IdentifierBatch, data_types: Sequence[str], enabled: AbstractSet[str]) -> List[List[Verdict]]:
+        verdicts: List[List[Verdict]] = [[] for _ in batch.names]
+        if "P001" in enabled:
+            self._flag(verdicts, batch, batch.all & ~batch.pascal, "P001", lambda name, _: f"属性名 '{name}' 应使用帕斯卡命名法（PascalCase）")
+        if "P002" in enabled:
+            # 布尔属性（IsXxx、HasXxx 等）不要求为名词
+            checked = batch.all & ~batch.prefixed["boolean"]
+            self._flag(verdicts, batch, checked & ~self._noun_mask(batch, checked), "P002", lambda name, _: f"属性名 '{name}' 应为名词或名词短语")
+        return verdicts
+
+    def _batch_field_names(self, batch: IdentifierBatch, data_types: Sequence[str], enabled: AbstractSet[str]) -> List[List[Verdict]]:
+        verdicts: List[List[Verdict]] = [[] for _ in batch.names]
+        if "F001" not in enabled:
+            return verdicts
+        private = batch.prefixed["private"]
+        invalid_private = 0
+        for index in iter_bits(private):
+            field_name = batch.names[index].lstrip("_")
+            match = CASE_PATTERN.match(field_name)
+            if field_name.isupper() or "_" in field_name or match is None or match.lastgroup != "camel":
+                invalid_private |= 1 << index
+        self._flag(verdicts, batch, invalid_private, "F001", lambda name, _: f"私有字段名 '{name}' 应使用驼峰命名法（camelCase，去除下划线后）")
+        self._flag(verdicts, batch, batch.all & ~private & ~batch.pascal, "F001", lambda name, _: f"公有/内部字段名 '{name}' 应使用帕斯卡命名法（PascalCase）")
+        return verdicts
+
+    def _batch_variable_names(self, batch: IdentifierBatch, data_types: Sequence[str], enabled: AbstractSet[str]) -> List[List[Verdict]]:
+        verdicts: List[List[Verdict]] = [[] for _ in batch.names]
+        if "V001" in enabled:
+            self._flag(verdicts, batch, batch.all & ~batch.camel, "V001", lambda name, _: f"变量名 '{name}' 应使用驼峰命名法（camelCase）")
+        if "V002" in enabled:
+            # 循环变量和坐标（i、j、k、x、y、z）除外
+            single = batch.length_at_most(1) & ~batch.length_at_most(0)
+            self._flag(verdicts, batch, single & ~batch.select("ijkxyz"), "V002", lambda name, _: f"变量名 '{name}' 应更具描述性")
+        return verdicts
+
+    def _batch_parameter_names(self, batch: IdentifierBatch, data_types: Sequence[str], enabled: AbstractSet[str]) -> List[List[Verdict]]:
+        verdicts: List[List[Verdict]] = [[] for _ in batch.names]
+        if "PA001" in enabled:
+            self._flag(verdicts, batch, batch.all & ~batch.camel, "PA001", lambda name, _: f"参数名 '{name}' 应使用驼峰命名法（camelCase）")
+        if "PA002" in enabled:
+            short = batch.length_at_most(2) & ~batch.select(["id", "x", "y", "z", "ex"])
+            self._flag(verdicts, batch, short, "PA002", lambda name, _: f"参数名 '{name}' 应更具描述性")
+        return verdicts
+
+    def _batch_vue_method_names(self, batch: IdentifierBatch, data_types: Sequence[str], enabled: AbstractSet[str]) -> List[List[Verdict]]:
         """分析Vue.js方法名"""
-        results = []
+        verdicts: List[List[Verdict]] = [[] for _ in batch.names]
 
         # 跳过Vue生命周期方法
-        vue_lifecycle = {
-            'beforeCreate', 'created', 'beforeMount', 'mounted',
-            'beforeUpdate', 'updated', 'beforeUnmount', 'unmounted',
-            'beforeDestroy', 'destroyed', 'activated', 'deactivated',
-            'errorCaptured', 'renderTracked', 'renderTriggered',
-            'onBeforeMount', 'onMounted', 'onBeforeUpdate', 'onUpdated',
-            'onBeforeUnmount', 'onUnmounted', 'onActivated', 'onDeactivated',
-            'onErrorCaptured', 'onRenderTracked', 'onRenderTriggered'
-        }
-
-        if name in vue_lifecycle:
-            return results
+        checked = batch.all & ~batch.select(VUE_LIFECYCLE_HOOKS)
 
         # VM001: Vue方法名应使用camelCase
-        if not self._is_camel_case(name):
-            suggested_name = self._to_camel_case(name)
-            results.append(AnalysisResult(
-                line=line,
-                name=name,
-                rule_id="VM001",
-                message=f"Vue方法名 '{name}' 应使用驼峰命名法（camelCase）。建议：'{suggested_name}'",
-                severity="warning"
-            ))
+        if "VM001" in enabled:
+            self._flag(
+                verdicts, batch, checked & ~batch.camel, "VM001",
+                lambda name, _: f"Vue方法名 '{name}' 应使用驼峰命名法（camelCase）。建议：'{self._to_camel_case(name)}'"
+            )
 
         # VM002: Vue方法名应具有描述性
-        if len(name) <= 2 and name not in ["go", "do", "is", "on"]:
-            results.append(AnalysisResult(
-                line=line,
-                name=name,
-                rule_id="VM002",
-                message=f"Vue方法名 '{name}' 应更具描述性",
-                severity="info"
-            ))
+        if "VM002" in enabled:
+            short = batch.length_at_most(2) & ~batch.select(["go", "do", "is", "on"])
+            self._flag(verdicts, batch, checked & short, "VM002", lambda name, _: f"Vue方法名 '{name}' 应更具描述性")
 
         # VM003: 事件处理方法应以'handle'或'on'开头
-        if method_type == 'event_handler' and not (name.startswith('handle') or name.startswith('on')):
-            suggested_name = f"handle{name[0].upper()}{name[1:]}" if name else "handleEvent"
-            results.append(AnalysisResult(
-                line=line,
-                name=name,
-                rule_id="VM003",
-                message=f"事件处理方法 '{name}' 应以'handle'或'on'开头。建议：'{suggested_name}'",
-                severity="info"
-            ))
+        if "VM003" in enabled:
+            handlers = bits(index for index, data_type in enumerate(data_types) if data_type == "event_handler")
+            self._flag(
+                verdicts, batch, checked & handlers & ~batch.prefixed["handler"], "VM003",
+                lambda name, _: f"事件处理方法 '{name}' 应以'handle'或'on'开头。建议：'handle{name[0].upper()}{name[1:]}'"
+            )
 
         # VM004: 避免使用中文字符或特殊符号
-        if re.search(r'[\u4e00-\u9fff]', name) or re.search(r'[^\w]', name):
-            results.append(AnalysisResult(
-                line=line,
-                name=name,
-                rule_id="VM004",
-                message=f"方法名 '{name}' 应避免使用中文字符或特殊符号",
-                severity="warning"
-            ))
+        if "VM004" in enabled:
+            self._flag(verdicts, batch, checked & (batch.cjk | batch.special), "VM004", lambda name, _: f"方法名 '{name}' 应避免使用中文字符或特殊符号")
 
         # VM005: 异步方法建议包含'async'或相关描述词
         # 这个检查需要在解析器中提供is_async信息，暂时跳过
 
         # VM006: Computed属性名应为描述性名词
-        if method_type == 'computed' and not self._is_noun_phrase(name):
-            results.append(AnalysisResult(
-                line=line,
-                name=name,
-                rule_id="VM006",
-                message=f"计算属性名 '{name}' 应为有意义的名词",
-                severity="info"
-            ))
+        if "VM006" in enabled:
+            computed = checked & bits(index for index, data_type in enumerate(data_types) if data_type == "computed")
+            self._flag(verdicts, batch, computed & ~self._noun_mask(batch, computed), "VM006", lambda name, _: f"计算属性名 '{name}' 应为有意义的名词")
 
-        return results
+        return verdicts
 
-    def _analyze_vue_variable_name(self, name: str, line: int, var_type: str) -> List[AnalysisResult]:
+    def _batch_vue_variable_names(self, batch: IdentifierBatch, data_types: Sequence[str], enabled: AbstractSet[str]) -> List[List[Verdict]]:
         """分析Vue.js变量名（ref/reactive）"""
-        results = []
+        verdicts: List[List[Verdict]] = [[] for _ in batch.names]
 
         # VM001: Vue变量名应使用camelCase
-        if not self._is_camel_case(name):
-            suggested_name = self._to_camel_case(name)
-            results.append(AnalysisResult(
-                line=line,
-                name=name,
-                rule_id="VM001",
-                message=f"Vue变量名 '{name}' 应使用驼峰命名法（camelCase）。建议：'{suggested_name}'",
-                severity="warning"
-            ))
+        if "VM001" in enabled:
+            self._flag(
+                verdicts, batch, batch.all & ~batch.camel, "VM001",
+                lambda name, _: f"Vue变量名 '{name}' 应使用驼峰命名法（camelCase）。建议：'{self._to_camel_case(name)}'"
+            )
 
         # VM002: Vue变量名应具有描述性
-        if len(name) <= 2 and name not in ["id", "x", "y", "z"]:
-            results.append(AnalysisResult(
-                line=line,
-                name=name,
-                rule_id="VM002",
-                message=f"Vue变量名 '{name}' 应更具描述性",
-                severity="info"
-            ))
+        if "VM002" in enabled:
+            short = batch.length_at_most(2) & ~batch.select(["id", "x", "y", "z"])
+            self._flag(verdicts, batch, short, "VM002", lambda name, _: f"Vue变量名 '{name}' 应更具描述性")
 
         # VM004: 避免使用中文字符或特殊符号
-        if re.search(r'[\u4e00-\u9fff]', name) or re.search(r'[^\w]', name):
-            results.append(AnalysisResult(
-                line=line,
-                name=name,
-                rule_id="VM004",
-                message=f"变量名 '{name}' 应避免使用中文字符或特殊符号",
-                severity="warning"
-            ))
+        if "VM004" in enabled:
+            self._flag(verdicts, batch, batch.cjk | batch.special, "VM004", lambda name, _: f"变量名 '{name}' 应避免使用中文字符或特殊符号")
 
-        return results
+        return verdicts
 
-    def _analyze_vue_computed_name(self, name: str, line: int, computed_type: str) -> List[AnalysisResult]:
+    def _batch_vue_computed_names(self, batch: IdentifierBatch, data_types: Sequence[str], enabled: AbstractSet[str]) -> List[List[Verdict]]:
         """分析Vue.js计算属性名"""
-        results = []
+        verdicts: List[List[Verdict]] = [[] for _ in batch.names]
 
         # VM001: Vue计算属性名应使用camelCase
-        if not self._is_camel_case(name):
-            suggested_name = self._to_camel_case(name)
-            results.append(AnalysisResult(
-                line=line,
-                name=name,
-                rule_id="VM001",
-                message=f"Vue计算属性名 '{name}' 应使用驼峰命名法（camelCase）。建议：'{suggested_name}'",
-                severity="warning"
-            ))
+        if "VM001" in enabled:
+            self._flag(
+                verdicts, batch, batch.all & ~batch.camel, "VM001",
+                lambda name, _: f"Vue计算属性名 '{name}' 应使用驼峰命名法（camelCase）。建议：'{self._to_camel_case(name)}'"
+            )
 
-        # VM006: Computed属性名应为描述性名词
-        verb_prefixes = ['get', 'set', 'fetch', 'load', 'save', 'update', 'delete', 'create', 'make', 'build', 'generate']
-        for prefix in verb_prefixes:
-            if name.startswith(prefix) and len(name) > len(prefix):
-                suggested_name = name[len(prefix):]
-                suggested_name = suggested_name[0].lower() + suggested_name[1:] if suggested_name else name
-                results.append(AnalysisResult(
-                    line=line,
-                    name=name,
-                    rule_id="VM006",
-                    message=f"计算属性名 '{name}' 应为名词，不应为动词。建议：'{suggested_name}'",
-                    severity="info"
-                ))
-                break
+        # VM006: Computed属性名应为描述性名词，以动词前缀开头时建议去掉前缀
+        if "VM006" in enabled:
+            prefix_ids = batch.prefix_ids["computed_verb"]
+
+            def message(name: str, index: int) -> str:
+                suggested_name = name[len(COMPUTED_VERB_PREFIXES[prefix_ids[index]]):]
+                suggested_name = suggested_name[0].lower() + suggested_name[1:]
+                return f"计算属性名 '{name}' 应为名词，不应为动词。建议：'{suggested_name}'"
+
+            self._flag(verdicts, batch, batch.prefixed["computed_verb"], "VM006", message)
 
         # VM004: 避免使用中文字符或特殊符号
-        if re.search(r'[\u4e00-\u9fff]', name) or re.search(r'[^\w]', name):
-            results.append(AnalysisResult(
-                line=line,
-                name=name,
-                rule_id="VM004",
-                message=f"计算属性名 '{name}' 应避免使用中文字符或特殊符号",
-                severity="warning"
-            ))
+        if "VM004" in enabled:
+            self._flag(verdicts, batch, batch.cjk | batch.special, "VM004", lambda name, _: f"计算属性名 '{name}' 应避免使用中文字符或特殊符号")
 
-        return results
+        return verdicts
 
-    def _analyze_vue_parameter_name(self, name: str, line: int, param_type: str) -> List[AnalysisResult]:
+    def _batch_vue_parameter_names(self, batch: IdentifierBatch, data_types: Sequence[str], enabled: AbstractSet[str]) -> List[List[Verdict]]:
         """分析Vue.js参数名"""
-        results = []
+        verdicts: List[List[Verdict]] = [[] for _ in batch.names]
 
         # VM001: Vue参数名应使用camelCase
-        if not self._is_camel_case(name):
-            suggested_name = self._to_camel_case(name)
-            results.append(AnalysisResult(
-                line=line,
-                name=name,
-                rule_id="VM001",
-                message=f"Vue参数名 '{name}' 应使用驼峰命名法（camelCase）。建议：'{suggested_name}'",
-                severity="warning"
-            ))
+        if "VM001" in enabled:
+            self._flag(
+                verdicts, batch, batch.all & ~batch.camel, "VM001",
+                lambda name, _: f"Vue参数名 '{name}' 应使用驼峰命名法（camelCase）。建议：'{self._to_camel_case(name)}'"
+            )
 
         # VM002: Vue参数名应具有描述性
-        if len(name) <= 2 and name not in ["id", "x", "y", "z", "ex"]:
-            results.append(AnalysisResult(
-                line=line,
-                name=name,
-                rule_id="VM002",
-                message=f"Vue参数名 '{name}' 应更具描述性",
-                severity="info"
-            ))
+        if "VM002" in enabled:
+            short = batch.length_at_most(2) & ~batch.select(["id", "x", "y", "z", "ex"])
+            self._flag(verdicts, batch, short, "VM002", lambda name, _: f"Vue参数名 '{name}' 应更具描述性")
 
         # VM004: 避免使用中文字符或特殊符号
-        if re.search(r'[\u4e00-\u9fff]', name) or re.search(r'[^\w]', name):
-            results.append(AnalysisResult(
-                line=line,
-                name=name,
-                rule_id="VM004",
-                message=f"参数名 '{name}' 应避免使用中文字符或特殊符号",
-                severity="warning"
-            ))
-
-        return results
+        if "VM004" in enabled:
+            self._flag(verdicts, batch, batch.cjk | batch.special, "VM004", lambda name, _: f"参数名 '{name}' 应避免使用中文字符或特殊符号")
 
-    def _analyze_parameter_name(self, name: str, line: int) -> List[AnalysisResult]:
-        results = []
-        if not self._is_camel_case(name):
-            results.append(AnalysisResult(line=line, name=name, rule_id="PA001", message=f"参数名 '{name}' 应使用驼峰命名法（camelCase）", severity="warning"))
-        if len(name) <= 2 and name not in ["id", "x", "y", "z", "ex"]:
-            results.append(AnalysisResult(line=line, name=name, rule_id="PA002", message=f"参数名 '{name}' 应更具描述性", severity="info"))
-        return results
-
-
-    def _is_pascal_case(self, name: str) -> bool:
-        return bool(re.match(r'^[A-Z][a-zA-Z0-9]*$', name))
+        return verdicts
 
-    def _is_camel_case(self, name: str) -> bool:
-        return bool(re.match(r'^[a-z][a-zA-Z0-9]*$', name))
+    def _verb_mask(self, batch: IdentifierBatch, within: int) -> int:
+        """within 中以动词开头的名称（常见动词直接判定，其余按首单词的词性，每个单词只标注一次）"""
+        return batch.first_word_mask(
+            lambda word: word in COMMON_VERBS or self._checked_tag(word, "nltk.verb").startswith("VB"),
+            within
+        )
 
-    def _split_case(self, name: str) -> List[str]:
-        return re.findall(r'[A-Z][a-z0-9]*|[a-z]+[a-z0-9]*', name)
+    def _noun_mask(self, batch: IdentifierBatch, within: int) -> int:
+        """within 中以名词结尾的名称（按末单词的词性，每个单词只标注一次）"""
+        return batch.last_word_mask(lambda word: self._checked_tag(word, "nltk.noun").startswith("NN"), within)
 
-    def _starts_with_verb(self, name: str) -> bool:
+    def _checked_tag(self, word: str, stage_name: str) -> str:
         try:
-            words = self._split_case(name)
-            if not words:
-                return False
-            
-            first_word = words[0].lower()
-            common_verbs = {
-                "get", "set", "is", "has", "can", "should", "will", "would", "could",
-                "add", "remove", "delete", "create", "update", "save", "load", "insert",
-                "find", "search", "filter", "sort", "validate", "check", "verify",
-                "calculate", "compute", "process", "handle", "execute", "run", "perform",
-                "start", "stop", "pause", "resume", "reset", "clear", "clean", "flush",
-                "build", "make", "construct", "destroy", "dispose", "release",
-                "batch", "parse", "format", "convert", "transform", "map", "reduce", "merge",
-                "generate", "render", "display", "show", "hide", "toggle", "switch", "process",
-                "send", "receive", "transmit", "broadcast", "publish", "subscribe",
-                "connect", "disconnect", "bind", "unbind", "attach", "detach",
-                "open", "close", "read", "write", "copy", "move", "rename", "backup",
-                "import", "export", "sync", "upload", "download", "fetch", "push", "pull",
-                "enable", "disable", "activate", "deactivate", "initialize", "finalize",
-                "begin", "end", "complete", "finish", "cancel", "abort", "retry",
-                "lock", "unlock", "encrypt", "decrypt", "compress", "decompress",
-                "serialize", "deserialize", "encode", "decode", "hash", "sign",
-                "click", "select", "choose", "pick", "drag", "drop", "scroll", "zoom",
-                "navigate", "redirect", "refresh", "reload", "submit", "apply", "confirm",
-                "query", "count", "sum", "average", "group", "join", "split", "slice",
-                "append", "prepend", "replace", "substitute", "trim", "pad", "fill",
-                "track", "monitor", "observe", "watch", "listen", "notify", "alert",
-                "log", "record", "store", "cache", "buffer", "queue", "schedule"
-            }
-            if first_word in common_verbs:
-                return True
-
-            tokens = nltk.word_tokenize(first_word)
-            if tokens:
-                pos_tags = nltk.pos_tag(tokens)
-                return pos_tags[0][1].startswith('VB')
+            return self._word_tag(word, stage_name)
         except Exception as e:
-            print(f"Error during NLTK verb check for '{name}': {e}")
-        return False
-
-    def _is_noun_phrase(self, name: str) -> bool:
-        try:
-            words = self._split_case(name)
-            if not words:
-                return False
-            
-            last_word = words[-1].lower()
-            tokens = nltk.word_tokenize(last_word)
-            if tokens:
-                pos_tags = nltk.pos_tag(tokens)
-                return pos_tags[0][1].startswith('NN')
-        except Exception as e:
-            print(f"Error during NLTK noun check for '{name}': {e}")
-        return False
+            print(f"Error during NLTK check for '{word}': {e}")
+        return ""
+
+    def tag_word(self, word: str) -> Optional[str]:
+        """用 NLTK 标注单个单词的词性（先分词，取第一个词元的标注）"""
+        nltk = load_nltk()
+        tokens = nltk.word_tokenize(word)
+        if not tokens:
+            return None
+        return nltk.pos_tag(tokens)[0][1]
+
+    def _word_tag(self, word: str, stage_name: str) -> str:
+        """单词的词性，优先查共享词表；无法标注时返回空字符串"""
+        if self.lexicon is not None:
+            tag = self.lexicon.get(word)
+            if tag is not None:
+                return tag
+        with stage(stage_name):
+            return self.tag_word(word) or ""
 
     def _to_camel_case(self, name: str) -> str:
         """将名称转换为camelCase"""
@@ -437,4 +700,9 @@ class NamingAnalyzer:
         if name and name[0].isupper():
             return name[0].lower() + name[1:]
 
-        return name
\ No newline at end of file
+        return name
+
+    def _to_pascal_case(self, name: str) -> str:
+        """将名称转换为PascalCase"""
+        camel = self._to_camel_case(name)
+        return camel[:1].upper() + camel[1:]
\ No newline at end of file
@@ -0,0 +1,149 @@
+"""
+分阶段性能剖析 - 记录分析流水线各阶段及各规则的墙钟时间与 CPU 时间
+
+未启用剖析时 stage() 返回共享的空上下文，开销仅为一次 ContextVar 读取。
+阶段计时是包含式的：例如 "analyze" 包含其中所有 "rule.*" 与 "nltk.*" 的耗时。
+"""
+
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# 规则相关的阶段前缀，报告中单独列出
+RULE_STAGE_PREFIXES = ("rule.", "nltk.")
+
+_NULL_STAGE = nullcontext()
+
+@dataclass
+class StageStats:
+    wall: float = 0.0
+    cpu: float = 0.0
+    count: int = 0
+
+    def add(self, wall: float, cpu: float, count: int = 1):
+        self.wall += wall
+        self.cpu += cpu
+        self.count += count
+
+@dataclass
+class ProfileRecorder:
+    """单个文件或单个请求的剖析记录"""
+    name: str
+    stages: Dict[str, StageStats] = field(default_factory=dict)
+    wall: float = 0.0
+    cpu: float = 0.0
+
+    def add(self, stage_name: str, wall: float, cpu: float):
+        stats = self.stages.get(stage_name)
+        if stats is None:
+            stats = self.stages[stage_name] = StageStats()
+        stats.add(wall, cpu)
+
+    def server_timing(self) -> str:
+        """生成 Server-Timing 响应头（单位毫秒）"""
+        metrics = [f"total;dur={self.wall * 1000:.2f}"]
+        for stage_name, stats in self.stages.items():
+            metrics.append(f"{stage_name};dur={stats.wall * 1000:.2f}")
+        return ", ".join(metrics)
+
+_current_recorder: ContextVar[Optional[ProfileRecorder]] = ContextVar("profile_recorder", default=None)
+
+class _Stage:
+    __slots__ = ("recorder", "name", "wall_start", "cpu_start")
+
+    def __init__(self, recorder: ProfileRecorder, name: str):
+        self.recorder = recorder
+        self.name = name
+
+    def __enter__(self):
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.thread_time()
+
+    def __exit__(self, *exc_info):
+        self.recorder.add(
+            self.name,
+            time.perf_counter() - self.wall_start,
+            time.thread_time() - self.cpu_start
+        )
+        return False
+
+def current_recorder() -> Optional[ProfileRecorder]:
+    """返回当前上下文的剖析记录，未启用剖析时为 None"""
+    return _current_recorder.get()
+
+def stage(name: str):
+    """对一个阶段计时；未启用剖析时为空操作"""
+    recorder = _current_recorder.get()
+    if recorder is None:
+        return _NULL_STAGE
+    return _Stage(recorder, name)
+
+@contextmanager
+def record(name: str) -> Iterator[ProfileRecorder]:
+    """在当前线程/协程中启用剖析，返回本次的剖析记录"""
+    recorder = ProfileRecorder(name)
+    token = _current_recorder.set(recorder)
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    try:
+        yield recorder
+    finally:
+        recorder.wall = time.perf_counter() - wall_start
+        recorder.cpu = time.thread_time() - cpu_start
+        _current_recorder.reset(token)
+
+class Profiler:
+    """汇总一次运行中所有文件/请求的剖析数据（线程安全）"""
+
+    def __init__(self):
+        self.stages: Dict[str, StageStats] = {}
+        self.files: List[Tuple[str, float, float]] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def profile(self, name: str) -> Iterator[ProfileRecorder]:
+        """剖析一个文件/请求，结束时并入汇总"""
+        recorder: Optional[ProfileRecorder] = None
+        try:
+            with record(name) as recorder:
+                yield recorder
+        finally:
+            if recorder is not None:
+                self._merge(recorder)
+
+    def _merge(self, recorder: ProfileRecorder):
+        with self._lock:
+            self.files.append((recorder.name, recorder.wall, recorder.cpu))
+            for stage_name, stats in recorder.stages.items():
+                total = self.stages.get(stage_name)
+                if total is None:
+                    total = self.stages[stage_name] = StageStats()
+                total.add(stats.wall, stats.cpu, stats.count)
+
+    def report(self, top_n: int = 10) -> str:
+        """生成最慢文件、阶段和规则的文本报告"""
+        with self._lock:
+            files = sorted(self.files, key=lambda item: item[1], reverse=True)[:top_n]
+            stages = sorted(self.stages.items(), key=lambda item: item[1].wall, reverse=True)
+
+        pipeline_stages = [item for item in stages if not item[0].startswith(RULE_STAGE_PREFIXES)]
+        rule_stages = [item for item in stages if item[0].startswith(RULE_STAGE_PREFIXES)][:top_n]
+
+        lines = [f"=== 性能剖析（最慢的 {top_n} 项）==="]
+        lines.append(f"{'文件':<60} {'墙钟(ms)':>10} {'CPU(ms)':>10}")
+        for name, wall, cpu in files:
+            lines.append(f"{name[-60:]:<60} {wall * 1000:>10.1f} {cpu * 1000:>10.1f}")
+
+        for title, items in (("阶段", pipeline_stages), ("规则", rule_stages)):
+            lines.append("")
+            lines.append(f"{title:<30} {'次数':>8} {'墙钟(ms)':>10} {'CPU(ms)':>10} {'平均(ms)':>10}")
+            for name, stats in items:
+                average = stats.wall * 1000 / stats.count if stats.count else 0.0
+                lines.append(
+                    f"{name:<30} {stats.count:>8} {stats.wall * 1000:>10.1f} "
+                    f"{stats.cpu * 1000:>10.1f} {average:>10.3f}"
+                )
+        return "\n".join(lines)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+问题历史查询 - 统计问题历史库（cli_main.py --findings-db 写入）中的问题，无需重新分析
+"""
+
+import argparse
+import json
+import re
+import sqlite3
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+from findings_store import GROUP_COLUMNS, FindingsStore
+from rule_list import parse_rule_list
+
+DURATION_PATTERN = re.compile(r"^(\d+)([hdw])$")
+DURATION_SECONDS = {"h": 3600, "d": 86400, "w": 7 * 86400}
+
+def parse_since(value: str) -> float:
+    """解析 --since：相对时长（如 12h、30d、2w）或日期（如 2024-05-01）"""
+    match = DURATION_PATTERN.match(value)
+    if match:
+        return time.time() - int(match.group(1)) * DURATION_SECONDS[match.group(2)]
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"无效的时间: {value}（示例: 30d、12h、2024-05-01）")
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="统计问题历史库中的问题",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+示例用法:
+  %(prog)s --db findings.db --path src/Services --since 30d
+  %(prog)s --db findings.db --group-by directory --latest
+  %(prog)s --db findings.db --rules C001,M001 --group-by file --limit 10
+  %(prog)s --db findings.db --runs
+        """
+    )
+    parser.add_argument("--db", required=True, help="问题历史库文件")
+    parser.add_argument(
+        "--group-by",
+        choices=list(GROUP_COLUMNS),
+        default="rule",
+        help="分组方式（默认: rule）"
+    )
+    parser.add_argument("--path", help="只统计该文件或目录下的问题（与写入时的相对路径一致）")
+    parser.add_argument("--rules", type=parse_rule_list, help="只统计指定的规则，逗号分隔")
+    parser.add_argument("--severity", choices=["error", "warning", "info"], help="最低严重级别")
+    parser.add_argument("--since", type=parse_since, help="只统计该时间之后的运行（如 30d、12h、2024-05-01）")
+    parser.add_argument("--project", help="只统计该项目的运行")
+    parser.add_argument("--latest", action="store_true", help="只统计范围内最近的一次运行")
+    parser.add_argument("--limit", type=int, default=20, help="最多显示的分组数（默认: 20）")
+    parser.add_argument("--runs", action="store_true", help="列出最近的运行记录，而不是统计问题")
+    parser.add_argument(
+        "--output", "-o",
+        choices=["console", "json"],
+        default="console",
+        help="输出格式（默认: console）"
+    )
+    return parser.parse_args()
+
+def format_time(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M")
+
+def print_runs(runs: List[dict], output: str):
+    if output == "json":
+        print(json.dumps({"runs": runs}, ensure_ascii=False, indent=2))
+        return
+    if not runs:
+        print("没有运行记录")
+        return
+    print(f"{'编号':>6}  {'时间':<16}  {'来源':<8}  {'项目':<16}  {'文件':>7}  {'问题':>7}")
+    for run in runs:
+        print(f"{run['id']:>6}  {format_time(run['started_at']):<16}  {run['source']:<8}  "
+              f"{run['project'] or '-':<16}  {run['total_files']:>7}  {run['total_issues']:>7}"
+              f"{'  (未完成)' if run['partial'] else ''}")
+
+def print_groups(group_by: str, total_runs: int, groups: List[dict], output: str):
+    if output == "json":
+        print(json.dumps({"group_by": group_by, "runs": total_runs, "groups": groups}, ensure_ascii=False, indent=2))
+        return
+    print(f"范围内共 {total_runs} 次运行")
+    if not groups:
+        print("没有匹配的问题")
+        return
+    width = max([len(group_by)] + [len(str(group["key"])) for group in groups])
+    print(f"{group_by:<{width}}  {'问题':>8}  {'文件':>6}  {'出现的运行':>8}  {'每次运行':>8}")
+    for group in groups:
+        print(f"{str(group['key']):<{width}}  {group['findings']:>8}  {group['files']:>6}  "
+              f"{group['runs']:>8}  {group['per_run']:>8}")
+
+def main():
+    args = parse_arguments()
+    db_path = Path(args.db)
+    if not db_path.exists():
+        print(f"错误: 问题历史库不存在: {args.db}")
+        sys.exit(1)
+
+    try:
+        store = FindingsStore(db_path)
+    except (sqlite3.Error, ValueError, OSError) as e:
+        print(f"错误: 无法打开问题历史库 {args.db}: {e}")
+        sys.exit(1)
+
+    try:
+        if args.runs:
+            print_runs(store.recent_runs(args.since, args.project, args.limit), args.output)
+        else:
+            total_runs, groups = store.aggregate(
+                group_by=args.group_by,
+                path_prefix=args.path,
+                rules=args.rules,
+                severity=args.severity,
+                since=args.since,
+                project=args.project,
+                latest=args.latest,
+                limit=args.limit
+            )
+            print_groups(args.group_by, total_runs, groups, args.output)
+    finally:
+        store.close()
+
+if __name__ == "__main__":
+    main()
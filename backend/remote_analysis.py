@@ -0,0 +1,464 @@
+"""
+分布式分析 - 把文件按内容哈希分片到多个后端实例（POST /analyze/batch），合并结果
+
+- 分片：一致性哈希环（每个后端若干虚拟节点），文件内容相同则落到同一后端，
+  后端增减或下线时只有其负责的那部分文件迁移到环上的下一个后端
+- 传输：每个后端维护一组 HTTP/1.1 keep-alive 连接，同时有多个批次在途；
+  结果以分组格式（result_groups.py）gzip 压缩传输，收到后还原为完整的问题列表
+- 重试：连接失败或 5xx 时把该后端标记为下线，批次改投环上的下一个后端；
+  429 时按 Retry-After 等待后重投同一后端；503 或 C# 解析器尚未就绪的文件改投其它后端，
+  全部后端都未就绪时等待后重试，不作为最终结果
+- 合并：结果按输入顺序产出，与各后端的完成先后无关
+"""
+
+import bisect
+import gzip
+import hashlib
+import http.client
+import json
+import os
+import queue
+import socket
+import subprocess
+import sys
+import threading
+import time
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+from csharp_parser import provision_for_workers
+from file_discovery import detect_language
+from result_groups import expand_groups
+
+VIRTUAL_NODES = 64
+
+# 429 时单次等待的上限（秒）和同一批次的最多等待次数
+MAX_RETRY_AFTER = 10
+MAX_BUSY_RETRIES = 30
+
+# 所有后端都未就绪时两轮重试之间的等待（秒）
+NOT_READY_DELAY = 2
+
+class RemoteAnalysisError(Exception):
+    """后端请求失败（连接错误、超时或非预期的响应）"""
+
+class BackendBusy(Exception):
+    """后端返回 429"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"后端繁忙，{retry_after} 秒后重试")
+        self.retry_after = retry_after
+
+class BackendNotReady(Exception):
+    """后端返回 503（如 C# 解析器尚未就绪）"""
+
+def _hash_point(data: bytes) -> int:
+    return int.from_bytes(hashlib.sha1(data).digest()[:8], "big")
+
+class HashRing:
+    """一致性哈希环"""
+
+    def __init__(self, nodes: List[str], virtual_nodes: int = VIRTUAL_NODES):
+        points = sorted(
+            (_hash_point(f"{node}#{replica}".encode("utf-8")), node)
+            for node in nodes
+            for replica in range(virtual_nodes)
+        )
+        self._keys = [point for point, _ in points]
+        self._nodes = [node for _, node in points]
+
+    def walk(self, point: int) -> Iterator[str]:
+        """从 point 开始顺时针依次产出各个不同的节点"""
+        seen: Set[str] = set()
+        start = bisect.bisect_left(self._keys, point)
+        for offset in range(len(self._nodes)):
+            node = self._nodes[(start + offset) % len(self._nodes)]
+            if node not in seen:
+                seen.add(node)
+                yield node
+
+    def node_for(self, point: int, exclude: Set[str]) -> Optional[str]:
+        """point 归属的节点，跳过 exclude 中的节点；全部被排除时返回 None"""
+        return next((node for node in self.walk(point) if node not in exclude), None)
+
+class BackendClient:
+    """单个后端的 keep-alive 连接池"""
+
+    def __init__(self, endpoint: str, timeout: float = 120):
+        parsed = urlsplit(endpoint if "://" in endpoint else f"http://{endpoint}")
+        if parsed.scheme not in ("http", "https") or not parsed.hostname:
+            raise ValueError(f"无效的后端地址: {endpoint}")
+        self.endpoint = endpoint
+        self.scheme = parsed.scheme
+        self.host = parsed.hostname
+        self.port = parsed.port
+        self.base_path = parsed.path.rstrip("/")
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[http.client.HTTPConnection]" = queue.LifoQueue()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            connection_class = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+            return connection_class(self.host, self.port, timeout=self.timeout)
+
+    def post_json(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        connection = self._connection()
+        try:
+            connection.request("POST", self.base_path + path, body=body, headers={
+                "Content-Type": "application/json",
+                "Accept-Encoding": "gzip",
+                "Connection": "keep-alive",
+            })
+            response = connection.getresponse()
+            data = response.read()
+            if response.getheader("Content-Encoding", "").lower() == "gzip":
+                data = gzip.decompress(data)
+        except (OSError, EOFError, zlib.error, http.client.HTTPException) as e:
+            connection.close()
+            raise RemoteAnalysisError(f"{self.endpoint}: {e}")
+
+        if response.will_close:
+            connection.close()
+        else:
+            self._idle.put(connection)
+
+        if response.status == 429:
+            retry_after = response.getheader("Retry-After", "1")
+            raise BackendBusy(float(retry_after) if retry_after.replace(".", "", 1).isdigit() else 1.0)
+        if response.status == 503:
+            raise BackendNotReady(f"{self.endpoint}: HTTP 503 {data[:200]!r}")
+        if response.status != 200:
+            raise RemoteAnalysisError(f"{self.endpoint}: HTTP {response.status} {data[:200]!r}")
+        try:
+            return json.loads(data)
+        except ValueError as e:
+            raise RemoteAnalysisError(f"{self.endpoint}: 无效的响应: {e}")
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+@dataclass
+class _PendingFile:
+    path: Path
+    point: int
+    code: Optional[str] = None
+    future: Future = field(default_factory=Future)
+
+class ShardedAnalyzer:
+    """
+    把文件分片到多个后端分析
+
+    options 为 /analyze/batch 请求中除 files 外的字段（severity、rules 等）。
+    每个后端同时最多 concurrency 个批次在途，每批最多 batch_size 个文件。
+    """
+
+    def __init__(
+        self,
+        endpoints: List[str],
+        options: Dict[str, Any],
+        batch_size: int = 50,
+        concurrency: int = 2,
+        timeout: float = 120
+    ):
+        if not endpoints:
+            raise ValueError("至少需要一个后端")
+        self.clients = {endpoint: BackendClient(endpoint, timeout) for endpoint in endpoints}
+        self.ring = HashRing(list(self.clients))
+        self.options = options
+        self.batch_size = max(1, batch_size)
+        self.concurrency = max(1, concurrency)
+        self.down: Set[str] = set()
+        self.retried_batches = 0
+        self._lock = threading.Lock()
+
+    def _route(self, point: int, skipped: Set[str] = frozenset()) -> Optional[str]:
+        with self._lock:
+            return self.ring.node_for(point, self.down | skipped)
+
+    def _mark_down(self, endpoint: str):
+        with self._lock:
+            self.down.add(endpoint)
+
+    @staticmethod
+    def _not_ready(result: Dict[str, Any]) -> bool:
+        """后端暂时无法分析该文件（C# 解析器尚未就绪），应改投其它后端"""
+        return bool(result.get("retryable"))
+
+    def _send_batch(self, endpoint: str, batch: List[_PendingFile]):
+        """发送一个批次；出现意外的异常时批次中尚无结果的文件以错误结束，analyze() 不会一直等待"""
+        try:
+            self._deliver_batch(endpoint, batch)
+        except Exception as e:
+            for item in batch:
+                if not item.future.done():
+                    item.code = None
+                    item.future.set_result({"error": f"分析失败: {type(e).__name__}: {e}"})
+
+    def _deliver_batch(self, endpoint: str, batch: List[_PendingFile]):
+        """发送一个批次，失败时依次改投环上的下一个可用后端"""
+        busy_retries = 0
+        not_ready_rounds = 0
+        # 对本批次尚未就绪的后端（不标记为下线，之后的批次仍会发往它们）
+        skipped: Set[str] = set()
+        while True:
+            unready: List[_PendingFile] = []
+            payload = dict(self.options, response_format="grouped")
+            payload["files"] = [{"path": item.path.as_posix(), "code": item.code} for item in batch]
+            try:
+                files = self.clients[endpoint].post_json("/analyze/batch", payload)["files"]
+                if len(files) != len(batch):
+                    raise RemoteAnalysisError(f"{endpoint}: 返回的文件数与请求不一致")
+                if not all(isinstance(result, dict) for result in files):
+                    raise RemoteAnalysisError(f"{endpoint}: 无效的响应: files 中含有非对象的项")
+            except BackendBusy as e:
+                busy_retries += 1
+                if busy_retries <= MAX_BUSY_RETRIES:
+                    time.sleep(min(e.retry_after, MAX_RETRY_AFTER))
+                    continue
+                error: Exception = e
+            except BackendNotReady as e:
+                unready = batch
+                last_error: Any = str(e)
+            except (RemoteAnalysisError, KeyError, TypeError) as e:
+                error = e
+            else:
+                for item, result in zip(batch, files):
+                    if self._not_ready(result):
+                        unready.append(item)
+                        last_error = result.get("error")
+                    else:
+                        item.code = None
+                        item.future.set_result(result)
+                if not unready:
+                    return
+
+            if unready:
+                # 改投本批次中尚未回复过“未就绪”的后端；都未就绪时等待一轮后从头再试
+                skipped.add(endpoint)
+                batch = unready
+                fallback = self._route(batch[0].point, skipped)
+                if fallback is None:
+                    not_ready_rounds += 1
+                    if not_ready_rounds > MAX_BUSY_RETRIES:
+                        for item in batch:
+                            item.code = None
+                            item.future.set_result({"error": last_error})
+                        return
+                    time.sleep(NOT_READY_DELAY)
+                    skipped.clear()
+                    fallback = self._route(batch[0].point)
+                    if fallback is None:
+                        for item in batch:
+                            item.code = None
+                            item.future.set_result({"error": f"所有后端均不可用（最后一次错误: {last_error}）"})
+                        return
+                with self._lock:
+                    self.retried_batches += 1
+                endpoint = fallback
+                busy_retries = 0
+                continue
+
+            self._mark_down(endpoint)
+            fallback = self._route(batch[0].point)
+            if fallback is None:
+                for item in batch:
+                    item.code = None
+                    item.future.set_result({"error": f"所有后端均不可用（最后一次错误: {error}）"})
+                return
+            with self._lock:
+                self.retried_batches += 1
+            endpoint = fallback
+            busy_retries = 0
+
+    def analyze(self, file_paths: Iterable[Path]) -> Iterator[Tuple[Path, dict]]:
+        """
+        按输入顺序逐个产出 (路径, 结果)；结果格式与本地分析相同
+
+        输入可以是生成器，在途文件数有上限；调用方提前结束迭代时不再发送新的批次。
+        """
+        window = self.batch_size * self.concurrency * len(self.clients) * 2
+        executor = ThreadPoolExecutor(
+            max_workers=self.concurrency * len(self.clients),
+            thread_name_prefix="shard"
+        )
+        buffers: Dict[str, List[_PendingFile]] = {}
+        pending: Deque[_PendingFile] = deque()
+
+        def dispatch(endpoint: str):
+            batch = buffers.pop(endpoint, None)
+            if batch:
+                executor.submit(self._send_batch, endpoint, batch)
+
+        def flush_all():
+            for endpoint in list(buffers):
+                dispatch(endpoint)
+
+        try:
+            for file_path in file_paths:
+                item = self._prepare(file_path)
+                pending.append(item)
+                if not item.future.done():
+                    endpoint = self._route(item.point)
+                    if endpoint is None:
+                        item.future.set_result({"error": "所有后端均不可用"})
+                    else:
+                        buffers.setdefault(endpoint, []).append(item)
+                        if len(buffers[endpoint]) >= self.batch_size:
+                            dispatch(endpoint)
+
+                # 已完成的结果立即产出；在途文件过多时等待最早的文件
+                while pending and (pending[0].future.done() or len(pending) > window):
+                    if not pending[0].future.done():
+                        flush_all()
+                    head = pending.popleft()
+                    yield head.path, self._normalize(head.path, head.future.result())
+
+            flush_all()
+            while pending:
+                head = pending.popleft()
+                yield head.path, self._normalize(head.path, head.future.result())
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _prepare(self, file_path: Path) -> _PendingFile:
+        try:
+            with open(file_path, "r", encoding="utf-8") as f:
+                code = f.read()
+        except FileNotFoundError:
+            item = _PendingFile(path=file_path, point=0)
+            item.future.set_result({"error": f"文件不存在: {file_path}"})
+            return item
+        except (OSError, UnicodeDecodeError) as e:
+            item = _PendingFile(path=file_path, point=0)
+            item.future.set_result({"error": f"分析失败: {e}"})
+            return item
+
+        language = detect_language(file_path)
+        point = _hash_point(f"{language}\0{code}".encode("utf-8"))
+        return _PendingFile(path=file_path, point=point, code=code)
+
+    @staticmethod
+    def _normalize(file_path: Path, result: Dict[str, Any]) -> dict:
+        """转换为本地分析结果的格式（文件路径使用本地路径）"""
+        if "error" in result:
+            return {"file": str(file_path), "error": result["error"], "results": [], "parser_errors": []}
+        if "groups" in result:
+            # 按后端给出的原始顺序还原，与本地分析的输出完全一致
+            results = expand_groups(result)
+        else:
+            results = result.get("results", [])
+        return {
+            "file": str(file_path),
+            "results": results,
+            "parser_errors": result.get("parser_errors", []),
+            "total_issues": result.get("total_issues", len(results)),
+        }
+
+    def close(self):
+        for client in self.clients.values():
+            client.close()
+
+    def __enter__(self) -> "ShardedAnalyzer":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+class LocalBackends:
+    """在本机启动若干个后端进程（uvicorn main:app），用于在单机上模拟多节点"""
+
+    def __init__(self, count: int, startup_timeout: float = 60):
+        self.count = count
+        self.startup_timeout = startup_timeout
+        self.processes: List[subprocess.Popen] = []
+        self.endpoints: List[str] = []
+
+    def start(self) -> List[str]:
+        backend_dir = Path(__file__).parent
+        env = dict(os.environ)
+        # 每个后端的分析线程数按进程数均分 CPU
+        env.setdefault("CODENAMER_MAX_WORKERS", str(max(1, (os.cpu_count() or 1) // self.count)))
+        # 在启动后端之前构建一次 C# 解析器，各后端不再同时执行 dotnet publish；
+        # 构建失败时后端的 /ready 报告 failed，C# 文件的结果中给出该错误
+        provision_for_workers(env)
+        for _ in range(self.count):
+            port = free_port()
+            self.processes.append(subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+                 "--log-level", "warning"],
+                cwd=backend_dir,
+                env=env,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
+            ))
+            self.endpoints.append(f"http://127.0.0.1:{port}")
+
+        deadline = time.monotonic() + self.startup_timeout
+        for endpoint, process in zip(self.endpoints, self.processes):
+            while not self._ready(endpoint):
+                if process.poll() is not None:
+                    self.stop()
+                    raise RemoteAnalysisError(f"本地后端进程启动失败: {endpoint}")
+                if time.monotonic() > deadline:
+                    self.stop()
+                    raise RemoteAnalysisError(f"等待本地后端启动超时: {endpoint}")
+                time.sleep(0.2)
+        return self.endpoints
+
+    @staticmethod
+    def _ready(endpoint: str) -> bool:
+        """
+        后端的 C# 解析器已就绪（/ready 返回 200）；只检查 /health 时可能在解析器就绪前收到 C# 文件
+
+        解析器准备失败（status 为 failed）时不会再变为就绪，不再等待，C# 文件的结果中报告该错误。
+        """
+        parsed = urlsplit(endpoint)
+        connection = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=2)
+        try:
+            connection.request("GET", "/ready")
+            response = connection.getresponse()
+            if response.status == 200:
+                return True
+            try:
+                return json.loads(response.read()).get("status") == "failed"
+            except ValueError:
+                return False
+        except OSError:
+            return False
+        finally:
+            connection.close()
+
+    def stop(self):
+        for process in self.processes:
+            if process.poll() is None:
+                process.terminate()
+        for process in self.processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+        self.processes = []
+
+    def __enter__(self) -> List[str]:
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
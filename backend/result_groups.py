@@ -0,0 +1,128 @@
+"""
+分组的分析结果 - 按 规则 -> 名称 -> 行号 组织问题，消息模板只发送一次
+
+完整格式中同一名称的每次出现都是一个完整的问题对象（名称、消息、严重级别重复 N 次），
+一个在 500 个方法中出现的参数名会产生 500 个几乎相同的对象。分组格式：
+- messages: 去重后的消息模板，名称和建议名称替换为 {name}、{suggestion} 占位符
+- groups: 每条规则一组，组内每个名称一项：消息模板下标、建议名称、出现的行号及列号，
+  以及每次出现在完整格式的问题列表中的下标（order）
+
+    {"messages": ["参数名 '{name}' 应使用驼峰命名法（camelCase）"],
+     "groups": [{"rule_id": "C006", "severity": "warning",
+                 "names": [{"name": "user_id", "message": 0, "lines": [3, 9], "columns": [20, 24],
+                            "order": [0, 2]}]}]}
+
+columns 与 lines 一一对应，仅在解析器提供了精确位置时出现；名称所在的行与问题的行号不同时
+（如 C# 声明前有特性）该项为 [行号, 列号]。名称在源代码中的长度与名称不同时另有 length。
+expand_groups 按 order 还原出与完整格式相同（顺序也相同）的问题列表。
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from models import AnalysisResult
+from naming_analyzer import SUGGESTION_PATTERN
+
+# 响应格式：full 为完整的问题列表，grouped 为分组格式
+RESPONSE_FORMATS = ("full", "grouped")
+
+def message_template(name: str, message: str) -> Tuple[str, Optional[str]]:
+    """把消息中的名称和建议名称替换为占位符，返回 (模板, 建议名称)；无法无损替换时模板即消息本身"""
+    suggestion = None
+    template = message
+    match = SUGGESTION_PATTERN.search(message)
+    if match:
+        suggestion = match.group(1)
+        template = message[:match.start(1)] + "{suggestion}" + message[match.end(1):]
+    template = template.replace(f"'{name}'", "'{name}'")
+    if expand_message(template, name, suggestion) != message:
+        return message, None
+    return template, suggestion
+
+def expand_message(template: str, name: str, suggestion: Optional[str] = None) -> str:
+    message = template.replace("{name}", name)
+    if suggestion is not None:
+        message = message.replace("{suggestion}", suggestion)
+    return message
+
+def group_results(results: Iterable[Union[AnalysisResult, Dict[str, Any]]]) -> Dict[str, Any]:
+    """把问题列表转换为分组格式（保持规则、名称和行号的出现顺序）"""
+    messages: List[str] = []
+    message_indexes: Dict[str, int] = {}
+    groups: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    entries: Dict[Tuple[str, str, str, str, Optional[int]], Dict[str, Any]] = {}
+
+    for position, result in enumerate(results):
+        if isinstance(result, dict):
+            line, name, rule_id = result["line"], result["name"], result["rule_id"]
+            message, severity = result["message"], result.get("severity", "warning")
+            span = result.get("span")
+            span_line, column, length = (span["line"], span["column"], span["length"]) if span else (None, None, None)
+        else:
+            line, name, rule_id = result.line, result.name, result.rule_id
+            message, severity = result.message, result.severity
+            span = result.span
+            span_line, column, length = (span.line, span.column, span.length) if span is not None else (None, None, None)
+
+        key = (rule_id, severity, name, message, length)
+        entry = entries.get(key)
+        if entry is None:
+            group = groups.get((rule_id, severity))
+            if group is None:
+                group = groups[(rule_id, severity)] = {"rule_id": rule_id, "severity": severity, "names": []}
+            template, suggestion = message_template(name, message)
+            index = message_indexes.get(template)
+            if index is None:
+                index = message_indexes[template] = len(messages)
+                messages.append(template)
+            entry = entries[key] = {"name": name, "message": index}
+            if suggestion is not None:
+                entry["suggestion"] = suggestion
+            entry["lines"] = []
+            entry["order"] = []
+            if length is not None:
+                entry["columns"] = []
+                if length != len(name):
+                    entry["length"] = length
+            group["names"].append(entry)
+
+        entry["lines"].append(line)
+        entry["order"].append(position)
+        if length is not None:
+            entry["columns"].append(column if span_line == line else [span_line, column])
+
+    return {"messages": messages, "groups": list(groups.values())}
+
+def expand_groups(grouped: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """从分组格式还原完整格式的问题列表（按 order 恢复原来的顺序；没有 order 时按规则、名称分组后的顺序）"""
+    messages = grouped["messages"]
+    results = []
+    positions: List[int] = []
+    for group in grouped["groups"]:
+        for entry in group["names"]:
+            name = entry["name"]
+            message = expand_message(messages[entry["message"]], name, entry.get("suggestion"))
+            columns = entry.get("columns")
+            length = entry.get("length", len(name))
+            order = entry.get("order")
+            for i, line in enumerate(entry["lines"]):
+                span = None
+                if columns is not None:
+                    span_line, column = columns[i] if isinstance(columns[i], list) else (line, columns[i])
+                    span = {"line": span_line, "column": column, "length": length}
+                results.append({
+                    "line": line,
+                    "name": name,
+                    "rule_id": group["rule_id"],
+                    "message": message,
+                    "severity": group["severity"],
+                    "span": span,
+                })
+                positions.append(order[i] if order is not None else len(positions))
+    return [result for _, result in sorted(zip(positions, results), key=lambda pair: pair[0])]
+
+def grouped_file_result(file_result: Dict[str, Any]) -> Dict[str, Any]:
+    """把单个文件的结果（含 results）转换为分组格式，其余字段保持不变"""
+    grouped = {key: value for key, value in file_result.items() if key != "results"}
+    if "results" in file_result:
+        grouped.update(group_results(file_result["results"]))
+    return grouped
@@ -0,0 +1,11 @@
+"""
+规则列表参数 - CLI、语言服务器和问题查询共用的 --rules / --disable-rules 解析
+
+单独成模块，使各个命令行工具不必为此导入 cli_main 及其依赖。
+"""
+
+from typing import List
+
+def parse_rule_list(value: str) -> List[str]:
+    """解析逗号分隔的规则列表"""
+    return [rule.strip().upper() for rule in value.split(",") if rule.strip()]
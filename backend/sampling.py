@@ -0,0 +1,186 @@
+"""
+抽样估计 - 从大量源文件中分层随机抽取一部分分析，估计各规则的问题密度（每个文件的问题数）
+
+按所在的一级目录和文件大小分层，各层按文件数比例抽样（不放回）。
+分层估计量及其方差（含有限总体校正）为
+    密度 = Σ W_h · ȳ_h，  方差 = Σ W_h² · (1 - n_h/N_h) · s_h² / n_h，  W_h = N_h / N
+置信区间按正态近似计算；某层只抽到一个文件时，用全部样本的方差代替该层方差。
+"""
+
+import math
+import os
+import random
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from statistics import NormalDist
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# 文件大小分层的边界（字节）
+SIZE_BUCKETS = (2 * 1024, 8 * 1024, 32 * 1024)
+
+# 全部规则合计的键
+TOTAL = "*"
+
+def size_bucket(size: int) -> int:
+    return sum(size >= boundary for boundary in SIZE_BUCKETS)
+
+def stratum_key(file_path: Path, root: Path, size: int) -> Tuple[str, int]:
+    """文件所属的层：(相对 root 的一级目录, 大小分档)"""
+    try:
+        parts = file_path.relative_to(root).parts
+    except ValueError:
+        parts = file_path.parts
+    return (parts[0] if len(parts) > 1 else ".", size_bucket(size))
+
+@dataclass
+class RateEstimate:
+    """某条规则（或全部规则合计）的问题密度估计"""
+    rule_id: str
+    rate: float
+    half_width: float
+    population: int
+
+    @property
+    def low(self) -> float:
+        return max(0.0, self.rate - self.half_width)
+
+    @property
+    def high(self) -> float:
+        return self.rate + self.half_width
+
+    @property
+    def estimated_total(self) -> float:
+        return self.rate * self.population
+
+@dataclass
+class Stratum:
+    key: Tuple[str, int]
+    # 尚未抽取的文件（已打乱，从末尾取）
+    remaining: List[Path]
+    population: int
+    sampled: int = 0
+    sums: Counter = field(default_factory=Counter)
+    squares: Counter = field(default_factory=Counter)
+
+class StratifiedSampler:
+    """分层不放回抽样及密度估计"""
+
+    def __init__(self, file_paths: Iterable[Path], root: Path, seed: Optional[int] = None):
+        rng = random.Random(seed)
+        groups: Dict[Tuple[str, int], List[Path]] = {}
+        for file_path in file_paths:
+            try:
+                size = os.stat(file_path).st_size
+            except OSError:
+                continue
+            groups.setdefault(stratum_key(file_path, root, size), []).append(file_path)
+
+        self.strata: Dict[Tuple[str, int], Stratum] = {}
+        self._owner: Dict[Path, Stratum] = {}
+        for key in sorted(groups):
+            files = groups[key]
+            rng.shuffle(files)
+            stratum = Stratum(key=key, remaining=files, population=len(files))
+            self.strata[key] = stratum
+            for file_path in files:
+                self._owner[file_path] = stratum
+        self.sampled = 0
+        self.failed = 0
+
+    @property
+    def population(self) -> int:
+        return sum(stratum.population for stratum in self.strata.values())
+
+    @property
+    def exhausted(self) -> bool:
+        return all(not stratum.remaining for stratum in self.strata.values())
+
+    def _take(self, stratum: Stratum, count: int) -> List[Path]:
+        taken = stratum.remaining[-count:] if count else []
+        del stratum.remaining[len(stratum.remaining) - len(taken):]
+        return taken
+
+    def initial_batch(self) -> List[Path]:
+        """每层先抽两个文件（不足两个的层全部抽取），保证各层都能估计方差"""
+        batch = []
+        for stratum in self.strata.values():
+            batch.extend(self._take(stratum, min(2, len(stratum.remaining))))
+        return batch
+
+    def next_batch(self, size: int) -> List[Path]:
+        """再抽 size 个文件：每次从实际抽样比例最落后于按比例分配的层中抽取"""
+        population = self.population
+        drawn = {key: stratum.population - len(stratum.remaining) for key, stratum in self.strata.items()}
+        target_total = sum(drawn.values()) + size
+        batch = []
+        for _ in range(size):
+            candidates = [stratum for stratum in self.strata.values() if stratum.remaining]
+            if not candidates:
+                break
+            stratum = max(
+                candidates,
+                key=lambda s: s.population * target_total / population - drawn[s.key]
+            )
+            batch.extend(self._take(stratum, 1))
+            drawn[stratum.key] += 1
+        return batch
+
+    def record(self, file_path: Path, rule_counts: Counter):
+        """记录一个已分析文件中各规则的问题数"""
+        stratum = self._owner[file_path]
+        stratum.sampled += 1
+        self.sampled += 1
+        counts = Counter(rule_counts)
+        counts[TOTAL] = sum(rule_counts.values())
+        for rule_id, count in counts.items():
+            stratum.sums[rule_id] += count
+            stratum.squares[rule_id] += count * count
+
+    def record_failure(self, file_path: Path):
+        """无法分析的文件不参与估计，从总体中去掉"""
+        self._owner[file_path].population -= 1
+        self.failed += 1
+
+    def _pooled_variance(self, rule_id: str) -> float:
+        n = self.sampled
+        if n < 2:
+            return 0.0
+        total = sum(stratum.sums[rule_id] for stratum in self.strata.values())
+        squares = sum(stratum.squares[rule_id] for stratum in self.strata.values())
+        return max(0.0, (squares - total * total / n) / (n - 1))
+
+    def estimates(self, confidence: float = 0.95) -> Dict[str, RateEstimate]:
+        """各规则及合计（键为 TOTAL）的密度估计和置信区间"""
+        z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        population = self.population
+        rules = set()
+        for stratum in self.strata.values():
+            rules.update(stratum.sums)
+        rules.add(TOTAL)
+
+        results = {}
+        for rule_id in rules:
+            rate = 0.0
+            variance = 0.0
+            for stratum in self.strata.values():
+                n, size = stratum.sampled, stratum.population
+                if n == 0 or size == 0:
+                    continue
+                weight = size / population
+                mean = stratum.sums[rule_id] / n
+                rate += weight * mean
+                if n >= 2:
+                    stratum_variance = max(0.0, (stratum.squares[rule_id] - n * mean * mean) / (n - 1))
+                else:
+                    stratum_variance = self._pooled_variance(rule_id)
+                variance += weight * weight * (1 - n / size) * stratum_variance / n
+            results[rule_id] = RateEstimate(rule_id, rate, z * math.sqrt(variance), population)
+        return results
+
+    def converged(self, precision: float, confidence: float = 0.95) -> bool:
+        """合计密度的相对半宽不超过 precision，且各规则的半宽不超过合计密度的 precision 倍"""
+        estimates = self.estimates(confidence)
+        total = estimates[TOTAL]
+        limit = precision * total.rate
+        return all(estimate.half_width <= limit for estimate in estimates.values())
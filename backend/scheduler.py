@@ -0,0 +1,153 @@
+"""
+分析请求调度器 - 为 /analyze 提供准入控制、按客户端限流和优先级通道
+
+所有分析都在固定大小的线程池中执行，等待队列有上限；队列已满或某个客户端
+并发请求过多时立即拒绝（调用方返回 429 和 Retry-After）。交互式请求优先于
+批量请求出队，但每连续处理若干个交互式请求后会让一个批量请求执行，避免饿死。
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Optional
+
+PRIORITY_LANES = ("interactive", "bulk")
+
+class SchedulerBusy(Exception):
+    """调度器已饱和，请求被拒绝"""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+@dataclass
+class _Job:
+    client_id: str
+    func: Callable[[], Any]
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+class AnalysisScheduler:
+    """有界队列 + 优先级通道的分析任务调度器"""
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        max_queue: int = 64,
+        max_per_client: int = 4,
+        interactive_burst: int = 4
+    ):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.max_per_client = max_per_client
+        self.interactive_burst = interactive_burst
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analysis")
+        self.lanes: Dict[str, Deque[_Job]] = {lane: deque() for lane in PRIORITY_LANES}
+        self.running = 0
+        self.client_inflight: Dict[str, int] = {}
+        self.completed = 0
+        self.rejected: Dict[str, int] = {"queue_full": 0, "client_limit": 0}
+        self.total_service_time = 0.0
+        self.total_wait_time = 0.0
+        self._interactive_streak = 0
+
+    @property
+    def queued(self) -> int:
+        return sum(len(lane) for lane in self.lanes.values())
+
+    def _retry_after(self) -> int:
+        """按平均处理时间估算队列清空所需秒数"""
+        average = self.total_service_time / self.completed if self.completed else 1.0
+        return max(1, math.ceil(average * (self.queued + self.running) / self.max_workers))
+
+    def check_admission(self, client_id: str):
+        """检查是否还能接受该客户端的任务；饱和时抛出 SchedulerBusy"""
+        if self.client_inflight.get(client_id, 0) >= self.max_per_client:
+            self.rejected["client_limit"] += 1
+            raise SchedulerBusy(f"Too many concurrent requests for client '{client_id}'", self._retry_after())
+        if self.queued >= self.max_queue:
+            self.rejected["queue_full"] += 1
+            raise SchedulerBusy("Analysis queue is full", self._retry_after())
+
+    async def submit(self, client_id: str, priority: str, func: Callable[[], Any]) -> Any:
+        """提交一个分析任务并等待结果；饱和时抛出 SchedulerBusy"""
+        lane = priority if priority in self.lanes else "interactive"
+        self.check_admission(client_id)
+
+        loop = asyncio.get_running_loop()
+        job = _Job(client_id=client_id, func=func, future=loop.create_future())
+        self.client_inflight[client_id] = self.client_inflight.get(client_id, 0) + 1
+        self.lanes[lane].append(job)
+        self._dispatch()
+
+        try:
+            return await job.future
+        finally:
+            remaining = self.client_inflight.get(client_id, 1) - 1
+            if remaining > 0:
+                self.client_inflight[client_id] = remaining
+            else:
+                self.client_inflight.pop(client_id, None)
+
+    def _next_job(self) -> Optional[_Job]:
+        interactive, bulk = self.lanes["interactive"], self.lanes["bulk"]
+        if interactive and (not bulk or self._interactive_streak < self.interactive_burst):
+            self._interactive_streak += 1
+            return interactive.popleft()
+        if bulk:
+            self._interactive_streak = 0
+            return bulk.popleft()
+        return None
+
+    def _dispatch(self):
+        """在事件循环线程中把排队任务派发到线程池"""
+        loop = asyncio.get_running_loop()
+        while self.running < self.max_workers:
+            job = self._next_job()
+            if job is None:
+                return
+            if job.future.cancelled():
+                # 客户端已断开，直接丢弃
+                continue
+
+            self.running += 1
+            started_at = time.monotonic()
+            self.total_wait_time += started_at - job.enqueued_at
+            task = loop.run_in_executor(self.executor, job.func)
+            task.add_done_callback(lambda done, job=job, started_at=started_at: self._finish(job, done, started_at))
+
+    def _finish(self, job: _Job, done: asyncio.Future, started_at: float):
+        self.running -= 1
+        self.completed += 1
+        self.total_service_time += time.monotonic() - started_at
+        if not job.future.cancelled():
+            if done.cancelled():
+                job.future.cancel()
+            elif done.exception() is not None:
+                job.future.set_exception(done.exception())
+            else:
+                job.future.set_result(done.result())
+        self._dispatch()
+
+    def metrics(self) -> Dict[str, Any]:
+        """队列深度与吞吐指标"""
+        return {
+            "queued": {lane: len(jobs) for lane, jobs in self.lanes.items()},
+            "queue_depth": self.queued,
+            "running": self.running,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "max_per_client": self.max_per_client,
+            "clients": dict(self.client_inflight),
+            "completed": self.completed,
+            "rejected": dict(self.rejected),
+            "avg_service_ms": round(self.total_service_time * 1000 / self.completed, 2) if self.completed else 0.0,
+            "avg_wait_ms": round(self.total_wait_time * 1000 / self.completed, 2) if self.completed else 0.0,
+        }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+多 worker 启动入口 - 启动多个 uvicorn worker 进程共同提供 main.py 中的 API
+
+主进程先准备共享只读数据（词性词表和规则判定快照，见 shared_data），再通过环境变量
+CODENAMER_SHARED_DATA 告知各 worker。worker 只映射这些文件，不需要各自加载 NLTK 标注器，
+启动后即可就绪；词表在共享数据目录中保留，之后启动时直接复用。C# 解析器同样由主进程构建一次。
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import uvicorn
+
+from analysis_cache import compute_fingerprint
+from csharp_parser import provision_for_workers
+from naming_analyzer import NamingAnalyzer
+from shared_data import prepare_shared_data
+from verdict_cache import VerdictCache
+
+BACKEND_DIR = Path(__file__).parent
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="以多个 worker 进程启动 CodeNamer API")
+    parser.add_argument("--host", default="0.0.0.0", help="监听地址（默认: 0.0.0.0）")
+    parser.add_argument("--port", type=int, default=8000, help="监听端口（默认: 8000）")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="worker 进程数（默认: CPU 核数）"
+    )
+    parser.add_argument(
+        "--shared-data",
+        default=str(Path(tempfile.gettempdir()) / "codenamer-shared"),
+        help="共享只读数据的目录（默认: 系统临时目录下的 codenamer-shared）"
+    )
+    parser.add_argument(
+        "--verdict-cache",
+        help="CLI 通过 --verdict-cache 保存的规则判定缓存，作为只读快照共享给所有 worker"
+    )
+    return parser.parse_args()
+
+def main():
+    args = parse_arguments()
+    if args.workers < 1:
+        print("错误: --workers 必须大于 0")
+        sys.exit(1)
+
+    verdict_entries = None
+    if args.verdict_cache:
+        verdict_cache = VerdictCache()
+        fingerprint = compute_fingerprint([BACKEND_DIR / "naming_analyzer.py", BACKEND_DIR / "identifier_features.py"])
+        if verdict_cache.load(Path(args.verdict_cache), fingerprint):
+            verdict_entries = list(verdict_cache.entries.items())
+        else:
+            print(f"警告: 规则判定缓存无效或与当前规则不匹配，已忽略: {args.verdict_cache}")
+
+    shared_dir = Path(args.shared_data)
+    counts = prepare_shared_data(shared_dir, NamingAnalyzer().tag_word, verdict_entries)
+    print(f"共享数据已就绪: {shared_dir}（词性词表 {counts.get('lexicon', 0)} 个单词，"
+          f"判定快照 {counts.get('verdicts', 0)} 条）")
+
+    os.environ["CODENAMER_SHARED_DATA"] = str(shared_dir)
+    # 未指定时，每个 worker 的分析线程数（以及 C# 解析进程数）按 worker 数均分 CPU
+    os.environ.setdefault("CODENAMER_MAX_WORKERS", str(max(1, (os.cpu_count() or 1) // args.workers)))
+
+    # 各 worker 启动时只查找解析器；在主进程中构建一次，避免多个 worker 同时执行 dotnet publish
+    parser_error = provision_for_workers()
+    if parser_error is not None:
+        print(f"警告: {parser_error}（C# 分析不可用）")
+
+    uvicorn.run("main:app", host=args.host, port=args.port, workers=args.workers, app_dir=str(BACKEND_DIR))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+多进程共享的只读数据 - 以内存映射文件在多个 worker 之间共享词性词表和规则判定快照
+
+多 worker 模式（serve.py）启动时由主进程生成数据文件，worker 只读地映射同一批文件：
+文件页由操作系统在进程间共享，每个 worker 不必各自加载 NLTK 标注器和判定缓存，
+启动后即可判定绝大多数名称。
+
+文件格式（MappedTable）：
+    MAGIC | 条目数 | 元数据长度 | 元数据（JSON） | 按键排序的索引 | 键和值的 UTF-8 字节
+查找时在索引上二分，只访问少量页面，不把表读入进程内存。
+"""
+
+import json
+import mmap
+import re
+import struct
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+MAGIC = b"CNMAP001"
+HEADER = struct.Struct("<8sII")
+INDEX_ENTRY = struct.Struct("<IIII")
+
+LEXICON_FILE = "lexicon.map"
+VERDICTS_FILE = "verdicts.map"
+LEXICON_VERSION = 1
+
+# 名称按大小写拆分后的单词形式（见 identifier_features.WORD_SPLIT_PATTERN），只为这类单词预先标注
+LEXICON_WORD_PATTERN = re.compile(r"^[a-z][a-z0-9]*$")
+
+class MappedTable:
+    """只读的内存映射字符串表"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, meta_length = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self._mm.close()
+            raise ValueError(f"不是有效的共享数据文件: {path}")
+        meta_start = HEADER.size
+        self.meta: Dict[str, Any] = json.loads(self._mm[meta_start:meta_start + meta_length].decode("utf-8"))
+        self._index_start = meta_start + meta_length
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _entry(self, position: int) -> Tuple[int, int, int, int]:
+        return INDEX_ENTRY.unpack_from(self._mm, self._index_start + position * INDEX_ENTRY.size)
+
+    def get(self, key: str) -> Optional[str]:
+        target = key.encode("utf-8")
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            key_offset, key_length, value_offset, value_length = self._entry(middle)
+            current = self._mm[key_offset:key_offset + key_length]
+            if current == target:
+                return self._mm[value_offset:value_offset + value_length].decode("utf-8")
+            if current < target:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def close(self):
+        self._mm.close()
+
+    @staticmethod
+    def write(path: Path, items: Iterable[Tuple[str, str]], meta: Optional[Dict[str, Any]] = None):
+        """生成表文件（先写临时文件再替换，已映射旧文件的进程不受影响）"""
+        encoded = sorted({key.encode("utf-8"): value.encode("utf-8") for key, value in items}.items())
+        meta_bytes = json.dumps(meta or {}, sort_keys=True).encode("utf-8")
+
+        data_start = HEADER.size + len(meta_bytes) + INDEX_ENTRY.size * len(encoded)
+        index = bytearray()
+        blob = bytearray()
+        for key, value in encoded:
+            key_offset = data_start + len(blob)
+            blob += key
+            value_offset = data_start + len(blob)
+            blob += value
+            index += INDEX_ENTRY.pack(key_offset, len(key), value_offset, len(value))
+
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, len(encoded), len(meta_bytes)))
+            f.write(meta_bytes)
+            f.write(index)
+            f.write(blob)
+        tmp_path.replace(path)
+
+def open_table(path: Path) -> Optional[MappedTable]:
+    """打开表文件；文件不存在或无效时返回 None"""
+    try:
+        return MappedTable(path)
+    except (OSError, ValueError, struct.error):
+        return None
+
+def _lexicon_meta() -> Dict[str, Any]:
+    import nltk
+    return {"kind": "lexicon", "version": LEXICON_VERSION, "nltk": nltk.__version__}
+
+def build_lexicon(path: Path, tag_word: Callable[[str], Optional[str]]) -> int:
+    """
+    用 NLTK 标注器预先标注其词表中的全部单词，生成词性词表文件，返回词条数
+
+    tag_word 为分析器对单个单词的标注函数，保证词表与在线标注的结果一致。
+    """
+    from nltk.tag.perceptron import PerceptronTagger
+
+    tagger = PerceptronTagger()
+    vocabulary = {word.lower() for word in tagger.tagdict}
+    # 感知机特征 "i word <单词>" 覆盖训练语料中出现过的全部单词
+    vocabulary.update(feature[7:] for feature in tagger.model.weights if feature.startswith("i word "))
+
+    entries = []
+    for word in vocabulary:
+        if LEXICON_WORD_PATTERN.match(word):
+            entries.append((word, tag_word(word) or ""))
+    MappedTable.write(path, entries, _lexicon_meta())
+    return len(entries)
+
+def prepare_shared_data(
+    directory: Path,
+    tag_word: Callable[[str], Optional[str]],
+    verdict_entries: Optional[Iterable[Tuple[Tuple[str, ...], Tuple[Tuple[str, str, str], ...]]]] = None
+) -> Dict[str, int]:
+    """
+    在主进程中准备共享数据目录，返回各文件的条目数
+
+    词性词表与 NLTK 版本匹配时直接复用；verdict_entries 不为空时重新生成判定快照。
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    counts: Dict[str, int] = {}
+
+    lexicon_path = directory / LEXICON_FILE
+    lexicon = open_table(lexicon_path)
+    try:
+        if lexicon is not None and lexicon.meta == _lexicon_meta():
+            counts["lexicon"] = len(lexicon)
+        else:
+            counts["lexicon"] = build_lexicon(lexicon_path, tag_word)
+    except LookupError:
+        # 没有 NLTK 数据时不生成词表，worker 按需加载标注器
+        print("警告: 缺少 NLTK 数据，未生成词性词表", file=sys.stderr)
+    finally:
+        if lexicon is not None:
+            lexicon.close()
+
+    verdicts_path = directory / VERDICTS_FILE
+    if verdict_entries is not None:
+        items = [(encode_verdict_key(key), json.dumps(verdicts, ensure_ascii=False)) for key, verdicts in verdict_entries]
+        MappedTable.write(verdicts_path, items, {"kind": "verdicts"})
+        counts["verdicts"] = len(items)
+    elif verdicts_path.exists():
+        verdicts_path.unlink()
+    return counts
+
+def encode_verdict_key(key: Tuple[str, ...]) -> str:
+    return "\x1f".join(key)
+
+def decode_verdicts(value: str) -> Tuple[Tuple[str, str, str], ...]:
+    return tuple(tuple(verdict) for verdict in json.loads(value))
@@ -0,0 +1,262 @@
+"""
+项目符号索引 - 汇总项目中所有文件声明的名称，供跨文件的项目级规则查询
+
+索引按文件保存声明（附带文件内容摘要），内容未变化的文件不需要重新解析；
+指定索引文件后跨运行持久化。由声明派生出以下映射，随文件的增删改增量维护：
+- 倒排索引：规范化的单词序列（小写、缩写展开，即名称表示的概念）-> 声明，
+  如 userId、user_id、uid 都在 (user, id) 之下
+- 含缩写的概念：名称中含有缩写的声明，按概念分组（概念一致性规则只需检查这些概念）
+- 类型名 -> 类/接口声明，基类型名 -> 继承或实现它的类
+
+项目级规则（NamingAnalyzer.iter_project_findings）只查询这些映射，不需要在文件之间两两比较。
+"""
+
+import hashlib
+import json
+import re
+import threading
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from baseline import normalize_path
+
+INDEX_FORMAT_VERSION = 1
+
+# 常见缩写及合写词 -> 展开后的单词；只收录含义基本唯一的缩写（如不收录 tmp、res、auth）
+ABBREVIATIONS: Dict[str, Tuple[str, ...]] = {
+    "addr": ("address",), "amt": ("amount",), "arr": ("array",), "attr": ("attribute",),
+    "btn": ("button",), "cb": ("callback",), "cfg": ("config",), "cnt": ("count",),
+    "conf": ("config",), "ctx": ("context",), "cur": ("current",), "curr": ("current",),
+    "db": ("database",), "desc": ("description",), "dest": ("destination",), "dir": ("directory",),
+    "doc": ("document",), "dst": ("destination",), "elem": ("element",), "err": ("error",),
+    "evt": ("event",), "fn": ("function",), "idx": ("index",), "img": ("image",),
+    "len": ("length",), "mgr": ("manager",), "msg": ("message",), "num": ("number",),
+    "obj": ("object",), "param": ("parameter",), "passwd": ("password",), "pos": ("position",),
+    "prev": ("previous",), "pwd": ("password",), "qty": ("quantity",), "repo": ("repository",),
+    "req": ("request",), "resp": ("response",), "src": ("source",), "str": ("string",),
+    "svc": ("service",), "usr": ("user",), "val": ("value",),
+    "uid": ("user", "id"), "userid": ("user", "id"), "username": ("user", "name"),
+    "filename": ("file", "name"), "filepath": ("file", "path"),
+}
+
+WORD_PATTERN = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+
+# 参与类型相关规则的声明种类
+TYPE_KINDS = frozenset({"class", "interface"})
+
+# 索引中的一个声明：(文件, 声明在该文件中的下标)
+SymbolRef = Tuple[str, int]
+
+@lru_cache(maxsize=1 << 16)
+def split_words(name: str) -> Tuple[str, ...]:
+    """名称中的单词（小写）：userID -> (user, id)，XMLParser -> (xml, parser)，user_name -> (user, name)"""
+    return tuple(word.lower() for word in WORD_PATTERN.findall(name))
+
+@lru_cache(maxsize=1 << 16)
+def _name_concept(name: str) -> Tuple[str, ...]:
+    return expand_words(split_words(name))
+
+def expand_words(words: Iterable[str]) -> Tuple[str, ...]:
+    """展开缩写后的单词序列，即名称表示的概念"""
+    expanded: List[str] = []
+    for word in words:
+        expanded.extend(ABBREVIATIONS.get(word, (word,)))
+    return tuple(expanded)
+
+def simple_type_name(type_name: str) -> str:
+    """基类型的简单名称：去掉泛型参数和命名空间限定，如 Core.IRepository<User> -> IRepository"""
+    return type_name.split("<", 1)[0].replace("::", ".").rsplit(".", 1)[-1].strip()
+
+class Symbol(NamedTuple):
+    """一个声明（索引中可能有数十万个声明，使用 NamedTuple 以减少内存占用和加载时间）"""
+    kind: str
+    name: str
+    line: int
+    # 仅类和接口：所在命名空间（解析器未提供时为 None）和基类型的简单名称
+    namespace: Optional[str] = None
+    bases: Tuple[str, ...] = ()
+
+    @property
+    def words(self) -> Tuple[str, ...]:
+        return split_words(self.name)
+
+    @property
+    def concept(self) -> Tuple[str, ...]:
+        return _name_concept(self.name)
+
+@dataclass
+class FileSymbols:
+    digest: str
+    language: str
+    symbols: List[Symbol] = field(default_factory=list)
+
+def symbols_from_parsed(parsed_data: Dict[str, Any], language: str) -> List[Symbol]:
+    """从解析结果中提取声明（与 NamingAnalyzer 一样跳过以 < 或 _ 开头的名称）"""
+    symbols = []
+    for name_info in parsed_data.get("names", []):
+        name = name_info.get("Name", "")
+        if not name or name.startswith("<") or name.startswith("_"):
+            continue
+        if language == "vue":
+            kind = name_info.get("DataType") or name_info.get("Type", "")
+        else:
+            kind = name_info.get("Type", "")
+        symbols.append(Symbol(
+            kind=kind.lower(),
+            name=name,
+            line=name_info.get("Line", 0),
+            namespace=name_info.get("Namespace"),
+            bases=tuple(simple_type_name(base) for base in name_info.get("BaseTypes") or ()),
+        ))
+    return symbols
+
+def _add_ref(mapping: Dict[Any, Set[SymbolRef]], key: Any, ref: SymbolRef):
+    refs = mapping.get(key)
+    if refs is None:
+        refs = mapping[key] = set()
+    refs.add(ref)
+
+def _remove_ref(mapping: Dict[Any, Set[SymbolRef]], key: Any, ref: SymbolRef):
+    refs = mapping.get(key)
+    if refs is not None:
+        refs.discard(ref)
+        if not refs:
+            del mapping[key]
+
+class SymbolIndex:
+    """项目符号索引（线程安全）；文件以相对 root 的路径为键"""
+
+    def __init__(self, index_file: Optional[Path] = None, fingerprint: str = "", root: Optional[Path] = None):
+        self.index_file = index_file
+        self.fingerprint = fingerprint
+        self.root = root
+        self.files: Dict[str, FileSymbols] = {}
+        self.concepts: Dict[Tuple[str, ...], Set[SymbolRef]] = {}
+        self.abbreviated: Dict[Tuple[str, ...], Set[SymbolRef]] = {}
+        self.types: Dict[str, Set[SymbolRef]] = {}
+        self.implementations: Dict[str, Set[SymbolRef]] = {}
+        # 本次运行中重新索引的文件数
+        self.updated = 0
+        self._lock = threading.Lock()
+        self._dirty = False
+
+        if index_file is not None and index_file.exists():
+            try:
+                with open(index_file, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == INDEX_FORMAT_VERSION and data.get("fingerprint") == fingerprint:
+                    for key, entry in data.get("files", {}).items():
+                        self._add(key, FileSymbols(
+                            entry["digest"],
+                            entry["language"],
+                            [Symbol(kind, name, line, namespace, tuple(bases))
+                             for kind, name, line, namespace, bases in entry["symbols"]]
+                        ))
+            except (OSError, ValueError, KeyError, TypeError):
+                self._clear()
+
+    def key(self, file_path: Path) -> str:
+        return normalize_path(str(file_path), self.root)
+
+    @staticmethod
+    def digest(content: str) -> str:
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def is_current(self, key: str, digest: str) -> bool:
+        """索引中该文件的声明是否与内容摘要一致（一致时不需要重新解析）"""
+        with self._lock:
+            entry = self.files.get(key)
+            return entry is not None and entry.digest == digest
+
+    def update(self, key: str, digest: str, language: str, symbols: List[Symbol]):
+        """替换一个文件的声明"""
+        with self._lock:
+            self._remove(key)
+            self._add(key, FileSymbols(digest, language, symbols))
+            self.updated += 1
+            self._dirty = True
+
+    def retain(self, keys: Iterable[str], languages: Optional[Iterable[str]] = None) -> int:
+        """删除不在 keys 中的文件（只考虑 languages 中的语言），返回删除的文件数"""
+        keep = set(keys)
+        language_filter = set(languages) if languages is not None else None
+        with self._lock:
+            stale = [
+                key for key, entry in self.files.items()
+                if key not in keep and (language_filter is None or entry.language in language_filter)
+            ]
+            for key in stale:
+                self._remove(key)
+            if stale:
+                self._dirty = True
+        return len(stale)
+
+    def symbol(self, ref: SymbolRef) -> Symbol:
+        return self.files[ref[0]].symbols[ref[1]]
+
+    def lookup(self, name: str) -> Set[SymbolRef]:
+        """与 name 表示同一概念的全部声明（如 uid 可查到 userId、user_id）"""
+        return set(self.concepts.get(_name_concept(name), ()))
+
+    def _add(self, key: str, entry: FileSymbols):
+        self.files[key] = entry
+        for index, symbol in enumerate(entry.symbols):
+            ref = (key, index)
+            concept = symbol.concept
+            _add_ref(self.concepts, concept, ref)
+            if concept != symbol.words:
+                _add_ref(self.abbreviated, concept, ref)
+            if symbol.kind in TYPE_KINDS:
+                _add_ref(self.types, symbol.name, ref)
+                for base in symbol.bases:
+                    _add_ref(self.implementations, base, ref)
+
+    def _remove(self, key: str):
+        entry = self.files.pop(key, None)
+        if entry is None:
+            return
+        for index, symbol in enumerate(entry.symbols):
+            ref = (key, index)
+            concept = symbol.concept
+            _remove_ref(self.concepts, concept, ref)
+            if concept != symbol.words:
+                _remove_ref(self.abbreviated, concept, ref)
+            if symbol.kind in TYPE_KINDS:
+                _remove_ref(self.types, symbol.name, ref)
+                for base in symbol.bases:
+                    _remove_ref(self.implementations, base, ref)
+
+    def _clear(self):
+        self.files.clear()
+        self.concepts.clear()
+        self.abbreviated.clear()
+        self.types.clear()
+        self.implementations.clear()
+
+    def save(self):
+        """将索引写回文件（仅在指定了索引文件且内容有变化时）"""
+        if self.index_file is None or not self._dirty:
+            return
+        with self._lock:
+            data = {
+                "version": INDEX_FORMAT_VERSION,
+                "fingerprint": self.fingerprint,
+                "files": {
+                    key: {
+                        "digest": entry.digest,
+                        "language": entry.language,
+                        "symbols": [
+                            [symbol.kind, symbol.name, symbol.line, symbol.namespace, list(symbol.bases)]
+                            for symbol in entry.symbols
+                        ],
+                    }
+                    for key, entry in self.files.items()
+                },
+            }
+            tmp_file = self.index_file.with_suffix(self.index_file.suffix + ".tmp")
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                f.write(json.dumps(data, ensure_ascii=False, separators=(",", ":")))
+            tmp_file.replace(self.index_file)
+            self._dirty = False
@@ -0,0 +1,140 @@
+"""
+VueParser 的模糊/压力测试 - 对抗性输入的解析时间必须有上界
+
+覆盖超长单行、深层嵌套或未闭合的大括号、大量 <script> 标签、成串的引号和反斜杠，
+并确认超长行确实被跳过（MAX_LINE_LENGTH）、CPU 预算耗尽时确实停止解析。
+
+    cd backend
+    python -m unittest test_vue_parser_fuzz
+"""
+
+import random
+import time
+import unittest
+
+from vue_parser import BUDGET_CHECK_INTERVAL, MAX_LINE_LENGTH, VueParser
+
+# 单个输入的解析时间上限（秒）；正常情况下远小于该值，超出说明出现了超线性的开销
+PARSE_TIME_LIMIT = 5.0
+
+# 随机组合的输入数量和种子（固定种子，失败可以复现）
+FUZZ_CASES = 40
+FUZZ_SEED = 20240501
+
+# 随机输入的组成片段
+FRAGMENTS = (
+    "{", "}", "{" * 200, "}" * 200, "(", ")", "(" * 200,
+    '"', "'", "`", '"' * 500, "'" * 500, "\\" * 500, '\\"' * 300,
+    "<script>", "<script setup>", "</script>", "<script", "<template>", "</template>",
+    "methods: {", "computed: {", "watch: {", "setup() {",
+    "function get_data(user_id, item_val) {", "const Total_count = ref(0)",
+    "const handler = async (a, b) => {", "mounted() {", "onMounted(() => {",
+    "/*", "*/", "//", "\n", "\n" * 50, " " * 300,
+)
+
+def wrap_vue(script: str, setup: bool = False) -> str:
+    return f"<template><div></div></template>\n<script{' setup' if setup else ''}>\n{script}\n</script>\n"
+
+class VueParserFuzzTest(unittest.TestCase):
+    def setUp(self):
+        self.parser = VueParser()
+
+    def assertParsedWithin(self, content: str, limit: float = PARSE_TIME_LIMIT, **kwargs):
+        start = time.perf_counter()
+        result = self.parser.parse_vue_file(content, **kwargs)
+        elapsed = time.perf_counter() - start
+        self.assertLess(elapsed, limit, f"解析 {len(content)} 个字符用时 {elapsed:.2f} 秒")
+        self.assertIn("names", result)
+        self.assertIn("errors", result)
+        return result
+
+    def test_huge_single_line(self):
+        for fragment in ("function a_b() {", "{", '"', "\\", "x"):
+            with self.subTest(fragment=fragment):
+                line = fragment * (2_000_000 // len(fragment))
+                self.assertParsedWithin(wrap_vue(line))
+                self.assertParsedWithin(line)
+
+    def test_deeply_nested_braces(self):
+        depth = 20_000
+        nested = "\n".join("  " * min(i, 100) + "methods: { function f_%d() {" % i for i in range(depth))
+        self.assertParsedWithin(wrap_vue(nested))
+        self.assertParsedWithin(wrap_vue("{\n" * depth + "}\n" * depth))
+
+    def test_unclosed_braces(self):
+        script = "methods: {\n" + "  do_thing() {\n    if (x) {\n" * 20_000
+        result = self.assertParsedWithin(wrap_vue(script))
+        self.assertTrue(result["names"])
+        self.assertParsedWithin(wrap_vue("computed: {\n" + "{" * 900 + "\n") * 2_000)
+
+    def test_many_script_tags(self):
+        self.assertParsedWithin("<script>\nconst a_b = ref(1)\n</script>\n" * 20_000)
+        # 没有闭合标签、没有 > 的 <script
+        self.assertParsedWithin("<script>\n" * 50_000)
+        self.assertParsedWithin("<script " * 200_000)
+        self.assertParsedWithin("<template>" + "<script>" * 100_000)
+
+    def test_quotes_and_backslashes(self):
+        short_runs = "\n".join(
+            ('"' * 400 + "\\" * 400 + "'" * 150) if i % 2 else ("`" * 300 + '\\"' * 300)
+            for i in range(5_000)
+        )
+        self.assertParsedWithin(wrap_vue(short_runs))
+        self.assertParsedWithin(wrap_vue("const s = '" + "\\'" * 499 + "\n") * 2_000)
+        self.assertParsedWithin(wrap_vue('"' * 1_000_000))
+
+    def test_random_adversarial_inputs(self):
+        rng = random.Random(FUZZ_SEED)
+        for case in range(FUZZ_CASES):
+            content = "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(200, 5_000)))
+            with self.subTest(case=case):
+                self.assertParsedWithin(content)
+                self.assertParsedWithin(wrap_vue(content, setup=rng.random() < 0.5))
+
+    def test_long_lines_are_skipped(self):
+        declaration = "function get_data_%s() {"
+        kept = declaration % "kept"
+        skipped = declaration % "skipped"
+        at_limit = kept + " " * (MAX_LINE_LENGTH - len(kept))
+        over_limit = skipped + " " * (MAX_LINE_LENGTH + 1 - len(skipped))
+        self.assertEqual(len(at_limit), MAX_LINE_LENGTH)
+        self.assertEqual(len(over_limit), MAX_LINE_LENGTH + 1)
+
+        result = self.parser.parse_vue_file(wrap_vue(f"{at_limit}\n}}\n{over_limit}\n}}"))
+        names = {name_info["Name"] for name_info in result["names"]}
+        self.assertIn("get_data_kept", names)
+        self.assertNotIn("get_data_skipped", names)
+        long_line_errors = [error for error in result["errors"] if str(MAX_LINE_LENGTH) in error["message"]]
+        self.assertEqual(len(long_line_errors), 1)
+        # 错误指向超长行在整个文件中的行号
+        self.assertEqual(long_line_errors[0]["line"], 5)
+        self.assertNotIn("truncated", result)
+
+    def test_cpu_budget_cuts_parse_short(self):
+        count = 20_000
+        script = "\n".join(f"function get_data_{i}(user_id) {{ return user_id }}" for i in range(count))
+
+        unlimited = self.parser.parse_vue_file(wrap_vue(script))
+        self.assertNotIn("truncated", unlimited)
+        self.assertGreaterEqual(len(unlimited["names"]), count)
+
+        start = time.perf_counter()
+        limited = self.parser.parse_vue_file(wrap_vue(script), cpu_budget=0)
+        elapsed = time.perf_counter() - start
+        self.assertTrue(limited.get("truncated"))
+        self.assertLess(len(limited["names"]), len(unlimited["names"]))
+        budget_errors = [error for error in limited["errors"] if "CPU" in error["message"]]
+        self.assertEqual(len(budget_errors), 1)
+        # 预算每 BUDGET_CHECK_INTERVAL 行检查一次，耗尽后不再处理后续的行
+        self.assertLessEqual(budget_errors[0]["line"], BUDGET_CHECK_INTERVAL + 2)
+        self.assertLess(elapsed, PARSE_TIME_LIMIT)
+
+    def test_constructor_budget_applies_to_script_files(self):
+        parser = VueParser(cpu_budget=0)
+        script = "\n".join(f"const value_{i} = ref({i})" for i in range(5_000))
+        result = parser.parse_script_file(script)
+        self.assertTrue(result.get("truncated"))
+        self.assertNotIn("truncated", parser.parse_script_file(script, cpu_budget=60))
+
+if __name__ == "__main__":
+    unittest.main()
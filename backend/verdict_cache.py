@@ -0,0 +1,79 @@
+"""
+规则判定缓存 - 以 (语言, 名称类别, 数据类型, 名称, 启用规则) 为键记住规则判定结果
+
+同一个标识符（如 request、cancellationToken、id）在代码中反复出现时只需判定一次，
+每次出现只附加自己的行号。缓存默认只存在于内存中，也可以保存到文件供下次运行复用。
+多 worker 模式下还可以挂载一个只读的共享快照（见 shared_data），未命中本地缓存时查找快照。
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from shared_data import MappedTable, decode_verdicts, encode_verdict_key
+
+# (rule_id, message, severity)
+Verdict = Tuple[str, str, str]
+VerdictKey = Tuple[str, str, str, str, str]
+
+VERDICT_CACHE_VERSION = 1
+
+class VerdictCache:
+    """规则判定结果的记忆表"""
+
+    def __init__(self, max_entries: int = 200_000, shared: Optional[MappedTable] = None):
+        self.max_entries = max_entries
+        self.entries: Dict[VerdictKey, Tuple[Verdict, ...]] = {}
+        # 只读的共享快照，查到的结果不复制到本地，避免每个 worker 各存一份
+        self.shared = shared
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: VerdictKey) -> Optional[Tuple[Verdict, ...]]:
+        verdicts = self.entries.get(key)
+        if verdicts is None and self.shared is not None:
+            value = self.shared.get(encode_verdict_key(key))
+            if value is not None:
+                verdicts = decode_verdicts(value)
+        if verdicts is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return verdicts
+
+    def put(self, key: VerdictKey, verdicts: Tuple[Verdict, ...]):
+        # 达到上限时整体清空，避免常驻服务内存无限增长
+        if len(self.entries) >= self.max_entries:
+            self.entries.clear()
+        self.entries[key] = verdicts
+
+    def clear(self):
+        self.entries.clear()
+
+    def load(self, path: Path, fingerprint: str = "") -> bool:
+        """从文件加载判定结果；指纹不一致时忽略，返回是否加载成功"""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        if data.get("version") != VERDICT_CACHE_VERSION or data.get("fingerprint") != fingerprint:
+            return False
+
+        for item in data.get("entries", []):
+            key, verdicts = item
+            self.entries[tuple(key)] = tuple(tuple(verdict) for verdict in verdicts)
+        return True
+
+    def save(self, path: Path, fingerprint: str = ""):
+        """将判定结果保存到文件"""
+        data = {
+            "version": VERDICT_CACHE_VERSION,
+            "fingerprint": fingerprint,
+            "entries": [[list(key), [list(verdict) for verdict in verdicts]] for key, verdicts in self.entries.items()],
+        }
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        tmp_path.replace(path)
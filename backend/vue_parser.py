@@ -1,7 +1,17 @@
 import re
 import json
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+import time
+from contextvars import ContextVar
+from typing import Iterator, List, Dict, Any, Optional, Tuple
+from dataclasses import dataclass, field
+from profiling import stage
+
+# 超过该长度的行（通常是压缩代码或恶意输入）不做正则匹配，使每行的匹配开销有固定上界，
+# 整体解析时间与行数成线性关系
+MAX_LINE_LENGTH = 1000
+
+# 每处理多少行检查一次 CPU 预算
+BUDGET_CHECK_INTERVAL = 64
 
 @dataclass
 class VueMethod:
@@ -9,11 +19,35 @@ class VueMethod:
     line: int
     method_type: str  # 'method', 'computed', 'watch', 'lifecycle', 'event_handler'
     is_async: bool = False
+    column: Optional[int] = None  # 名称在所在行中的起始字符下标（从 0 开始）
+
+@dataclass
+class _ParseState:
+    """单次解析的 CPU 预算与跳过的超长行"""
+    deadline: Optional[float] = None
+    exhausted_at: Optional[int] = None
+    long_lines: List[int] = field(default_factory=list)
+
+    def exhausted(self, line: int) -> bool:
+        if self.exhausted_at is not None:
+            return True
+        if self.deadline is not None and time.thread_time() > self.deadline:
+            self.exhausted_at = line
+            return True
+        return False
+
+_current_state: ContextVar[Optional[_ParseState]] = ContextVar("vue_parse_state", default=None)
 
 class VueParser:
-    """Vue.js 单文件组件解析器，专门用于提取方法名"""
+    """
+    Vue.js 单文件组件解析器，专门用于提取方法名
+
+    cpu_budget 为单次解析允许的 CPU 秒数（None 表示不限制）；超出后停止解析，
+    返回已提取的名称，并在 errors 中说明结果不完整（同时设置 "truncated": True）。
+    """
     
-    def __init__(self):
+    def __init__(self, cpu_budget: Optional[float] = None):
+        self.cpu_budget = cpu_budget
         # Vue 生命周期方法
         self.lifecycle_methods = {
             'beforeCreate', 'created', 'beforeMount', 'mounted',
@@ -29,67 +63,144 @@ class VueParser:
             'onErrorCaptured', 'onRenderTracked', 'onRenderTriggered'
         }
     
-    def parse_vue_file(self, content: str) -> Dict[str, Any]:
-        """解析Vue文件内容，返回方法信息"""
+    def parse_vue_file(self, content: str, cpu_budget: Optional[float] = None) -> Dict[str, Any]:
+        """解析Vue文件内容，返回方法信息；cpu_budget 覆盖构造时的预算"""
         try:
-            methods = []
-            errors = []
-            
             # 提取 <script> 标签内容
-            script_content = self._extract_script_content(content)
-            if not script_content:
+            with stage("vue.script"):
+                script_block = self._extract_script_content(content)
+            if not script_block:
                 return {
                     "names": [],
                     "errors": [{"message": "No <script> section found", "line": 1}]
                 }
             
-            # 解析方法
-            methods.extend(self._parse_options_api_methods(script_content))
-            methods.extend(self._parse_composition_api_methods(script_content))
-            methods.extend(self._parse_regular_functions(script_content))
-            
-            # 转换为标准格式
-            names = []
-            for method in methods:
-                names.append({
-                    "Type": "method",
-                    "Name": method.name,
-                    "Line": method.line,
-                    "DataType": method.method_type,
-                    "IsAsync": method.is_async
-                })
+            script_content, line_offset, column_offset = script_block
+            return self._parse_script(script_content, line_offset, cpu_budget, column_offset)
             
+        except Exception as e:
             return {
-                "names": names,
-                "errors": errors
+                "names": [],
+                "errors": [{"message": f"Parse error: {str(e)}", "line": 1}]
             }
-            
+    
+    def parse_script_file(self, content: str, cpu_budget: Optional[float] = None) -> Dict[str, Any]:
+        """解析独立的 .ts/.js 文件（如 composables），返回方法信息"""
+        try:
+            return self._parse_script(content, cpu_budget=cpu_budget)
         except Exception as e:
             return {
                 "names": [],
                 "errors": [{"message": f"Parse error: {str(e)}", "line": 1}]
             }
     
-    def _extract_script_content(self, content: str) -> Optional[str]:
-        """提取 <script> 标签中的内容"""
-        # 匹配 <script> 标签，支持各种属性
-        script_pattern = r'<script[^>]*>(.*?)</script>'
-        match = re.search(script_pattern, content, re.DOTALL | re.IGNORECASE)
+    def _parse_script(
+        self,
+        script_content: str,
+        line_offset: int = 0,
+        cpu_budget: Optional[float] = None,
+        column_offset: int = 0
+    ) -> Dict[str, Any]:
+        """
+        解析脚本内容并转换为标准格式
+
+        line_offset 为脚本在整个文件中的起始行偏移，column_offset 为脚本第一行在文件中该行的起始列。
+        """
+        methods = []
+        errors = []
         
-        if match:
-            return match.group(1)
-        return None
+        budget = self.cpu_budget if cpu_budget is None else cpu_budget
+        state = _ParseState(deadline=time.thread_time() + budget if budget is not None else None)
+        token = _current_state.set(state)
+        try:
+            # 解析方法
+            with stage("vue.options_api"):
+                methods.extend(self._parse_options_api_methods(script_content))
+            with stage("vue.composition_api"):
+                methods.extend(self._parse_composition_api_methods(script_content))
+            with stage("vue.functions"):
+                methods.extend(self._parse_regular_functions(script_content))
+        finally:
+            _current_state.reset(token)
+        
+        if state.long_lines:
+            errors.append({
+                "message": f"{len(set(state.long_lines))} 行超过 {MAX_LINE_LENGTH} 个字符，未分析",
+                "line": state.long_lines[0] + line_offset
+            })
+        if state.exhausted_at is not None:
+            errors.append({
+                "message": "解析超出 CPU 预算，结果不完整",
+                "line": state.exhausted_at + line_offset
+            })
+        
+        # 转换为标准格式
+        names = []
+        for method in methods:
+            name_info = {
+                "Type": "method",
+                "Name": method.name,
+                "Line": method.line + line_offset,
+                "DataType": method.method_type,
+                "IsAsync": method.is_async
+            }
+            if method.column is not None:
+                name_info["Span"] = {
+                    "line": method.line + line_offset,
+                    "column": method.column + (column_offset if method.line == 1 else 0),
+                    "length": len(method.name)
+                }
+            names.append(name_info)
+        
+        result = {
+            "names": names,
+            "errors": errors
+        }
+        if state.exhausted_at is not None:
+            result["truncated"] = True
+        return result
+    
+    def _iter_lines(self, script_content: str) -> Iterator[Tuple[int, str]]:
+        """逐行产出 (行号, 行内容)，跳过超长行；CPU 预算耗尽后停止"""
+        state = _current_state.get()
+        for i, line in enumerate(script_content.split('\n'), 1):
+            if state is not None:
+                if i % BUDGET_CHECK_INTERVAL == 0 and state.exhausted(i):
+                    return
+                if state.exhausted_at is not None:
+                    return
+            if len(line) > MAX_LINE_LENGTH:
+                if state is not None:
+                    state.long_lines.append(i)
+                continue
+            yield i, line
+    
+    def _extract_script_content(self, content: str) -> Optional[Tuple[str, int, int]]:
+        """提取 <script> 标签中的内容，返回 (脚本内容, 脚本之前的行数, 脚本第一行的起始列)"""
+        # 与 <script[^>]*>(.*?)</script> 等价，但用字符串查找代替正则，
+        # 避免没有闭合标签时对每个 <script 反复扫描到文件末尾
+        lowered = content.lower()
+        tag_start = lowered.find('<script')
+        if tag_start == -1:
+            return None
+        tag_end = lowered.find('>', tag_start)
+        if tag_end == -1:
+            return None
+        close_start = lowered.find('</script>', tag_end + 1)
+        if close_start == -1:
+            return None
+        
+        line_start = content.rfind('\n', 0, tag_end + 1) + 1
+        return content[tag_end + 1:close_start], content.count('\n', 0, tag_end + 1), tag_end + 1 - line_start
     
     def _parse_options_api_methods(self, script_content: str) -> List[VueMethod]:
         """解析 Options API 中的方法"""
         methods = []
-        lines = script_content.split('\n')
-        
         # 查找 methods 对象
         in_methods_block = False
         brace_count = 0
         
-        for i, line in enumerate(lines, 1):
+        for i, line in self._iter_lines(script_content):
             stripped = line.strip()
             
             # 检测 methods 块开始
@@ -108,7 +219,7 @@ class VueParser:
                     continue
                 
                 # 解析方法定义
-                method = self._parse_method_line(stripped, i)
+                method = self._parse_method_line(line, i)
                 if method:
                     method.method_type = 'method'
                     methods.append(method)
@@ -123,14 +234,13 @@ class VueParser:
     def _parse_composition_api_methods(self, script_content: str) -> List[VueMethod]:
         """解析 Composition API 中的方法和变量"""
         methods = []
-        lines = script_content.split('\n')
-
-        for i, line in enumerate(lines, 1):
+        for i, line in self._iter_lines(script_content):
             stripped = line.strip()
+            indent = len(line) - len(line.lstrip())
 
             # 解析 const/let/var 函数定义
             func_patterns = [
-                r'(?:const|let|var)\s+(\w+)\s*=\s*(?:async\s+)?\(\s*[^)]*\s*\)\s*=>\s*\{',
+                r'(?:const|let|var)\s+(\w+)\s*=\s*(?:async\s+)?\([^)]*\)\s*=>\s*\{',
                 r'(?:const|let|var)\s+(\w+)\s*=\s*(?:async\s+)?function\s*\([^)]*\)\s*\{',
                 r'function\s+(\w+)\s*\([^)]*\)\s*\{'
             ]
@@ -146,7 +256,8 @@ class VueParser:
                         name=method_name,
                         line=i,
                         method_type=method_type,
-                        is_async=is_async
+                        is_async=is_async,
+                        column=indent + match.start(1)
                     ))
 
             # 解析 ref/reactive/computed 变量声明
@@ -166,7 +277,8 @@ class VueParser:
                         name=var_name,
                         line=i,
                         method_type=var_type,
-                        is_async=False
+                        is_async=False,
+                        column=indent + match.start(1)
                     ))
 
             # 解析普通变量声明（在函数内部）
@@ -186,14 +298,15 @@ class VueParser:
                                 name=var_name,
                                 line=i,
                                 method_type='variable',
-                                is_async=False
+                                is_async=False,
+                                column=indent + match.start(1)
                             ))
 
             # 解析函数参数
             param_patterns = [
-                r'(?:const|let|var)\s+\w+\s*=\s*(?:async\s+)?\(\s*([^)]+)\s*\)\s*=>\s*\{',
-                r'(?:const|let|var)\s+\w+\s*=\s*(?:async\s+)?function\s*\(\s*([^)]*)\s*\)\s*\{',
-                r'function\s+\w+\s*\(\s*([^)]*)\s*\)\s*\{'
+                r'(?:const|let|var)\s+\w+\s*=\s*(?:async\s+)?\(([^)]+)\)\s*=>\s*\{',
+                r'(?:const|let|var)\s+\w+\s*=\s*(?:async\s+)?function\s*\(([^)]*)\)\s*\{',
+                r'function\s+\w+\s*\(([^)]*)\)\s*\{'
             ]
 
             for pattern in param_patterns:
@@ -201,7 +314,7 @@ class VueParser:
                 if match and match.group(1).strip():
                     params_str = match.group(1)
                     # 解析参数列表
-                    params = self._parse_parameters(params_str, i)
+                    params = self._parse_parameters(params_str, i, indent + match.start(1))
                     methods.extend(params)
 
         return methods
@@ -209,16 +322,19 @@ class VueParser:
     def _parse_regular_functions(self, script_content: str) -> List[VueMethod]:
         """解析普通函数定义"""
         methods = []
-        lines = script_content.split('\n')
-        
-        for i, line in enumerate(lines, 1):
+        for i, line in self._iter_lines(script_content):
             stripped = line.strip()
             
+            # 下面的模式都需要括号和大括号，先做廉价的字符检查
+            if '(' not in stripped or '{' not in stripped:
+                continue
+            indent = len(line) - len(line.lstrip())
+            
             # 解析箭头函数和普通函数
             patterns = [
-                r'(\w+)\s*:\s*(?:async\s+)?\(\s*[^)]*\s*\)\s*=>\s*\{',  # method: () => {}
-                r'(\w+)\s*:\s*(?:async\s+)?function\s*\([^)]*\)\s*\{',   # method: function() {}
-                r'(\w+)\s*\([^)]*\)\s*\{',  # method() {}
+                r'\b(\w+)\s*:\s*(?:async\s+)?\([^)]*\)\s*=>\s*\{',  # method: () => {}
+                r'\b(\w+)\s*:\s*(?:async\s+)?function\s*\([^)]*\)\s*\{',   # method: function() {}
+                r'\b(\w+)\s*\([^)]*\)\s*\{',  # method() {}
             ]
             
             for pattern in patterns:
@@ -237,7 +353,8 @@ class VueParser:
                         name=method_name,
                         line=i,
                         method_type=method_type,
-                        is_async=is_async
+                        is_async=is_async,
+                        column=indent + match.start(1)
                     ))
         
         return methods
@@ -245,12 +362,10 @@ class VueParser:
     def _parse_computed_methods(self, script_content: str) -> List[VueMethod]:
         """解析 computed 属性"""
         methods = []
-        lines = script_content.split('\n')
-        
         in_computed_block = False
         brace_count = 0
         
-        for i, line in enumerate(lines, 1):
+        for i, line in self._iter_lines(script_content):
             stripped = line.strip()
             
             if re.match(r'computed\s*:\s*\{', stripped):
@@ -265,7 +380,7 @@ class VueParser:
                     in_computed_block = False
                     continue
                 
-                method = self._parse_method_line(stripped, i)
+                method = self._parse_method_line(line, i)
                 if method:
                     method.method_type = 'computed'
                     methods.append(method)
@@ -275,12 +390,10 @@ class VueParser:
     def _parse_watch_methods(self, script_content: str) -> List[VueMethod]:
         """解析 watch 方法"""
         methods = []
-        lines = script_content.split('\n')
-        
         in_watch_block = False
         brace_count = 0
         
-        for i, line in enumerate(lines, 1):
+        for i, line in self._iter_lines(script_content):
             stripped = line.strip()
             
             if re.match(r'watch\s*:\s*\{', stripped):
@@ -295,7 +408,7 @@ class VueParser:
                     in_watch_block = False
                     continue
                 
-                method = self._parse_method_line(stripped, i)
+                method = self._parse_method_line(line, i)
                 if method:
                     method.method_type = 'watch'
                     methods.append(method)
@@ -305,20 +418,22 @@ class VueParser:
     def _parse_lifecycle_methods(self, script_content: str) -> List[VueMethod]:
         """解析生命周期方法"""
         methods = []
-        lines = script_content.split('\n')
-        
-        for i, line in enumerate(lines, 1):
+        for i, line in self._iter_lines(script_content):
             stripped = line.strip()
+            if '(' not in stripped:
+                continue
             
             # 检查生命周期方法
             for lifecycle in self.lifecycle_methods:
                 pattern = rf'{lifecycle}\s*\([^)]*\)\s*\{{'
-                if re.search(pattern, stripped):
+                match = re.search(pattern, line)
+                if match:
                     methods.append(VueMethod(
                         name=lifecycle,
                         line=i,
                         method_type='lifecycle',
-                        is_async='async' in stripped
+                        is_async='async' in stripped,
+                        column=match.start()
                     ))
         
         return methods
@@ -327,10 +442,10 @@ class VueParser:
         """解析单行方法定义"""
         # 匹配各种方法定义格式
         patterns = [
-            r'(\w+)\s*\([^)]*\)\s*\{',  # methodName() {}
-            r'(\w+)\s*:\s*(?:async\s+)?function\s*\([^)]*\)\s*\{',  # methodName: function() {}
-            r'(\w+)\s*:\s*(?:async\s+)?\([^)]*\)\s*=>\s*\{',  # methodName: () => {}
-            r'(?:async\s+)?(\w+)\s*\([^)]*\)\s*\{',  # async methodName() {}
+            r'\b(\w+)\s*\([^)]*\)\s*\{',  # methodName() {}
+            r'\b(\w+)\s*:\s*(?:async\s+)?function\s*\([^)]*\)\s*\{',  # methodName: function() {}
+            r'\b(\w+)\s*:\s*(?:async\s+)?\([^)]*\)\s*=>\s*\{',  # methodName: () => {}
+            r'(?:async\s+)?\b(\w+)\s*\([^)]*\)\s*\{',  # async methodName() {}
         ]
         
         for pattern in patterns:
@@ -343,27 +458,30 @@ class VueParser:
                     name=method_name,
                     line=line_num,
                     method_type='method',
-                    is_async=is_async
+                    is_async=is_async,
+                    column=match.start(1)
                 )
         
         return None
     
-    def _parse_parameters(self, params_str: str, line_num: int) -> List[VueMethod]:
-        """解析函数参数"""
+    def _parse_parameters(self, params_str: str, line_num: int, column: Optional[int] = None) -> List[VueMethod]:
+        """解析函数参数；column 为参数列表在所在行中的起始列"""
         params = []
         if not params_str.strip():
             return params
 
-        # 分割参数，处理TypeScript类型注解
+        # 分割参数，处理TypeScript类型注解；同时记录每个参数在参数列表中的起始位置
         param_list = []
         current_param = ""
+        current_start = 0
         paren_count = 0
 
-        for char in params_str:
+        for index, char in enumerate(params_str):
             if char == ',' and paren_count == 0:
                 if current_param.strip():
-                    param_list.append(current_param.strip())
+                    param_list.append((current_param, current_start))
                 current_param = ""
+                current_start = index + 1
             else:
                 if char in '({[<':
                     paren_count += 1
@@ -372,19 +490,21 @@ class VueParser:
                 current_param += char
 
         if current_param.strip():
-            param_list.append(current_param.strip())
+            param_list.append((current_param, current_start))
 
         # 提取参数名
-        for param in param_list:
+        for param, start in param_list:
             # 处理解构参数和类型注解
             param_match = re.match(r'(\w+)(?:\s*:\s*[^=]+)?(?:\s*=\s*.+)?', param.strip())
             if param_match:
                 param_name = param_match.group(1)
+                leading = len(param) - len(param.lstrip())
                 params.append(VueMethod(
                     name=param_name,
                     line=line_num,
                     method_type='parameter',
-                    is_async=False
+                    is_async=False,
+                    column=column + start + leading if column is not None else None
                 ))
 
         return params
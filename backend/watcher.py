@@ -0,0 +1,141 @@
+"""
+文件监听 - 为 CLI 的 --watch 模式提供文件变更通知
+
+优先使用 watchdog（Linux 下为 inotify，macOS 为 FSEvents，Windows 为 ReadDirectoryChangesW）；
+未安装 watchdog 时退化为基于 os.scandir 的 mtime 轮询。
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Set
+
+from file_discovery import is_path_ignored, iter_source_files
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+
+ChangeCallback = Callable[[Set[Path], Set[Path]], None]
+
+class _ChangeCollector:
+    """收集变更路径，并在静默 debounce 秒后批量回调"""
+
+    def __init__(self, directory: Path, extensions: Iterable[str], debounce: float, use_ignore_files: bool = True):
+        self.directory = directory
+        self.extensions = {ext.lower() for ext in extensions}
+        self.use_ignore_files = use_ignore_files
+        self.debounce = debounce
+        self.changed: Set[Path] = set()
+        self.deleted: Set[Path] = set()
+        self.last_event = 0.0
+        self.lock = threading.Lock()
+
+    def accepts(self, path: str) -> bool:
+        if os.path.splitext(path)[1].lower() not in self.extensions:
+            return False
+        # 与首次扫描一致：忽略 bin/obj 等目录下的构建产物和 .gitignore/.codenamerignore 排除的文件
+        return not is_path_ignored(self.directory, Path(path), self.use_ignore_files)
+
+    def mark_changed(self, path: Path):
+        with self.lock:
+            self.deleted.discard(path)
+            self.changed.add(path)
+            self.last_event = time.monotonic()
+
+    def mark_deleted(self, path: Path):
+        with self.lock:
+            self.changed.discard(path)
+            self.deleted.add(path)
+            self.last_event = time.monotonic()
+
+    def drain(self):
+        """若已静默足够久，取出并清空累积的变更"""
+        with self.lock:
+            if not (self.changed or self.deleted):
+                return None
+            if time.monotonic() - self.last_event < self.debounce:
+                return None
+            batch = (self.changed, self.deleted)
+            self.changed, self.deleted = set(), set()
+            return batch
+
+if WATCHDOG_AVAILABLE:
+    class _WatchdogHandler(FileSystemEventHandler):
+        def __init__(self, collector: _ChangeCollector):
+            self.collector = collector
+
+        def on_any_event(self, event):
+            if event.is_directory:
+                return
+            paths = [(event.src_path, event.event_type == "deleted" or event.event_type == "moved")]
+            if event.event_type == "moved":
+                paths.append((event.dest_path, False))
+            for path, removed in paths:
+                if not self.collector.accepts(path):
+                    continue
+                if removed:
+                    self.collector.mark_deleted(Path(path))
+                else:
+                    self.collector.mark_changed(Path(path))
+
+def _snapshot(directory: Path, collector: _ChangeCollector) -> Dict[Path, float]:
+    """记录目录下所有受监听文件的 mtime"""
+    mtimes: Dict[Path, float] = {}
+    for path in iter_source_files(directory, collector.extensions, use_ignore_files=collector.use_ignore_files):
+        try:
+            mtimes[path] = path.stat().st_mtime
+        except OSError:
+            pass
+    return mtimes
+
+def watch_directory(
+    directory: Path,
+    callback: ChangeCallback,
+    extensions: Iterable[str] = (".cs",),
+    debounce: float = 0.3,
+    poll_interval: float = 1.0,
+    use_ignore_files: bool = True
+):
+    """
+    持续监听目录，文件变更后以 callback(changed, deleted) 批量通知
+
+    跳过规则与 iter_source_files 相同，use_ignore_files 为 False 时不读取 .gitignore/.codenamerignore。
+
+    该函数会一直阻塞，直到收到 KeyboardInterrupt。
+    """
+    collector = _ChangeCollector(directory, extensions, debounce, use_ignore_files)
+
+    if WATCHDOG_AVAILABLE:
+        observer = Observer()
+        observer.schedule(_WatchdogHandler(collector), str(directory), recursive=True)
+        observer.start()
+        try:
+            while True:
+                time.sleep(debounce / 2)
+                batch = collector.drain()
+                if batch:
+                    callback(*batch)
+        finally:
+            observer.stop()
+            observer.join()
+    else:
+        previous = _snapshot(directory, collector)
+        while True:
+            time.sleep(poll_interval)
+            current = _snapshot(directory, collector)
+            for path, mtime in current.items():
+                if previous.get(path) != mtime:
+                    collector.mark_changed(path)
+            for path in previous.keys() - current.keys():
+                collector.mark_deleted(path)
+            previous = current
+            # 轮询本身已有间隔，不再额外等待 debounce
+            collector.last_event = 0.0
+            batch = collector.drain()
+            if batch:
+                callback(*batch)
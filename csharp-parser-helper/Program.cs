@@ -1,6 +1,7 @@
 using Microsoft.CodeAnalysis;
 using Microsoft.CodeAnalysis.CSharp;
 using Microsoft.CodeAnalysis.CSharp.Syntax;
+using Microsoft.CodeAnalysis.Text;
 using Newtonsoft.Json;
 using System.Text;
 
@@ -14,10 +15,16 @@ public class Program
         {
             if (args.Length == 0)
             {
-                Console.Error.WriteLine("Usage: CSharpParserHelper <code-string>");
+                Console.Error.WriteLine("Usage: CSharpParserHelper <code-string> | --server");
                 Environment.Exit(1);
             }
 
+            if (args[0] == "--server")
+            {
+                RunServer();
+                return;
+            }
+
             string code = args[0];
             var ast = ParseCode(code);
             string json = JsonConvert.SerializeObject(ast, Formatting.None);
@@ -30,6 +37,37 @@ public class Program
         }
     }
 
+    // 常驻模式：每行读取一个 {"code": "..."} 请求，每行输出一个解析结果
+    private static void RunServer()
+    {
+        Console.InputEncoding = new UTF8Encoding(false);
+        Console.OutputEncoding = new UTF8Encoding(false);
+
+        string? line;
+        while ((line = Console.In.ReadLine()) != null)
+        {
+            if (string.IsNullOrWhiteSpace(line))
+            {
+                continue;
+            }
+
+            string json;
+            try
+            {
+                var request = JsonConvert.DeserializeObject<ParseRequest>(line);
+                var ast = ParseCode(request?.Code ?? "");
+                json = JsonConvert.SerializeObject(ast, Formatting.None);
+            }
+            catch (Exception ex)
+            {
+                json = JsonConvert.SerializeObject(new { fatal = ex.Message }, Formatting.None);
+            }
+
+            Console.Out.WriteLine(json);
+            Console.Out.Flush();
+        }
+    }
+
     private static object ParseCode(string code)
     {
         var tree = CSharpSyntaxTree.ParseText(code);
@@ -44,7 +82,10 @@ public class Program
             Type = e.ElementType.ToLower(),
             Name = e.Name,
             Line = e.Line,
-            DataType = e.DataType
+            DataType = e.DataType,
+            Span = e.Span,
+            Namespace = e.Namespace,
+            BaseTypes = e.BaseTypes
         }).ToList();
         
         return new
@@ -64,8 +105,8 @@ public class NameExtractorWalker : CSharpSyntaxWalker
 
     public override void VisitClassDeclaration(ClassDeclarationSyntax node)
     {
-        // 提取类声明信息
-        AddElement("Class", node.Identifier.ValueText, GetLineNumber(node), "class");
+        // 提取类声明信息（附带所在命名空间和基类型列表，用于项目级规则）
+        AddTypeElement("Class", node, "class");
         
         // 确保继续遍历类内部的成员
         base.VisitClassDeclaration(node);
@@ -74,7 +115,7 @@ public class NameExtractorWalker : CSharpSyntaxWalker
     public override void VisitInterfaceDeclaration(InterfaceDeclarationSyntax node)
     {
         // 提取接口声明信息
-        AddElement("Interface", node.Identifier.ValueText, GetLineNumber(node), "interface");
+        AddTypeElement("Interface", node, "interface");
         
         // 确保继续遍历接口内部的成员
         base.VisitInterfaceDeclaration(node);
@@ -84,7 +125,7 @@ public class NameExtractorWalker : CSharpSyntaxWalker
     {
         // 提取方法声明信息，包括返回类型
         string returnType = node.ReturnType.ToString();
-        AddElement("Method", node.Identifier.ValueText, GetLineNumber(node), returnType);
+        AddElement("Method", node.Identifier, GetLineNumber(node), returnType);
         
         // 继续遍历方法内部
         base.VisitMethodDeclaration(node);
@@ -94,7 +135,7 @@ public class NameExtractorWalker : CSharpSyntaxWalker
     {
         // 提取属性声明信息，包括属性类型
         string propertyType = node.Type.ToString();
-        AddElement("Property", node.Identifier.ValueText, GetLineNumber(node), propertyType);
+        AddElement("Property", node.Identifier, GetLineNumber(node), propertyType);
         
         // 继续遍历属性内部（如 getter/setter）
         base.VisitPropertyDeclaration(node);
@@ -106,7 +147,7 @@ public class NameExtractorWalker : CSharpSyntaxWalker
         string fieldType = node.Declaration.Type.ToString();
         foreach (var variable in node.Declaration.Variables)
         {
-            AddElement("Field", variable.Identifier.ValueText, GetLineNumber(node), fieldType);
+            AddElement("Field", variable.Identifier, GetLineNumber(node), fieldType);
         }
         
         base.VisitFieldDeclaration(node);
@@ -118,7 +159,7 @@ public class NameExtractorWalker : CSharpSyntaxWalker
         string variableType = node.Declaration.Type.ToString();
         foreach (var variable in node.Declaration.Variables)
         {
-            AddElement("Variable", variable.Identifier.ValueText, GetLineNumber(node), variableType);
+            AddElement("Variable", variable.Identifier, GetLineNumber(node), variableType);
         }
         
         base.VisitLocalDeclarationStatement(node);
@@ -129,23 +170,70 @@ public class NameExtractorWalker : CSharpSyntaxWalker
         if (!string.IsNullOrEmpty(node.Identifier.ValueText))
         {
             string parameterType = node.Type?.ToString() ?? "unknown";
-            AddElement("Parameter", node.Identifier.ValueText, GetLineNumber(node), parameterType);
+            AddElement("Parameter", node.Identifier, GetLineNumber(node), parameterType);
         }
         
         base.VisitParameter(node);
     }
 
-    private void AddElement(string elementType, string name, int line, string dataType)
+    private void AddElement(string elementType, SyntaxToken identifier, int line, string dataType)
     {
         Elements.Add(new CodeElement
         {
             ElementType = elementType,
-            Name = name,
+            Name = identifier.ValueText,
             Line = line,
-            DataType = dataType
+            DataType = dataType,
+            Span = GetSpan(identifier)
         });
     }
 
+    private void AddTypeElement(string elementType, TypeDeclarationSyntax node, string dataType)
+    {
+        AddElement(elementType, node.Identifier, GetLineNumber(node), dataType);
+        var element = Elements[^1];
+        element.Namespace = GetContainerName(node);
+        element.BaseTypes = node.BaseList?.Types.Select(t => t.Type.ToString()).ToList() ?? new List<string>();
+    }
+
+    // 类型所在的命名空间；嵌套类型附加外层类型名，如 "App.Services.Outer"
+    private static string GetContainerName(SyntaxNode node)
+    {
+        var parts = new List<string>();
+        for (var parent = node.Parent; parent != null; parent = parent.Parent)
+        {
+            if (parent is BaseNamespaceDeclarationSyntax ns)
+            {
+                parts.Add(ns.Name.ToString());
+            }
+            else if (parent is BaseTypeDeclarationSyntax type)
+            {
+                parts.Add(type.Identifier.ValueText);
+            }
+        }
+        parts.Reverse();
+        return string.Join(".", parts);
+    }
+
+    // 标识符的精确位置：所在行（从 1 开始）、行内起始列和长度，按 Unicode 字符计数（与 Python 的字符串下标一致）
+    private static SourceSpan? GetSpan(SyntaxToken identifier)
+    {
+        if (identifier.SyntaxTree == null)
+        {
+            return null;
+        }
+
+        var text = identifier.SyntaxTree.GetText();
+        var line = text.Lines.GetLineFromPosition(identifier.SpanStart);
+        var prefix = text.ToString(TextSpan.FromBounds(line.Start, identifier.SpanStart));
+        return new SourceSpan
+        {
+            Line = line.LineNumber + 1,
+            Column = prefix.EnumerateRunes().Count(),
+            Length = identifier.Text.EnumerateRunes().Count()
+        };
+    }
+
     private static int GetLineNumber(SyntaxNode node)
     {
         return node.GetLocation().GetLineSpan().StartLinePosition.Line + 1;
@@ -158,6 +246,28 @@ public class CodeElement
     public string Name { get; set; } = "";
     public int Line { get; set; }
     public string DataType { get; set; } = "";
+    public SourceSpan? Span { get; set; }
+    // 仅类和接口：所在命名空间和基类型列表
+    public string? Namespace { get; set; }
+    public List<string>? BaseTypes { get; set; }
+}
+
+public class SourceSpan
+{
+    [JsonProperty("line")]
+    public int Line { get; set; }
+
+    [JsonProperty("column")]
+    public int Column { get; set; }
+
+    [JsonProperty("length")]
+    public int Length { get; set; }
+}
+
+public class ParseRequest
+{
+    [JsonProperty("code")]
+    public string Code { get; set; } = "";
 }
 
 public class NameInfo
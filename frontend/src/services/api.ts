@@ -1,5 +1,10 @@
 import axios from 'axios'
-import type { CodeAnalysisRequest, CodeAnalysisResponse } from '../types'
+import type {
+  AnalysisResult,
+  AnalysisStreamLine,
+  AnalysisStreamSummary,
+  CodeAnalysisRequest,
+} from '../types'
 
 const API_BASE_URL = 'http://localhost:8000'
 
@@ -11,9 +16,60 @@ const api = axios.create({
   },
 })
 
-export const analyzeCode = async (request: CodeAnalysisRequest): Promise<CodeAnalysisResponse> => {
-  const response = await api.post<CodeAnalysisResponse>('/analyze', request)
-  return response.data
+// 流式分析：每收到一批结果调用一次 onResults，返回最后的汇总行
+export const analyzeCodeStream = async (
+  request: CodeAnalysisRequest,
+  onResults: (results: AnalysisResult[]) => void,
+  signal?: AbortSignal
+): Promise<AnalysisStreamSummary> => {
+  const response = await fetch(`${API_BASE_URL}/analyze/stream`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(request),
+    signal,
+  })
+  if (!response.ok || !response.body) {
+    const data = await response.json().catch(() => null)
+    throw new Error(data?.detail ?? `Request failed with status ${response.status}`)
+  }
+
+  const reader = response.body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ''
+  let summary: AnalysisStreamSummary | null = null
+
+  const handleLine = (text: string): AnalysisStreamSummary | null => {
+    if (!text.trim()) return null
+    const line = JSON.parse(text) as AnalysisStreamLine
+    if ('results' in line) {
+      onResults(line.results)
+      return null
+    }
+    if ('error' in line) {
+      throw new Error(line.error)
+    }
+    return line
+  }
+
+  for (;;) {
+    const { done, value } = await reader.read()
+    if (done) break
+    buffer += decoder.decode(value, { stream: true })
+    let start = 0
+    let newline = buffer.indexOf('\n')
+    while (newline !== -1) {
+      summary = handleLine(buffer.slice(start, newline)) ?? summary
+      start = newline + 1
+      newline = buffer.indexOf('\n', start)
+    }
+    buffer = buffer.slice(start)
+  }
+  summary = handleLine(buffer + decoder.decode()) ?? summary
+
+  if (summary === null) {
+    throw new Error('Analysis stream ended unexpectedly')
+  }
+  return summary
 }
 
 export const healthCheck = async (): Promise<{ status: string }> => {
@@ -1,22 +1,51 @@
+export interface SourceSpan {
+  line: number
+  column: number
+  length: number
+}
+
 export interface AnalysisResult {
   line: number
   name: string
   rule_id: string
   message: string
   severity: 'warning' | 'error' | 'info'
+  span?: SourceSpan | null
 }
 
 export interface CodeAnalysisRequest {
   language: string
   code: string
+  severity?: 'error' | 'warning' | 'info'
+  rules?: string[]
+  disable_rules?: string[]
+  priority?: 'interactive' | 'bulk'
+  project?: string
+  file_path?: string
 }
 
 export interface CodeAnalysisResponse {
   results: AnalysisResult[]
   total_issues: number
   parser_errors: Array<{ message: string; line: number }>
+  suppressed?: number
+  partial?: boolean
+}
+
+// /analyze/stream 返回的 NDJSON 行：若干结果批次，最后一行为汇总或错误
+export interface AnalysisStreamSummary {
+  done: true
+  total_issues: number
+  parser_errors: Array<{ message: string; line: number }>
+  suppressed: number
+  partial: boolean
 }
 
+export type AnalysisStreamLine =
+  | { results: AnalysisResult[] }
+  | AnalysisStreamSummary
+  | { error: string }
+
 export interface ApiError {
   detail: string
 }